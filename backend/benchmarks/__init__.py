@@ -0,0 +1,6 @@
+"""Performance checks and benchmarks for the API.
+
+Each module is a script run from `backend/`, e.g. `python -m benchmarks.query_budgets`.
+They build a throwaway test database (never the configured one), seed it and
+report; checks exit non-zero when a budget is exceeded.
+"""
@@ -0,0 +1,116 @@
+"""Compare JSON/MessagePack renderers and compression on a large /api/time-entries/ payload.
+
+Usage (from backend/):
+    python -m benchmarks.api_renderers [--tasks 200] [--entries 25] [--repeat 20]
+
+Seeds --tasks x --entries time entries in one bucket and reports, for the
+unpaginated /api/time-entries/ response:
+
+- render time of DRF's stdlib JSONRenderer, core.renderers.ORJSONRenderer and
+  MessagePackRenderer on the same serialized data;
+- p50 latency of the whole request with each renderer;
+- body size and compression time for identity, gzip and brotli.
+
+Exits non-zero unless the orjson output is byte-identical to the stdlib one
+and the MessagePack payload decodes to the same data.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from .common import seed_day, setup_django, test_database
+
+PATH = "/api/time-entries/"
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client
+    from rest_framework.renderers import JSONRenderer
+
+    from core import compression
+    from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+    from tasks.models import TimeEntry
+    from tasks.serializers import TimeEntrySerializer
+
+    failures = 0
+    with test_database():
+        seed_day(tasks=args.tasks, entries_per_task=args.entries)
+        entries = list(TimeEntry.objects.order_by("-start_time", "-id"))
+        data = TimeEntrySerializer(entries, many=True).data
+        client = Client()
+
+        stdlib = JSONRenderer().render(data)
+        print(f"{len(entries)} time entries, {len(stdlib) / 1024:.0f} KiB of JSON")
+
+        if orjson is None:
+            print("skip orjson: package not installed")
+        else:
+            fast = ORJSONRenderer().render(data)
+            identical = fast == stdlib
+            failures += not identical
+            print(f"{'ok  ' if identical else 'FAIL'} orjson output byte-identical to JSONRenderer")
+        if msgpack is None:
+            print("skip msgpack: package not installed")
+        else:
+            same = msgpack.unpackb(MessagePackRenderer().render(data)) == json.loads(stdlib)
+            failures += not same
+            print(f"{'ok  ' if same else 'FAIL'} MessagePack decodes to the same data")
+
+        print("\nrender (ms, p50):")
+        renderers = {"json": JSONRenderer(), "orjson": ORJSONRenderer()}
+        if msgpack is not None:
+            renderers["msgpack"] = MessagePackRenderer()
+        for name, renderer in renderers.items():
+            print(f"  {name:<8} {_median_ms(lambda: renderer.render(data), args.repeat):8.2f}")
+
+        print("\nGET /api/time-entries/ (ms, p50):")
+        fast_enabled = ORJSONRenderer.fast
+        try:
+            ORJSONRenderer.fast = False
+            print(f"  {'json':<8} {_median_ms(lambda: client.get(PATH), args.repeat):8.2f}")
+        finally:
+            ORJSONRenderer.fast = fast_enabled
+        print(f"  {'orjson':<8} {_median_ms(lambda: client.get(PATH), args.repeat):8.2f}")
+        if msgpack is not None:
+            latency = _median_ms(lambda: client.get(PATH, HTTP_ACCEPT="application/msgpack"), args.repeat)
+            print(f"  {'msgpack':<8} {latency:8.2f}")
+
+        print("\ncompression of the JSON body:")
+        print(f"  {'identity':<8} {len(stdlib):>9} bytes")
+        encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+        for encoding in encodings:
+            size = len(compression.compress(stdlib, encoding))
+            cost = _median_ms(lambda: compression.compress(stdlib, encoding), args.repeat)
+            print(f"  {encoding:<8} {size:>9} bytes ({size / len(stdlib):.1%}) in {cost:.2f} ms")
+            response = client.get(PATH, HTTP_ACCEPT_ENCODING=encoding)
+            negotiated = response.get("Content-Encoding") == encoding
+            failures += not negotiated
+            print(f"  {'ok  ' if negotiated else 'FAIL'} served with Content-Encoding: {encoding}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity: int = 0, file_backed: bool = False):
+    """Create, migrate and finally destroy a test database (like the test runner).
+
+    `file_backed` puts a SQLite test database in a fresh temporary directory,
+    for benchmarks that write from many threads at once.
+    """
+
+    import tempfile
+
+    from django.db import connections
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    tmpdir = None
+    settings_dict = connections["default"].settings_dict
+    if file_backed and settings_dict["ENGINE"].endswith("sqlite3"):
+        tmpdir = tempfile.TemporaryDirectory()
+        settings_dict.setdefault("TEST", {})["NAME"] = str(Path(tmpdir.name) / "bench.sqlite3")
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+def seed_day(*, user=None, day=None, tasks: int = 10, entries_per_task: int = 5):
+    """Create `tasks` tasks for one bucket/day, each with finished time entries."""
+
+    from datetime import datetime, time, timedelta
+
+    from django.utils import timezone
+
+    from dashboards.rollups import rebuild_task_rollups
+    from tasks.models import Task, TimeEntry
+    from tasks.totals import rebuild_task_totals
+
+    day = day or timezone.localdate()
+    created = Task.objects.bulk_create(
+        [
+            Task(user=user, date=day, title=f"Task {i}", target_seconds=600 * (i % 4))
+            for i in range(tasks)
+        ]
+    )
+    start_of_day = timezone.make_aware(datetime.combine(day, time(8)))
+    entries = []
+    for task in created:
+        for j in range(entries_per_task):
+            start = start_of_day + timedelta(minutes=10 * j)
+            entries.append(
+                TimeEntry(task=task, start_time=start, end_time=start + timedelta(minutes=5), duration_seconds=300)
+            )
+    TimeEntry.objects.bulk_create(entries)
+    rebuild_task_rollups([task.pk for task in created])
+    rebuild_task_totals([task.pk for task in created])
+    return created
+
+
+def seed_history(*, users: int = 10, days: int = 730, tasks_per_day: int = 6, entries_per_task: int = 3):
+    """Seed `days` days up to today for the anonymous bucket and `users` user buckets.
+
+    Every bucket gets the same habit templates and, per day, `tasks_per_day`
+    tasks with `entries_per_task` finished entries each, plus rollups and task
+    totals. Returns the number of (tasks, time entries) created.
+    """
+
+    from datetime import datetime, time, timedelta
+
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from dashboards.rollups import rebuild_task_rollups
+    from tasks.models import HabitTemplate, Task, TimeEntry
+    from tasks.totals import rebuild_task_totals
+
+    buckets = [None] + [User.objects.create_user(username=f"bench{i}") for i in range(users)]
+    HabitTemplate.objects.bulk_create(
+        [
+            HabitTemplate(user=user, title=f"Habit {i}", default_target_seconds=900 * (i + 1))
+            for user in buckets
+            for i in range(tasks_per_day)
+        ]
+    )
+
+    today = timezone.localdate()
+    task_count = entry_count = 0
+    for user in buckets:
+        for offset in range(0, days, 30):
+            # One month at a time keeps memory and statement sizes bounded.
+            month = [today - timedelta(days=day) for day in range(offset, min(offset + 30, days))]
+            created = Task.objects.bulk_create(
+                [
+                    Task(
+                        user=user,
+                        date=day,
+                        title=f"Habit {i}",
+                        target_seconds=900 * (i + 1),
+                        completed=(day.toordinal() + i) % 3 == 0,
+                    )
+                    for day in month
+                    for i in range(tasks_per_day)
+                ],
+                batch_size=500,
+            )
+            entries = []
+            for task in created:
+                start_of_day = timezone.make_aware(datetime.combine(task.date, time(7)))
+                for j in range(entries_per_task):
+                    start = start_of_day + timedelta(hours=j, minutes=5 * (task.pk % 10))
+                    entries.append(
+                        TimeEntry(
+                            task=task,
+                            start_time=start,
+                            end_time=start + timedelta(minutes=20),
+                            duration_seconds=1200,
+                        )
+                    )
+            TimeEntry.objects.bulk_create(entries, batch_size=1000)
+            rebuild_task_rollups([task.pk for task in created])
+            rebuild_task_totals([task.pk for task in created])
+            task_count += len(created)
+            entry_count += len(entries)
+    return task_count, entry_count
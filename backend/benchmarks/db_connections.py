@@ -0,0 +1,111 @@
+"""Measure per-request database connection overhead with and without reuse.
+
+Usage (from backend/):
+    python -m benchmarks.db_connections [--requests 300] [--path /api/tasks/]
+
+Sends --requests sequential GETs through Django's WSGI handler (so
+close_old_connections runs at the start and end of each request, as under
+gunicorn) in three modes against a seeded test database:
+
+- per-request: CONN_MAX_AGE=0, no pool (a new connection for every request);
+- persistent: CONN_MAX_AGE=600 with health checks;
+- configured: the DATABASE_URL settings as given (e.g. ?pool=true on Postgres).
+
+Reports connections opened and request latency per mode. Exits non-zero if
+persistent connections still open one per request. On SQLite the connect is
+cheap; point DATABASE_URL at Postgres to see the network/TLS handshake cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from .common import seed_day, setup_django, test_database
+
+
+def _get(handler, path: str) -> int:
+    environ = {"PATH_INFO": path, "REQUEST_METHOD": "GET", "HTTP_HOST": "localhost", "wsgi.input": BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+    response = handler(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        for _ in response:
+            pass
+    finally:
+        # Sends request_finished, which closes connections past CONN_MAX_AGE.
+        response.close()
+    return int(status[0].split()[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--path", default="/api/tasks/")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection, connections
+    from django.db.backends.signals import connection_created
+
+    opened = []
+    connection_created.connect(lambda sender, connection, **kwargs: opened.append(connection.alias), weak=False)
+
+    with test_database(file_backed=True):
+        seed_day(tasks=20, entries_per_task=3)
+        settings_dict = connection.settings_dict
+        configured = {
+            "CONN_MAX_AGE": settings_dict["CONN_MAX_AGE"],
+            "CONN_HEALTH_CHECKS": settings_dict["CONN_HEALTH_CHECKS"],
+            "OPTIONS": dict(settings_dict["OPTIONS"]),
+        }
+        without_pool = {key: value for key, value in configured["OPTIONS"].items() if key != "pool"}
+        modes = {
+            "per-request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": without_pool},
+            "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True, "OPTIONS": without_pool},
+            "configured": configured,
+        }
+
+        handler = WSGIHandler()
+        results = {}
+        print(f"{'mode':<12} {'conn_max_age':>12} {'pool':>5} {'opened':>7} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7}")
+        for name, overrides in modes.items():
+            connections.close_all()
+            if hasattr(connection, "close_pool"):
+                connection.close_pool()
+            settings_dict.update(overrides)
+
+            _get(handler, args.path)  # warm-up: URL resolver, imports, first connect
+            opened.clear()
+            timings = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                status = _get(handler, args.path)
+                timings.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    sys.exit(f"GET {args.path} returned {status}")
+
+            timings.sort()
+            results[name] = len(opened)
+            print(
+                f"{name:<12} {str(overrides['CONN_MAX_AGE']):>12} {'yes' if 'pool' in overrides['OPTIONS'] else 'no':>5} "
+                f"{len(opened):>7} {statistics.fmean(timings):>8.2f} {timings[len(timings) // 2]:>7.2f} "
+                f"{timings[int(len(timings) * 0.95)]:>7.2f}"
+            )
+
+        connections.close_all()
+        settings_dict.update(configured)
+
+    reused = results["persistent"] <= 1
+    print(f"{'ok  ' if reused else 'FAIL'} persistent connections are reused across requests")
+    sys.exit(0 if reused else 1)
+
+
+if __name__ == "__main__":
+    main()
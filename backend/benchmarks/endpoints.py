@@ -0,0 +1,298 @@
+"""Latency and SQL query budgets for every endpoint listed by the API index (`/`).
+
+Usage (from backend/):
+    python -m benchmarks.endpoints [--users 10] [--days 730] [--tasks-per-day 6]
+        [--entries-per-task 3] [--requests 30] [--tolerance 1.5] [--only NAME ...]
+        [--update-baseline]
+
+Seeds a history of --days days for the anonymous bucket and --users user
+buckets (tasks, time entries, templates and rollups), then requests each
+route in ROUTES --requests times as the anonymous bucket, with the response
+cache cleared before every request so the full code path is measured. For
+each route it reports p50/p99 latency and the most SQL queries any request
+issued, and fails when:
+
+- a request issues more queries than the route's budget in ROUTES (an N+1
+  shows up here regardless of machine speed);
+- the p50 latency exceeds the stored baseline by more than --tolerance (plus
+  2 ms for timer noise), when a baseline for this database vendor and dataset
+  exists in benchmarks/baselines/;
+- an endpoint in the API index has no entry in ROUTES.
+
+--update-baseline stores the measured latencies instead of comparing them.
+Runs on SQLite by default; set DATABASE_URL to a Postgres database to run
+against Postgres (baselines are kept per vendor).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+
+from .common import seed_history, setup_django, test_database
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Absolute slack on top of the relative tolerance: sub-millisecond routes jitter.
+NOISE_MS = 2.0
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str  # key in core.urls.api_index
+    method: str
+    # (context) -> (path, client kwargs); called outside the timed section.
+    request: Callable[[dict], tuple[str, dict]]
+    max_queries: int
+    # Drain the streaming body: "all", or "first" chunk (open-ended streams).
+    stream: str = "all"
+
+
+def _today(ctx):
+    return ctx["today"].isoformat()
+
+
+def _entry_batch(ctx):
+    from tasks.models import TimeEntry
+
+    # A fresh entry per request, so each one deletes something.
+    task = ctx["task"]
+    start = ctx["now"] - timedelta(days=400, seconds=next(ctx["counter"]))
+    entry = TimeEntry.objects.create(task=task, start_time=start, end_time=start, duration_seconds=0)
+    payload = {"operations": [{"op": "delete", "id": entry.pk}]}
+    return "/api/time-entries/batch/", {"data": payload, "content_type": "application/json"}
+
+
+def _task_batch(ctx):
+    flip = next(ctx["counter"]) % 2 == 0
+    payload = {"operations": [{"op": "update", "id": ctx["task"].pk, "data": {"completed": flip}}]}
+    return "/api/tasks/batch/", {"data": payload, "content_type": "application/json"}
+
+
+def _import(ctx):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    # The same 20 rows every time: after the first request all are skipped.
+    rows = ["title,start_time,end_time"]
+    for i in range(20):
+        start = ctx["now"] - timedelta(days=500, minutes=30 * i)
+        rows.append(f"Imported {i % 4},{start.isoformat()},{(start + timedelta(minutes=10)).isoformat()}")
+    upload = SimpleUploadedFile("entries.csv", "\n".join(rows).encode(), content_type="text/csv")
+    return "/api/time-entries/import/", {"data": {"file": upload}}
+
+
+# Budgets are hard ceilings; raise one only together with the change that needs
+# the extra round-trip (and say why next to it).
+ROUTES = [
+    # Day version (validators) + one values() query.
+    Route("tasks", "get", lambda ctx: (f"/api/tasks/?date={_today(ctx)}", {}), 2),
+    # Templates + existing tasks in one transaction; nothing left to create.
+    Route("tasks_populate", "post", lambda ctx: (f"/api/tasks/populate/?date={_today(ctx)}", {}), 4),
+    # Read, transaction, bucket lock (Postgres), bulk update, rollup rebuild (2),
+    # reread, day version, change event insert (payloads are built by the
+    # streams), response rows.
+    Route("tasks_batch", "post", _task_batch, 10),
+    Route("tasks_stats", "get", lambda ctx: (f"/api/tasks/stats/?date={_today(ctx)}", {}), 2),
+    # Served from the World Time cache (a local stub upstream).
+    Route("tasks_world_time", "get", lambda ctx: ("/api/tasks/world-time/", {}), 0),
+    Route("templates", "get", lambda ctx: ("/api/templates/", {}), 1),
+    Route("time_entries", "get", lambda ctx: (f"/api/time-entries/?task={ctx['task'].pk}", {}), 1),
+    # As tasks_batch, plus the bucket lookup for the deleted entries' days and
+    # the task totals update (tasks.totals).
+    Route("time_entries_batch", "post", _entry_batch, 12),
+    # Bucket lock (Postgres), task lookup + already-present checks (live entries,
+    # archived days) in one transaction; nothing to write.
+    Route("time_entries_import", "post", _import, 6),
+    # Day version + summary aggregate + per-task totals + productivity trend.
+    Route("dashboard", "get", lambda ctx: (f"/api/dashboard/?date={_today(ctx)}", {}), 4),
+    # Only the first chunk: the latest event id.
+    Route("events", "get", lambda ctx: ("/api/events/", {}), 1, stream="first"),
+    # One chunked cursor (a chunk is CHUNK_SIZE rows, 30 days of entries here).
+    Route(
+        "export",
+        "get",
+        lambda ctx: (
+            f"/api/export/time-entries/?format=csv&start={ctx['today'] - timedelta(days=29)}&end={_today(ctx)}",
+            {},
+        ),
+        1,
+    ),
+    Route("cache_stats", "get", lambda ctx: ("/api/cache-stats/", {}), 0),
+    Route("world_time_legacy", "get", lambda ctx: ("/api/world-time/", {}), 0),
+    # Never touches the database. Keep it last: the output (and its latency)
+    # grows with the label sets the routes above have recorded.
+    Route("metrics", "get", lambda ctx: ("/metrics", {"HTTP_AUTHORIZATION": f"Bearer {ctx['metrics_token']}"}), 0),
+]
+
+
+def _indexed_endpoints(client) -> set[str]:
+    return set(client.get("/").json()["endpoints"])
+
+
+def _drain(response, stream: str):
+    if not response.streaming:
+        return
+    try:
+        for _ in response.streaming_content:
+            if stream == "first":
+                break
+    finally:
+        response.close()
+
+
+def _measure(client, route: Route, ctx: dict, requests: int) -> dict:
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    queries = 0
+    statuses = set()
+    for index in range(requests + 1):
+        path, kwargs = route.request(ctx)
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, route.method)(path, **kwargs)
+            _drain(response, route.stream)
+            elapsed = time.perf_counter() - started
+        statuses.add(response.status_code)
+        if index == 0:
+            # Warm-up: imports, URL resolver, first write of a populate/import.
+            continue
+        latencies.append(elapsed * 1000)
+        queries = max(queries, len(captured.captured_queries))
+
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        "queries": queries,
+        "statuses": sorted(statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="User buckets besides the anonymous one.")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--tasks-per-day", type=int, default=6)
+    parser.add_argument("--entries-per-task", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=30, help="Timed requests per route.")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed p50 slowdown over the baseline.")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Only these routes (no coverage check).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+
+    import itertools
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.utils import timezone
+
+    from external_apis.world_time import _cache
+    from tasks.models import Task
+
+    from .world_time_stub import StubHandler, ThreadingHTTPServer
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.WORLD_TIME_URL = f"http://127.0.0.1:{server.server_port}/api/ip"
+    _cache.reset()
+
+    dataset = {
+        "users": args.users,
+        "days": args.days,
+        "tasks_per_day": args.tasks_per_day,
+        "entries_per_task": args.entries_per_task,
+    }
+    routes = [route for route in ROUTES if not args.only or route.name in args.only]
+    failures = 0
+
+    with test_database():
+        vendor = connection.vendor
+        started = time.perf_counter()
+        tasks, entries = seed_history(**dataset)
+        print(
+            f"{vendor}: seeded {args.users + 1} buckets x {args.days} days = {tasks} tasks, "
+            f"{entries} time entries in {time.perf_counter() - started:.1f}s"
+        )
+
+        client = Client()
+        if not args.only:
+            missing = _indexed_endpoints(client) - {route.name for route in ROUTES}
+            for name in sorted(missing):
+                failures += 1
+                print(f"FAIL {name}: listed in the API index but has no route budget in ROUTES")
+
+        today = timezone.localdate()
+        ctx = {
+            "today": today,
+            "now": timezone.now(),
+            "task": Task.objects.filter(user__isnull=True, date=today).order_by("id").first(),
+            "counter": itertools.count(),
+            # The test environment runs with DEBUG off, where /metrics needs a token.
+            "metrics_token": "bench",
+        }
+        settings.METRICS_TOKEN = ctx["metrics_token"]
+
+        baseline_file = BASELINE_DIR / f"endpoints.{vendor}.json"
+        baseline = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+        compare = baseline.get("dataset") == dataset and not args.update_baseline
+        if not args.update_baseline:
+            if not baseline:
+                print(f"note: no baseline in {baseline_file.name}; latency is not checked (--update-baseline)")
+            elif not compare:
+                print(f"note: {baseline_file.name} was recorded for another dataset; latency is not checked")
+
+        results = {}
+        print(f"     {'route':<22} {'p50 ms':>8} {'p99 ms':>8} {'base p50':>9} {'queries':>8}  HTTP")
+        for route in routes:
+            result = _measure(client, route, ctx, args.requests)
+            results[route.name] = {key: result[key] for key in ("p50_ms", "p99_ms", "queries")}
+            base = baseline.get("routes", {}).get(route.name) if compare else None
+
+            problems = []
+            if any(status >= 400 for status in result["statuses"]):
+                problems.append(f"HTTP {result['statuses']}")
+            if result["queries"] > route.max_queries:
+                problems.append(f"{result['queries']} queries > budget {route.max_queries}")
+            if base and result["p50_ms"] > base["p50_ms"] * args.tolerance + NOISE_MS:
+                problems.append(f"p50 {result['p50_ms']:.1f} ms > {args.tolerance}x baseline {base['p50_ms']:.1f} ms")
+
+            failures += bool(problems)
+            base_p50 = f"{base['p50_ms']:.2f}" if base else "-"
+            print(
+                f"{'FAIL' if problems else 'ok  '} {route.name:<22} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{base_p50:>9} {result['queries']:>4}/{route.max_queries:<3}  "
+                f"{','.join(map(str, result['statuses']))}"
+            )
+            for problem in problems:
+                print(f"       {problem}")
+
+    server.shutdown()
+
+    if args.update_baseline:
+        if args.only and baseline.get("dataset") == dataset:
+            results = {**baseline.get("routes", {}), **results}
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_file.write_text(json.dumps({"dataset": dataset, "routes": results}, indent=2) + "\n")
+        print(f"Wrote {baseline_file.relative_to(BASELINE_DIR.parent.parent)}")
+
+    print("ok   all budgets met" if not failures else f"{failures} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
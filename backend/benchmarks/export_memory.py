@@ -0,0 +1,114 @@
+"""Check that streaming exports use the same memory for small and large ranges.
+
+Usage (from backend/):
+    python -m benchmarks.export_memory [--small 5000] [--large 50000]
+
+Seeds two days with --small and --large tasks (one time entry each),
+streams each day's time-entries and tasks exports (CSV and NDJSON) through GET /api/export/ and
+through the async iterator, and reports the peak Python memory (tracemalloc)
+and throughput of each. Exits non-zero if the large export peaks at more than
+twice the small one (plus a small allowance) or if a row is missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+from .common import seed_day, setup_django, test_database
+
+# Fixed overhead (imports, caches, the response object) that is not per-row.
+ALLOWANCE_BYTES = 512 * 1024
+
+
+def _measure(consume) -> tuple[int, int, float]:
+    """(bytes streamed, peak traced bytes, seconds) of draining one export."""
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        size = consume()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, peak, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--small", type=int, default=5000, help="Tasks on the small day (several export chunks).")
+    parser.add_argument("--large", type=int, default=50000, help="Tasks on the large day.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client
+    from django.utils import timezone
+
+    from tasks.exports import Export
+
+    with test_database():
+        large_day = timezone.localdate()
+        small_day = large_day - timedelta(days=1)
+        days = {"small": (small_day, args.small), "large": (large_day, args.large)}
+        for day, tasks in days.values():
+            seed_day(day=day, tasks=tasks, entries_per_task=1)
+
+        client = Client()
+
+        def via_view(kind, fmt, day):
+            def consume():
+                response = client.get(f"/api/export/{kind}/?format={fmt}&start={day}&end={day}")
+                size = lines = 0
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+                return size, lines
+
+            return consume
+
+        def via_async(kind, fmt, day):
+            async def drain():
+                size = lines = 0
+                async for chunk in Export(kind=kind, format=fmt, user_id=None, start=day, end=day):
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+                return size, lines
+
+            return lambda: asyncio.run(drain())
+
+        # Warm up imports and caches so the first measurement is not inflated.
+        via_view("time-entries", "csv", small_day)()
+
+        failures = 0
+        print(f"{'export':<28} {'rows':>8} {'MiB':>8} {'peak KiB':>9} {'rows/s':>9}")
+        for path, runner in (("view", via_view), ("async", via_async)):
+            for kind in ("time-entries", "tasks"):
+                for fmt in ("csv", "ndjson"):
+                    peaks = {}
+                    for label, (day, tasks) in days.items():
+                        (size, lines), peak, seconds = _measure(runner(kind, fmt, day))
+                        expected = tasks + (fmt == "csv")
+                        if lines != expected:
+                            failures += 1
+                            print(f"FAIL {path} {kind} {fmt} {label}: {lines} lines, expected {expected}")
+                        peaks[label] = peak
+                        name = f"{path} {kind}.{fmt} ({label})"
+                        print(
+                            f"{name:<28} {tasks:>8} {size / 2**20:>8.1f} {peak / 1024:>9.0f} {tasks / seconds:>9.0f}"
+                        )
+                    flat = peaks["large"] <= 2 * peaks["small"] + ALLOWANCE_BYTES
+                    failures += not flat
+                    if not flat:
+                        print(f"FAIL {path} {kind}.{fmt}: peak memory grows with the number of rows")
+
+    print("ok   memory stays flat" if not failures else f"{failures} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
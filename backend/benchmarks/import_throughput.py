@@ -0,0 +1,90 @@
+"""Measure bulk-import throughput of tasks.imports on a generated file.
+
+Usage (from backend/):
+    python -m benchmarks.import_throughput [--rows 100000] [--format csv|ndjson] [--min-rate 100000]
+
+Writes --rows finished time entries spread over 20 task titles and 90 days to
+a temporary file, imports it into the anonymous bucket, then imports it again
+(every row must be skipped as already present). Reports rows per minute and
+exits non-zero below --min-rate, or if the rollups disagree with the rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .common import setup_django, test_database
+
+TITLES = 20
+DAYS = 90
+
+
+def _write_rows(handle, rows: int, fmt: str):
+    start = datetime(2024, 1, 1, 6, tzinfo=dt_timezone.utc)
+    columns = ["title", "start_time", "end_time"]
+    writer = csv.writer(handle)
+    if fmt == "csv":
+        writer.writerow(columns)
+    for index in range(rows):
+        begin = start + timedelta(days=index % DAYS, seconds=index // DAYS * 7)
+        record = [f"Habit {index % TITLES}", begin.isoformat(), (begin + timedelta(seconds=5)).isoformat()]
+        if fmt == "csv":
+            writer.writerow(record)
+        else:
+            handle.write(json.dumps(dict(zip(columns, record))) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--min-rate", type=float, default=100000, help="Rows per minute required.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db.models import Sum
+
+    from dashboards.models import DailyTaskRollup
+    from tasks.imports import import_time_entries
+    from tasks.models import TimeEntry
+
+    failures = 0
+    with test_database(), tempfile.NamedTemporaryFile("w+", suffix=f".{args.format}", newline="") as handle:
+        _write_rows(handle, args.rows, args.format)
+        handle.flush()
+
+        for label in ("import", "re-import"):
+            with open(handle.name, "rb") as stream:
+                result = import_time_entries(stream, format=args.format, user_id=None)
+            rate = result.rows / result.seconds * 60
+            print(
+                f"{label:<10} {result.rows} rows in {result.seconds:.2f}s = {rate:,.0f} rows/min "
+                f"({result.imported} imported, {result.skipped} skipped, {result.tasks_created} tasks created, "
+                f"{result.error_count} rejected)"
+            )
+            failures += result.error_count > 0
+            if label == "import":
+                failures += result.imported != args.rows
+                fast = rate >= args.min_rate
+                failures += not fast
+                print(f"{'ok  ' if fast else 'FAIL'} at least {args.min_rate:,.0f} rows/min")
+            else:
+                failures += result.skipped != args.rows
+
+        tracked = TimeEntry.objects.aggregate(total=Sum("duration_seconds"))["total"]
+        rolled = DailyTaskRollup.objects.aggregate(total=Sum("tracked_seconds"))["total"]
+        consistent = tracked == rolled == args.rows * 5
+        failures += not consistent
+        print(f"{'ok  ' if consistent else 'FAIL'} rollups match the imported entries ({rolled} s tracked)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
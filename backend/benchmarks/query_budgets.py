@@ -0,0 +1,76 @@
+"""Fail when an endpoint issues more SQL queries than its budget.
+
+Usage (from backend/):
+    python -m benchmarks.query_budgets
+
+Budgets are hard ceilings for a seeded day; raise one only together with the
+change that needs the extra round-trip.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from .common import seed_day, setup_django, test_database
+
+# (name, path, max queries)
+BUDGETS = [
+    # Day version (validators) + summary aggregate + per-task totals + productivity trend.
+    ("dashboard", "/api/dashboard/", 4),
+    # Same request again: served from the response cache.
+    ("dashboard (cached)", "/api/dashboard/", 1),
+    ("task stats", "/api/tasks/stats/", 2),
+    ("task stats (cached)", "/api/tasks/stats/", 1),
+]
+
+# Revalidating with the ETag of a first response must be a 304 that only reads
+# the day version table: (name, path, max queries).
+CONDITIONAL_BUDGETS = [
+    ("dashboard (304)", "/api/dashboard/", 1),
+    ("task list (304)", "/api/tasks/", 1),
+    ("task stats (304)", "/api/tasks/stats/", 1),
+]
+
+
+def run() -> int:
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    seed_day(tasks=25, entries_per_task=8)
+    cache.clear()
+    client = Client()
+
+    failures = 0
+    for name, path, budget in BUDGETS:
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(path)
+        used = len(captured.captured_queries)
+        ok = response.status_code == 200 and used <= budget
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {used:>3}/{budget} queries  HTTP {response.status_code}")
+        if not ok:
+            for query in captured.captured_queries:
+                print(f"       {query['sql']}")
+
+    for name, path, budget in CONDITIONAL_BUDGETS:
+        etag = client.get(path).get("ETag")
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(path, HTTP_IF_NONE_MATCH=etag or "")
+        used = len(captured.captured_queries)
+        ok = etag is not None and response.status_code == 304 and used <= budget
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {used:>3}/{budget} queries  HTTP {response.status_code}")
+    return failures
+
+
+def main():
+    setup_django()
+    with test_database():
+        failures = run()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Check that a burst of identical dashboard/stats requests is computed once.
+
+Usage (from backend/):
+    python -m benchmarks.response_cache [--threads 32] [--rounds 5]
+
+Each round invalidates the seeded day (as a write would) and then fires
+--threads simultaneous requests at /api/dashboard/ and /api/tasks/stats/.
+Reports the per-round hit/miss/coalesced counters and the latency of a cold
+versus a warm request; exits non-zero if a round computed a payload more
+than once or served stale figures after a write.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import seed_day, setup_django, test_database
+
+PATHS = {"dashboard": "/api/dashboard/", "stats": "/api/tasks/stats/"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.cache import cache
+    from django.db import connections
+    from django.test import Client
+    from django.utils import timezone
+
+    from core import response_cache
+    from tasks.models import Task
+    from tasks.versions import bump_day_versions
+
+    with test_database(file_backed=True):
+        seed_day(tasks=25, entries_per_task=8)
+        cache.clear()
+        connections.close_all()
+        today = timezone.localdate()
+
+        failures = 0
+        for round_number in range(1, args.rounds + 1):
+            bump_day_versions(user_id=None, dates=[today])
+            response_cache.reset_stats()
+            barrier = threading.Barrier(args.threads)
+
+            def worker(index):
+                client = Client()
+                barrier.wait()
+                for name, path in PATHS.items():
+                    client.get(path)
+                connections.close_all()
+
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                list(pool.map(worker, range(args.threads)))
+
+            counters = response_cache.stats()
+            line = "  ".join(
+                f"{name}: {c['miss']} miss / {c['coalesced']} coalesced / {c['hit']} hit"
+                for name, c in counters.items()
+            )
+            ok = all(c["miss"] == 1 for c in counters.values())
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} round {round_number}: {line}")
+
+        # A write must be visible on the very next read.
+        client = Client()
+        before = client.get("/api/tasks/stats/").json()["total"]
+        Task.objects.create(title="One more")
+        after = client.get("/api/tasks/stats/").json()["total"]
+        fresh = after == before + 1
+        failures += not fresh
+        print(f"{'ok  ' if fresh else 'FAIL'} invalidation on write: total {before} -> {after}")
+
+        cold, warm = [], []
+        for _ in range(20):
+            bump_day_versions(user_id=None, dates=[today])
+            started = time.perf_counter()
+            client.get("/api/dashboard/")
+            cold.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            client.get("/api/dashboard/")
+            warm.append(time.perf_counter() - started)
+        print(
+            f"dashboard p50: cold {statistics.median(cold) * 1000:.2f} ms, "
+            f"cached {statistics.median(warm) * 1000:.2f} ms"
+        )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
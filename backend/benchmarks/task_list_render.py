@@ -0,0 +1,96 @@
+"""Compare the task list renderer with TaskSerializer on one large day.
+
+Usage (from backend/):
+    python -m benchmarks.task_list_render [--tasks 1000] [--repeat 20]
+
+Seeds --tasks tasks (some with a running timer) on one day and reports the
+cost per 1,000 tasks of producing the /api/tasks/ payload:
+
+- "serializer": model instances through TaskSerializer (the previous path);
+- "values": `.values()` rows through tasks.listing.task_list_rows.
+
+Both with and without the query. Exits non-zero unless the two render to
+byte-identical JSON at the same instant.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import timedelta
+from unittest import mock
+
+from .common import seed_day, setup_django, test_database
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from tasks.listing import VALUE_FIELDS, task_list_rows
+    from tasks.models import Task, TimeEntry
+    from tasks.serializers import TaskSerializer
+    from tasks.services import with_timer_annotations
+    from tasks.totals import rebuild_task_totals
+
+    renderer = JSONRenderer()
+
+    with test_database():
+        seed_day(tasks=args.tasks, entries_per_task=3)
+        now = timezone.now()
+        running = Task.objects.order_by("id")[: max(1, args.tasks // 50)]
+        TimeEntry.objects.bulk_create(
+            [TimeEntry(task=task, start_time=now - timedelta(minutes=7, microseconds=i)) for i, task in enumerate(running)]
+        )
+        rebuild_task_totals([task.pk for task in running])
+
+        qs = with_timer_annotations(Task.objects.filter(date=timezone.localdate())).order_by("-created_at", "-id")
+        instances = list(qs.all())
+        rows = list(qs.values(*VALUE_FIELDS))
+
+        with mock.patch.object(timezone, "now", return_value=now):
+            before = renderer.render(TaskSerializer(instances, many=True).data)
+        after = renderer.render(task_list_rows(rows, now=now))
+        identical = before == after
+
+        scale = 1000 / len(instances)
+        timings = {
+            "serializer": (
+                _median_ms(lambda: TaskSerializer(instances, many=True).data, args.repeat),
+                _median_ms(lambda: TaskSerializer(list(qs.all()), many=True).data, args.repeat),
+            ),
+            "values": (
+                _median_ms(lambda: task_list_rows(rows), args.repeat),
+                _median_ms(lambda: task_list_rows(qs.values(*VALUE_FIELDS)), args.repeat),
+            ),
+        }
+
+    print(f"{len(instances)} tasks, {len(running)} with a running timer; ms per 1,000 tasks (p50)")
+    for name, (render_ms, total_ms) in timings.items():
+        print(f"  {name:<10}  render {render_ms * scale:8.2f}   query+render {total_ms * scale:8.2f}")
+    speedup = timings["serializer"][0] / timings["values"][0]
+    print(f"render speedup: {speedup:.1f}x")
+    print(f"{'ok  ' if identical else 'FAIL'} byte-identical JSON ({len(after)} bytes)")
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Hammer the start/stop timer endpoints from many threads.
+
+Usage (from backend/):
+    python -m benchmarks.timer_concurrency [--threads 16] [--requests 50] [--tasks 8]
+
+Every thread issues random start-timer/stop-timer calls against the tasks of
+one bucket. A sampler thread checks the single-running-timer rule while the
+load runs; at the end the rule, the absence of server errors, the rollup
+totals and the timer state stored on tasks (tasks.totals) are verified.
+Reports throughput; exits non-zero on any violation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per thread.")
+    parser.add_argument("--tasks", type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+    # Expected 400s ("no active timer") would otherwise flood the output.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.db import connections
+    from django.db.models import Sum
+    from django.test import Client
+
+    from dashboards.models import DailyTaskRollup
+    from dashboards.rollups import rebuild_task_rollups
+    from tasks.models import Task, TimeEntry
+    from tasks.totals import drifted_tasks
+
+    with test_database(file_backed=True):
+        tasks = Task.objects.bulk_create([Task(title=f"Task {i}") for i in range(args.tasks)])
+        task_ids = [task.pk for task in tasks]
+        rebuild_task_rollups(task_ids)
+        connections.close_all()
+
+        statuses: dict[int, int] = {}
+        violations = []
+        done = threading.Event()
+        lock = threading.Lock()
+
+        def sampler():
+            while not done.is_set():
+                running = TimeEntry.objects.filter(end_time__isnull=True).count()
+                if running > 1:
+                    violations.append(running)
+                time.sleep(0.005)
+            connections.close_all()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            client = Client()
+            for _ in range(args.requests):
+                action = rng.choice(["start-timer", "stop-timer"])
+                response = client.post(f"/api/tasks/{rng.choice(task_ids)}/{action}/")
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            connections.close_all()
+
+        watcher = threading.Thread(target=sampler)
+        watcher.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(worker, range(args.threads)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        watcher.join()
+
+        total = args.threads * args.requests
+        running = TimeEntry.objects.filter(end_time__isnull=True).count()
+        tracked = {
+            row["task_id"]: row["total"]
+            for row in TimeEntry.objects.values("task_id").annotate(total=Sum("duration_seconds"))
+        }
+        rollups_ok = all(
+            rollup.tracked_seconds == (tracked.get(rollup.task_id) or 0)
+            for rollup in DailyTaskRollup.objects.all()
+        )
+        drifted = drifted_tasks(Task.objects.all())
+        server_errors = sum(count for code, count in statuses.items() if code >= 500)
+
+        print(f"{total} requests from {args.threads} threads in {elapsed:.2f}s: {total / elapsed:.0f} req/s")
+        print(f"status codes: {dict(sorted(statuses.items()))}")
+        print(f"running timers at end: {running}; sampled violations: {len(violations)}")
+        print(f"rollup totals consistent: {rollups_ok}")
+        print(f"task totals consistent: {not drifted}")
+
+        failed = running > 1 or violations or server_errors or not rollups_ok or drifted
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
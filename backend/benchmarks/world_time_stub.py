@@ -0,0 +1,163 @@
+"""Exercise the World Time cache and circuit breaker against a local stub server.
+
+Usage (from backend/):
+    python -m benchmarks.world_time_stub
+
+Starts an HTTP stub on 127.0.0.1, points WORLD_TIME_URL at it and checks
+caching, background refresh, breaker opening/half-open recovery and the
+steady-state read latency. Exits non-zero if any expectation fails.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .common import setup_django
+
+
+class StubState:
+    mode = "ok"  # "ok" | "fail"
+    hits = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        StubState.hits += 1
+        if StubState.mode == "fail":
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps(
+            {
+                "timezone": "Asia/Kolkata",
+                "datetime": "2026-01-18T23:50:00.000000+05:30",
+                "utc_offset": "+05:30",
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+
+    from external_apis.world_time import CircuitOpenError, _cache, fetch_current_time
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    settings.WORLD_TIME_URL = f"http://127.0.0.1:{server.server_port}/api/ip"
+    settings.WORLD_TIME_TIMEOUT = 1
+    settings.WORLD_TIME_TTL_SECONDS = 0.3
+    settings.WORLD_TIME_FAILURE_THRESHOLD = 2
+    settings.WORLD_TIME_RESET_SECONDS = 0.5
+    _cache.reset()
+
+    failures = []
+
+    def check(name, condition):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}")
+        if not condition:
+            failures.append(name)
+
+    first = fetch_current_time()
+    check("cold read fetches upstream once", StubState.hits == 1)
+
+    calls = 10_000
+    started = time.perf_counter()
+    for _ in range(calls):
+        latest = fetch_current_time()
+    per_call_us = (time.perf_counter() - started) / calls * 1e6
+    check("warm reads never hit upstream", StubState.hits == 1)
+    check("served time advances with the local clock", latest["datetime"] > first["datetime"])
+    print(f"     steady-state read: {per_call_us:.1f} µs/call")
+
+    time.sleep(0.35)
+    started = time.perf_counter()
+    fetch_current_time()
+    stale_ms = (time.perf_counter() - started) * 1e3
+    check("stale read returns without waiting for upstream", stale_ms < 50)
+    check("stale read triggers a background refresh", wait_for(lambda: StubState.hits == 2))
+
+    StubState.mode = "fail"
+    for _ in range(2):
+        time.sleep(0.35)
+        fetch_current_time()
+        wait_for(lambda: not _cache._refreshing)
+    check("breaker opens after repeated failures", _cache.circuit_open)
+    hits = StubState.hits
+    for _ in range(100):
+        fetch_current_time()
+    check("open breaker still serves the cached time", fetch_current_time()["timezone"] == "Asia/Kolkata")
+    check("open breaker stops calling upstream", StubState.hits == hits)
+
+    payload = _cache._payload
+    _cache._payload = None
+    try:
+        fetch_current_time()
+        check("cold read with open breaker raises CircuitOpenError", False)
+    except CircuitOpenError:
+        check("cold read with open breaker raises CircuitOpenError", True)
+    _cache._payload = payload
+
+    StubState.mode = "ok"
+    time.sleep(0.55)
+    fetch_current_time()
+    recovered = wait_for(lambda: StubState.hits == hits + 1 and not _cache.circuit_open)
+    check("half-open probe recovers the breaker", recovered)
+
+    # The async path shares the cache and breaker but fetches through httpx.
+    import asyncio
+
+    from external_apis.world_time import afetch_current_time
+
+    _cache.reset()
+    hits = StubState.hits
+
+    async def async_reads():
+        first = await afetch_current_time()
+        for _ in range(1000):
+            latest = await afetch_current_time()
+        return first, latest
+
+    first, latest = asyncio.run(async_reads())
+    check("async cold read fetches upstream once", StubState.hits == hits + 1)
+    check("async warm reads serve the cached time", latest["datetime"] >= first["datetime"])
+
+    # Under WSGI every async_to_sync call runs on a loop that closes right after.
+    time.sleep(0.35)
+    hits = StubState.hits
+    asyncio.run(afetch_current_time())
+    refreshed = wait_for(lambda: StubState.hits == hits + 1 and not _cache._refreshing)
+    check("async stale read refreshes after its loop closed", refreshed)
+    time.sleep(0.35)
+    asyncio.run(afetch_current_time())
+    check("later async refreshes still run", wait_for(lambda: StubState.hits == hits + 2))
+
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
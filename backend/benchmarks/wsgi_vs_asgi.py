@@ -0,0 +1,129 @@
+"""Compare concurrent-request throughput of the WSGI and ASGI read paths.
+
+Usage (from backend/):
+    python -m benchmarks.wsgi_vs_asgi [--requests 400] [--concurrency 16]
+
+Both modes run in-process against the same seeded test database: WSGI drives
+the DRF views from a thread pool (like gunicorn gthread workers), ASGI drives
+the async views (settings.ASYNC_VIEWS) from one event loop (like a uvicorn
+worker). World time is served by a local stub so no external calls are made.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import seed_day, setup_django, test_database
+
+PATHS = [
+    "/api/tasks/",
+    "/api/tasks/stats/",
+    "/api/dashboard/",
+    "/api/tasks/world-time/",
+]
+
+
+def _use_async_views(enabled: bool):
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import core.urls
+
+    settings.ASYNC_VIEWS = enabled
+    importlib.reload(core.urls)
+    clear_url_caches()
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1e3, p99 * 1e3
+
+
+def run_wsgi(path, total, concurrency):
+    from django.db import connections
+    from django.test import Client
+
+    local = threading.local()
+
+    def one(_):
+        client = getattr(local, "client", None) or Client()
+        local.client = client
+        started = time.perf_counter()
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, initializer=connections.close_all) as pool:
+        latencies = list(pool.map(one, range(total)))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+def run_asgi(path, total, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with gate:
+                started = time.perf_counter()
+                response = await client.get(path)
+                assert response.status_code == 200, (path, response.status_code)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(total)))
+        return _summary(latencies, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint and mode.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    setup_django()
+    # Under this much concurrency SQLite queries queue for its lock; the slow
+    # query and slow request warnings would flood the output.
+    logging.getLogger("core.timing").setLevel(logging.ERROR)
+
+    from django.conf import settings
+
+    from external_apis.world_time import _cache
+
+    from .world_time_stub import StubHandler, ThreadingHTTPServer
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.WORLD_TIME_URL = f"http://127.0.0.1:{server.server_port}/api/ip"
+    _cache.reset()
+
+    with test_database():
+        seed_day(tasks=40, entries_per_task=10)
+
+        print(f"{args.requests} requests/endpoint, concurrency {args.concurrency}")
+        print(f"{'endpoint':<24} {'mode':<5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for path in PATHS:
+            for mode, runner, use_async in (("wsgi", run_wsgi, False), ("asgi", run_asgi, True)):
+                _use_async_views(use_async)
+                runner(path, min(args.requests, 20), args.concurrency)  # warm-up
+                rps, p50, p99 = runner(path, args.requests, args.concurrency)
+                print(f"{path:<24} {mode:<5} {rps:>8.0f} {p50:>8.2f} {p99:>8.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
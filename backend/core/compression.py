@@ -0,0 +1,110 @@
+"""Brotli/gzip compression of (non-streaming) responses above a size threshold.
+
+Takes the place of django.middleware.gzip.GZipMiddleware: it prefers brotli
+when the client accepts it and the optional `brotli` package is installed,
+skips bodies smaller than API_COMPRESSION_MIN_BYTES (not worth the CPU), and
+leaves streaming responses alone, so the SSE change stream is never buffered.
+Strong ETags become weak, as with GZipMiddleware; the conditional GET
+handling in tasks.versions compares them weakly.
+
+Configured in core/settings.py: API_COMPRESSION, API_COMPRESSION_MIN_BYTES,
+API_COMPRESSION_GZIP_LEVEL, API_COMPRESSION_BROTLI_QUALITY.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str) -> str | None:
+    """The content coding to use for this Accept-Encoding header, if any."""
+
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.API_COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.API_COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    # Runs natively under ASGI too: the async views do not hop to a thread for it.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not settings.API_COMPRESSION or response.streaming:
+            return response
+        if len(response.content) < settings.API_COMPRESSION_MIN_BYTES:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,185 @@
+"""Prometheus metrics, served at /metrics and aggregated across worker processes.
+
+MetricsMiddleware records per route (the view, or viewset class + action,
+e.g. `tasks.views.TaskViewSet.stats`):
+
+- http_requests_total{route,method,status}
+- http_request_errors_total{route,method} (5xx responses)
+- http_request_duration_seconds{route,method} (histogram; streaming
+  responses up to their headers)
+- db_queries_total{route} and db_query_duration_seconds_total{route} (via the
+  core.timing query recorder)
+
+Domain counters are incremented where things happen: timer starts/stops and
+populate calls (tasks.services), World Time upstream fetches and circuit
+openings (external_apis.world_time) and response cache outcomes
+(core.response_cache).
+
+Under gunicorn every worker is a separate process; gunicorn.conf.py sets
+PROMETHEUS_MULTIPROC_DIR so each worker writes its values to memory-mapped
+files there, and /metrics sums them over all workers (alive or recycled), so
+any worker can answer a scrape. Without that variable (runserver, one
+process) the in-process registry is served.
+
+Needs the optional `prometheus_client` package and METRICS=True; otherwise
+the middleware removes itself, the endpoint answers 404 and the counters are
+no-ops. Set METRICS_TOKEN to require `Authorization: Bearer <token>`; with
+DEBUG off the endpoint answers 403 until one is set, so it is never public
+in production.
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from . import timing
+from .responses import json_response
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+ENABLED = settings.METRICS and prometheus_client is not None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoOp:
+    """Stands in for a metric when metrics are disabled."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if not ENABLED:
+        return _NoOp()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+HTTP_REQUESTS = _metric("Counter", "http_requests", "HTTP requests served.", ("route", "method", "status"))
+HTTP_ERRORS = _metric("Counter", "http_request_errors", "HTTP requests answered with a 5xx.", ("route", "method"))
+HTTP_LATENCY = _metric(
+    "Histogram",
+    "http_request_duration_seconds",
+    "Time to produce the response (headers, for streams).",
+    ("route", "method"),
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = _metric("Counter", "db_queries", "SQL queries executed while serving requests.", ("route",))
+DB_SECONDS = _metric(
+    "Counter", "db_query_duration_seconds", "Time spent executing SQL while serving requests.", ("route",)
+)
+
+TIMER_STARTS = _metric("Counter", "task_timer_starts", "Task timers started.")
+TIMER_STOPS = _metric("Counter", "task_timer_stops", "Task timers stopped (including ones closed by a new start).")
+POPULATE_CALLS = _metric("Counter", "task_populate_calls", "Calls creating template tasks for dates.")
+POPULATE_CREATED = _metric("Counter", "task_populate_created", "Tasks created from templates.")
+
+WORLD_TIME_FETCHES = _metric(
+    "Counter", "world_time_upstream_fetches", "World Time upstream requests by outcome.", ("outcome",)
+)
+WORLD_TIME_CIRCUIT_OPENS = _metric("Counter", "world_time_circuit_opens", "Times the World Time circuit opened.")
+RESPONSE_CACHE = _metric(
+    "Counter", "response_cache_requests", "Response cache lookups by outcome.", ("endpoint", "outcome")
+)
+
+
+def _route(request) -> str:
+    # Unresolved paths (404s, static files) share one label to bound cardinality.
+    if getattr(request, "resolver_match", None) is None:
+        return "unmatched"
+    return timing.view_name(request)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        timing.install_query_recorder()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorded, token = timing.begin(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.end(token)
+        self.record(request, response, recorded, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        recorded, token = timing.begin(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.end(token)
+        self.record(request, response, recorded, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def record(request, response, recorded, seconds: float):
+        route = _route(request)
+        method = request.method
+        HTTP_REQUESTS.labels(route, method, str(response.status_code)).inc()
+        HTTP_LATENCY.labels(route, method).observe(seconds)
+        if response.status_code >= 500:
+            HTTP_ERRORS.labels(route, method).inc()
+        if recorded.queries:
+            DB_QUERIES.labels(route).inc(recorded.queries)
+            DB_SECONDS.labels(route).inc(recorded.sql_seconds)
+
+
+def _authorized(request) -> bool:
+    token = settings.METRICS_TOKEN
+    if not token:
+        return settings.DEBUG
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())
+
+
+def metrics_view(request):
+    """GET /metrics: Prometheus text exposition of every worker's metrics."""
+
+    if not ENABLED:
+        return json_response({"detail": "Metrics are disabled."}, status=404)
+    if not settings.METRICS_TOKEN and not settings.DEBUG:
+        return json_response({"detail": "Set METRICS_TOKEN to scrape metrics with DEBUG off."}, status=403)
+    if not _authorized(request):
+        return json_response({"detail": "Invalid or missing metrics token."}, status=401)
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    response = HttpResponse(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+    response["Cache-Control"] = "no-store"
+    return response
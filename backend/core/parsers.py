@@ -0,0 +1,38 @@
+"""Request parsers matching core.renderers (configured in settings.REST_FRAMEWORK).
+
+- ORJSONParser: DRF's JSONParser on orjson for UTF-8 bodies; other charsets,
+  non-strict JSON (STRICT_JSON = False) and a missing orjson use the stdlib.
+- MessagePackParser: `application/msgpack` request bodies (optional `msgpack`).
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+
+class ORJSONParser(parsers.JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower().replace("_", "-") not in {"utf-8", "utf8"}:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError("MessagePack parse error - %s" % (str(exc) or type(exc).__name__))
@@ -0,0 +1,68 @@
+"""Faster renderers for the API (configured in settings.REST_FRAMEWORK).
+
+- ORJSONRenderer: drop-in for DRF's JSONRenderer backed by orjson. Values
+  orjson does not handle the same way (datetimes, decimals, lazy strings...)
+  go through DRF's own JSONEncoder, so the bytes are identical to the stdlib
+  renderer's. Falls back to it for indented or ASCII-only output (non-default
+  COMPACT_JSON / UNICODE_JSON), for payloads orjson rejects, and when orjson
+  is not installed.
+- MessagePackRenderer: `application/msgpack`, for clients that ask for it in
+  Accept (or `?format=msgpack`). Needs the optional `msgpack` package; values
+  are converted exactly as for JSON (datetimes as the same ISO strings).
+
+Both count as `render` time in the Server-Timing header (core.timing).
+"""
+
+from __future__ import annotations
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from .timing import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    fast = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("render"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+        fast = self.fast and self.compact and not self.ensure_ascii
+        if not fast or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # e.g. integers beyond 64 bits or non-string keys.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer: keep the output valid inside <script> tags.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with timed("render"):
+            return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,169 @@
+"""Response payload cache keyed by (endpoint, user bucket, day).
+
+Each (bucket, day) has a *generation* stored in the cache; payload keys embed
+it. Invalidation bumps the generation instead of deleting keys, so a reader
+that computed from pre-write data can only store its result under the old,
+never-read-again key. Generations start from a time-based value, so one
+evicted by the backend can never be mistaken for an older one.
+
+A miss takes a short lock (cache.add) so that a burst of identical requests
+computes the payload once; the others wait for it for up to LOCK_WAIT_SECONDS
+and only compute themselves if it does not show up.
+
+Backend: the "default" entry of settings.CACHES (CACHE_URL). Payloads live
+for RESPONSE_CACHE_SECONDS at most.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+# Key for "every day of the bucket" (e.g. stats without a date).
+ALL_DAYS = "all"
+
+LOCK_SECONDS = 10
+LOCK_WAIT_SECONDS = 2.0
+_POLL_SECONDS = 0.02
+
+_KEY_PREFIX = "rc1"
+
+_stats_lock = threading.Lock()
+_stats: Counter = Counter()
+
+
+def _count(endpoint: str, outcome: str):
+    with _stats_lock:
+        _stats[(endpoint, outcome)] += 1
+    metrics.RESPONSE_CACHE.labels(endpoint, outcome).inc()
+
+
+def stats() -> dict:
+    """Per-process counters: {endpoint: {"hit": n, "miss": n, "coalesced": n}}."""
+
+    with _stats_lock:
+        snapshot = dict(_stats)
+    result: dict[str, dict[str, int]] = {}
+    for (endpoint, outcome), count in sorted(snapshot.items()):
+        result.setdefault(endpoint, {"hit": 0, "miss": 0, "coalesced": 0})[outcome] = count
+    return result
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _bucket(user_id) -> str:
+    return "anon" if user_id is None else str(user_id)
+
+
+def _generation_key(user_id, day) -> str:
+    return f"{_KEY_PREFIX}:gen:{_bucket(user_id)}:{day}"
+
+
+def _new_generation() -> int:
+    return time.time_ns()
+
+
+def invalidate(*, user_id, dates):
+    """Drop the cached payloads of these days (and the bucket-wide ones)."""
+
+    keys = [_generation_key(user_id, day) for day in {*map(str, dates), ALL_DAYS}]
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Never read yet (or evicted): any fresh generation invalidates.
+            cache.set(key, _new_generation(), timeout=None)
+
+
+def _payload_key(endpoint: str, user_id, day, generation) -> str:
+    return f"{_KEY_PREFIX}:{endpoint}:{_bucket(user_id)}:{day}:{generation}"
+
+
+def _generation(user_id, day) -> int:
+    key = _generation_key(user_id, day)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_or_compute(endpoint: str, *, user_id, day, compute):
+    """Return (payload, outcome) where outcome is "hit", "miss" or "coalesced"."""
+
+    day = str(day)
+    key = _payload_key(endpoint, user_id, day, _generation(user_id, day))
+    payload = cache.get(key)
+    if payload is not None:
+        _count(endpoint, "hit")
+        return payload, "hit"
+
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, timeout=LOCK_SECONDS):
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_SECONDS)
+            payload = cache.get(key)
+            if payload is not None:
+                _count(endpoint, "coalesced")
+                return payload, "coalesced"
+        lock_key = None
+
+    try:
+        payload = compute()
+        cache.set(key, payload, timeout=settings.RESPONSE_CACHE_SECONDS)
+    finally:
+        if lock_key:
+            cache.delete(lock_key)
+    _count(endpoint, "miss")
+    return payload, "miss"
+
+
+async def _ageneration(user_id, day) -> int:
+    key = _generation_key(user_id, day)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, _new_generation(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+async def aget_or_compute(endpoint: str, *, user_id, day, compute):
+    """Async variant of get_or_compute(); `compute` is a coroutine function."""
+
+    day = str(day)
+    key = _payload_key(endpoint, user_id, day, await _ageneration(user_id, day))
+    payload = await cache.aget(key)
+    if payload is not None:
+        _count(endpoint, "hit")
+        return payload, "hit"
+
+    lock_key = f"{key}:lock"
+    if not await cache.aadd(lock_key, 1, timeout=LOCK_SECONDS):
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+            payload = await cache.aget(key)
+            if payload is not None:
+                _count(endpoint, "coalesced")
+                return payload, "coalesced"
+        lock_key = None
+
+    try:
+        payload = await compute()
+        await cache.aset(key, payload, timeout=settings.RESPONSE_CACHE_SECONDS)
+    finally:
+        if lock_key:
+            await cache.adelete(lock_key)
+    _count(endpoint, "miss")
+    return payload, "miss"
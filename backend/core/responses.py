@@ -0,0 +1,99 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+# The configured JSON renderer (first in DEFAULT_RENDERER_CLASSES).
+_renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+_negotiation = DefaultContentNegotiation()
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    """Render `data` exactly like a DRF Response would, for plain (async) Django views."""
+
+    return HttpResponse(
+        _renderer.render(data),
+        content_type="application/json",
+        status=status,
+    )
+
+
+def api_response(request, data, status: int = 200) -> HttpResponse:
+    """Render `data` with the renderer negotiated for `request` by `shadows_drf_view`, like a DRF Response."""
+
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is None:
+        return json_response(data, status=status)
+    response = HttpResponse(
+        renderer.render(data, request.accepted_media_type, {}),
+        content_type=f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type,
+        status=status,
+    )
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def method_not_allowed(request) -> HttpResponse:
+    return json_response({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+
+def _negotiate(request):
+    """(renderer, media type) DRF would pick for `request`, or None if only the DRF view can answer it."""
+
+    renderers = [renderer_class() for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        renderer, media_type = _negotiation.select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        return None
+    # The browsable API needs the DRF view itself.
+    return None if isinstance(renderer, BrowsableAPIRenderer) else (renderer, media_type)
+
+
+def shadows_drf_view(drf_view):
+    """Decorate an async view routed ahead of `drf_view` (settings.ASYNC_VIEWS).
+
+    The async view only answers what it answers exactly like `drf_view`: GETs
+    without an Authorization header (it knows the session from
+    request.auser(), not DRF's other authentication classes such as Basic
+    auth) whose Accept negotiates a JSON or MessagePack renderer. Every other
+    request is passed to `drf_view` on a thread. The async view renders with
+    `api_response(request, ...)`, and its exceptions go through the API
+    exception handler, so errors are JSON as on the DRF route.
+    """
+
+    sync_view = sync_to_async(drf_view)
+
+    def decorator(async_view):
+        @csrf_exempt  # Unsafe methods go to drf_view, which checks CSRF itself.
+        @wraps(async_view)
+        async def view(request, *args, **kwargs):
+            negotiated = None
+            if request.method == "GET" and "HTTP_AUTHORIZATION" not in request.META:
+                negotiated = _negotiate(request)
+            if negotiated is None:
+                return await sync_view(request, *args, **kwargs)
+
+            request.accepted_renderer, request.accepted_media_type = negotiated
+            try:
+                return await async_view(request, *args, **kwargs)
+            except Exception as exc:
+                handled = api_settings.EXCEPTION_HANDLER(exc, {"request": request, "view": None})
+                if handled is None:
+                    raise
+                response = api_response(request, handled.data, status=handled.status_code)
+                for header, value in handled.items():
+                    if header.lower() != "content-type":
+                        response[header] = value
+                return response
+
+        view.drf_view = sync_view
+        return view
+
+    return decorator
@@ -1,6 +1,9 @@
 import os
+import tempfile
+import warnings
+from importlib.util import find_spec
 from pathlib import Path
-from urllib.parse import unquote, urlparse
+from urllib.parse import parse_qsl, unquote, urlparse
 
 from dotenv import load_dotenv
 
@@ -27,6 +30,86 @@ def env_list(name: str, default: list[str] | None = None) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+# DATABASE_URL query parameters -> (setting, option, type). See database_config_from_url().
+_POOL_PARAMS = {
+    "pool_min_size": ("min_size", int),
+    "pool_max_size": ("max_size", int),
+    "pool_timeout": ("timeout", float),
+    "pool_max_idle": ("max_idle", float),
+    "pool_max_lifetime": ("max_lifetime", float),
+}
+_LIBPQ_PARAMS = {
+    "sslmode",
+    "sslrootcert",
+    "sslcert",
+    "sslkey",
+    "connect_timeout",
+    "application_name",
+    "target_session_attrs",
+}
+
+
+def _connection_settings(engine: str, query: str) -> dict:
+    """CONN_MAX_AGE, CONN_HEALTH_CHECKS and OPTIONS from DATABASE_URL query parameters.
+
+    Any backend: conn_max_age (seconds, or "none" to never close),
+    conn_health_checks. Postgres: pool, pool_min_size, pool_max_size,
+    pool_timeout, pool_max_idle, pool_max_lifetime (psycopg 3 connection pool),
+    statement_timeout (milliseconds) and the libpq options in _LIBPQ_PARAMS
+    (sslmode, ...). SQLite: timeout (seconds to wait for a lock) and
+    transaction_mode. Unknown or invalid parameters, and a pool without
+    psycopg_pool installed, are ignored with a warning rather than taking the
+    database down.
+    """
+
+    postgres = engine.endswith("postgresql")
+    config: dict = {}
+    options: dict = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        name = name.strip().lower()
+        value = value.strip()
+        try:
+            if name == "conn_max_age":
+                config["CONN_MAX_AGE"] = None if value.lower() in {"none", "forever"} else int(value)
+            elif name == "conn_health_checks":
+                config["CONN_HEALTH_CHECKS"] = value.lower() in {"1", "true", "yes", "y", "on"}
+            elif postgres and name == "pool":
+                if value.lower() in {"1", "true", "yes", "y", "on"}:
+                    options.setdefault("pool", {})
+            elif postgres and name in _POOL_PARAMS:
+                key, cast = _POOL_PARAMS[name]
+                options.setdefault("pool", {})[key] = cast(value)
+            elif postgres and name == "statement_timeout":
+                options["options"] = f"-c statement_timeout={int(value)}"
+            elif postgres and name in _LIBPQ_PARAMS:
+                options[name] = value
+            elif not postgres and name == "timeout":
+                options["timeout"] = float(value)
+            elif not postgres and name == "transaction_mode":
+                options["transaction_mode"] = value.upper()
+            else:
+                warnings.warn(f"Ignoring unknown DATABASE_URL parameter {name!r}.")
+        except ValueError:
+            warnings.warn(f"Ignoring invalid DATABASE_URL parameter {name}={value!r}.")
+
+    if "pool" in options and find_spec("psycopg_pool") is None:
+        # With psycopg2 Django would only fail at the first query.
+        warnings.warn(
+            "DATABASE_URL: pool needs psycopg 3 with its pool (pip install 'psycopg[binary,pool]'); "
+            "using persistent connections instead."
+        )
+        del options["pool"]
+    if "pool" in options:
+        # Django's pool (psycopg 3 only) replaces persistent connections.
+        options["pool"] = options["pool"] or True
+        if config.get("CONN_MAX_AGE", 0) != 0:
+            warnings.warn("DATABASE_URL: conn_max_age is ignored when pool is enabled.")
+        config["CONN_MAX_AGE"] = 0
+    if options:
+        config["OPTIONS"] = options
+    return config
+
+
 def database_config_from_url(url: str):
     # Be tolerant of common deployment formatting issues:
     # - accidental whitespace
@@ -46,25 +129,66 @@ def database_config_from_url(url: str):
             "PASSWORD": unquote(parsed.password or ""),
             "HOST": parsed.hostname or "",
             "PORT": str(parsed.port or ""),
+            **_connection_settings("django.db.backends.postgresql", parsed.query),
         }
 
     if scheme in {"sqlite", "sqlite3"}:
         # sqlite:///relative/path.db  or sqlite:////absolute/path.db
-        raw_path = parsed.path or ""
+        raw_path = unquote(parsed.path or "")
         if raw_path in {"", "/"}:
             db_path = BASE_DIR / "db.sqlite3"
+        elif raw_path.startswith("//"):
+            db_path = Path(raw_path[1:])
         else:
-            # Remove leading slash so it works cross-platform with relative paths.
-            candidate = Path(unquote(raw_path.lstrip("/")))
-            db_path = candidate if candidate.is_absolute() else (BASE_DIR / candidate)
+            # Remove the leading slash so the path is relative to backend/.
+            db_path = BASE_DIR / raw_path.lstrip("/")
         return {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": db_path,
+            **_connection_settings("django.db.backends.sqlite3", parsed.query),
         }
 
     raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme or '(empty)'}")
 
 
+def cache_config_from_url(url: str):
+    # locmem://[name]  file:///relative/dir or file:////absolute/dir
+    # redis://[:password@]host:port/db (or rediss://)  dummy://
+    normalized = (url or "").strip().strip('"').strip("'")
+    parsed = urlparse(normalized)
+    scheme = (parsed.scheme or "").lower()
+
+    if scheme in {"", "locmem"}:
+        return {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": parsed.netloc or "task-scheduler",
+        }
+
+    if scheme == "file":
+        raw_path = unquote(parsed.path or "")
+        if raw_path.startswith("//"):
+            location = Path(raw_path[1:])
+        else:
+            location = BASE_DIR / (raw_path.lstrip("/") or "cache")
+        return {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": location,
+        }
+
+    if scheme in {"redis", "rediss"}:
+        # Needs the optional `redis` package. Any Redis-protocol server works
+        # (Redis, Valkey, KeyDB, a local container...).
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": normalized,
+        }
+
+    if scheme == "dummy":
+        return {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+
+    raise ValueError(f"Unsupported CACHE_URL scheme: {scheme}")
+
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-later")
 
@@ -98,6 +222,7 @@ INSTALLED_APPS = [
     "tasks",
     "dashboards",
     "external_apis",
+    "events",
 ]
 
 MIDDLEWARE = [
@@ -105,8 +230,20 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
 
-    # Serve static files in production without needing Nginx.
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # Prometheus request/query metrics for /metrics (see core.metrics); removes
+    # itself when METRICS is off or prometheus_client is not installed.
+    "core.metrics.MetricsMiddleware",
+
+    # Compresses what the middleware below returns (see core.compression).
+    "core.compression.CompressionMiddleware",
+
+    # Server-Timing headers and slow request/query logs (see core.timing);
+    # removes itself when REQUEST_TIMING is off.
+    "core.timing.RequestTimingMiddleware",
+
+    # Serve static files in production without needing Nginx (WhiteNoise, async
+    # capable so ASGI requests are not funnelled through a thread; see core.staticfiles).
+    "core.staticfiles.StaticFilesMiddleware",
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -146,6 +283,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+# Route the read-heavy endpoints to async views (see core/urls.py). render_start.sh
+# turns this on for SERVER_MODE=asgi; async views also work, just slower, under WSGI.
+# Not a throughput win: benchmarks/wsgi_vs_asgi.py measures these reads slower under
+# ASGI (Django's own middleware and the ORM still hop to a thread per request). Use
+# SERVER_MODE=asgi for many open change streams or slow upstream calls, not for speed.
+ASYNC_VIEWS = env_bool("ASYNC_VIEWS", default=False)
+
 # Database
 # Render sets DATABASE_URL for Postgres; but misconfiguration can leave it blank.
 # Never crash at import-time: fall back to SQLite while still surfacing the error
@@ -171,6 +315,34 @@ else:
         }
     }
 
+# Postgres without a pool: keep connections open between requests instead of
+# paying the connect (and TLS) handshake on every one. Under ASGI each request
+# runs in its own thread context, so persistent connections would pile up;
+# use ?pool=true there instead. DATABASE_URL parameters take precedence.
+if DATABASES["default"]["ENGINE"].endswith("postgresql") and "pool" not in DATABASES["default"].get("OPTIONS", {}):
+    DATABASES["default"].setdefault("CONN_MAX_AGE", 0 if os.getenv("SERVER_MODE", "wsgi") == "asgi" else 60)
+    DATABASES["default"].setdefault("CONN_HEALTH_CHECKS", True)
+
+# `manage.py test` on SQLite: a temporary file instead of the in-memory default,
+# which rejects writes from several threads ("database table is locked"); the
+# timer concurrency test (tasks/tests) needs them.
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    DATABASES["default"].setdefault("TEST", {}).setdefault(
+        "NAME", str(Path(tempfile.gettempdir()) / f"test_{Path(DATABASES['default']['NAME']).stem}.sqlite3")
+    )
+
+# Cache (dashboard/stats response cache, see core.response_cache). Defaults to a
+# per-process in-memory cache; use file:// or redis:// to share it between workers.
+try:
+    CACHES = {"default": cache_config_from_url(os.getenv("CACHE_URL", "locmem://"))}
+except ValueError:
+    # Same policy as DATABASE_URL: keep the process alive on a malformed value.
+    CACHES = {"default": cache_config_from_url("locmem://")}
+
+# Seconds a cached dashboard/stats payload may live. Writes invalidate entries
+# immediately; this only bounds memory for days nobody looks at again.
+RESPONSE_CACHE_SECONDS = int(os.getenv("RESPONSE_CACHE_SECONDS", "300"))
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = "en-us"
@@ -208,10 +380,31 @@ LOGGING = {
         }
     },
     "root": {"handlers": ["console"], "level": LOG_LEVEL},
+    "loggers": {
+        # Slow request/query warnings (core.timing), kept even when LOG_LEVEL is higher.
+        "core.timing": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
 }
 
 # DRF – disable auth for demo
+# Render/parse JSON with orjson (core.renderers) when installed; the output is
+# byte-identical to DRF's stdlib JSONRenderer. MessagePack (`Accept:
+# application/msgpack`) is offered when the `msgpack` package is installed.
+API_FAST_JSON = env_bool("API_FAST_JSON", default=True)
+API_MSGPACK = env_bool("API_MSGPACK", default=True) and find_spec("msgpack") is not None
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer" if API_FAST_JSON else "rest_framework.renderers.JSONRenderer",
+        *(["core.renderers.MessagePackRenderer"] if API_MSGPACK else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser" if API_FAST_JSON else "rest_framework.parsers.JSONParser",
+        *(["core.parsers.MessagePackParser"] if API_MSGPACK else []),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
@@ -219,3 +412,69 @@ REST_FRAMEWORK = {
     # response for DB-not-ready errors instead of HTML 500 pages.
     "EXCEPTION_HANDLER": "core.exception_handler.custom_exception_handler",
 }
+
+# Request timing (core.timing): warnings for requests/queries slower than the
+# thresholds below and, with REQUEST_TIMING_HEADER, Server-Timing headers (sql,
+# serialize, render, view). The header reveals internals to clients, and DEBUG
+# defaults to True, so it is opt-in.
+REQUEST_TIMING = env_bool("REQUEST_TIMING", default=DEBUG)
+REQUEST_TIMING_HEADER = env_bool("REQUEST_TIMING_HEADER", default=False)
+REQUEST_TIMING_SLOW_REQUEST_MS = float(os.getenv("REQUEST_TIMING_SLOW_REQUEST_MS", "500"))
+REQUEST_TIMING_SLOW_QUERY_MS = float(os.getenv("REQUEST_TIMING_SLOW_QUERY_MS", "100"))
+
+# Prometheus metrics (core.metrics) at /metrics, when the `prometheus_client`
+# package is installed. Under gunicorn, gunicorn.conf.py sets
+# PROMETHEUS_MULTIPROC_DIR so the endpoint reports the sum over all workers.
+# METRICS_TOKEN requires `Authorization: Bearer <token>` to scrape; with DEBUG
+# off the endpoint refuses to answer without one. On by default with DEBUG or
+# once a token is set.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+METRICS = (
+    env_bool("METRICS", default=DEBUG or bool(METRICS_TOKEN)) and find_spec("prometheus_client") is not None
+)
+
+# Response compression (core.compression): brotli (if installed) or gzip, for
+# non-streaming responses of at least API_COMPRESSION_MIN_BYTES.
+API_COMPRESSION = env_bool("API_COMPRESSION", default=True)
+API_COMPRESSION_MIN_BYTES = int(os.getenv("API_COMPRESSION_MIN_BYTES", "1024"))
+API_COMPRESSION_GZIP_LEVEL = int(os.getenv("API_COMPRESSION_GZIP_LEVEL", "6"))
+API_COMPRESSION_BROTLI_QUALITY = int(os.getenv("API_COMPRESSION_BROTLI_QUALITY", "5"))
+
+# World Time API proxy (external_apis.world_time): cached, refreshed in the background,
+# and guarded by a circuit breaker. Point WORLD_TIME_URL at a local stub for testing.
+WORLD_TIME_URL = os.getenv("WORLD_TIME_URL", "https://worldtimeapi.org/api/ip")
+WORLD_TIME_TIMEOUT = float(os.getenv("WORLD_TIME_TIMEOUT", "5"))
+WORLD_TIME_TTL_SECONDS = float(os.getenv("WORLD_TIME_TTL_SECONDS", "300"))
+WORLD_TIME_FAILURE_THRESHOLD = int(os.getenv("WORLD_TIME_FAILURE_THRESHOLD", "3"))
+WORLD_TIME_RESET_SECONDS = float(os.getenv("WORLD_TIME_RESET_SECONDS", "60"))
+
+# Opt-in keyset pagination (tasks.pagination): clients pass ?page_size= or ?cursor=.
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+# Conditional GET (tasks.versions): responses for past days without a running timer
+# may be reused by browsers/proxies for this long without revalidating.
+PAST_DAY_CACHE_SECONDS = int(os.getenv("PAST_DAY_CACHE_SECONDS", "86400"))
+
+# Server-Sent Events change stream (events.broker, GET /api/events/). Streams in
+# other worker processes pick up new events by polling every POLL seconds; each
+# connection is closed after MAX seconds and the browser resumes it.
+CHANGE_STREAM_POLL_SECONDS = float(os.getenv("CHANGE_STREAM_POLL_SECONDS", "2"))
+CHANGE_STREAM_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_STREAM_HEARTBEAT_SECONDS", "15"))
+CHANGE_STREAM_MAX_SECONDS = float(os.getenv("CHANGE_STREAM_MAX_SECONDS", "300"))
+# Streams served at once by one WSGI process: each holds one of its threads
+# (GUNICORN_THREADS, 4 by default). Further connections get 204 and the client
+# falls back to refetching. Async streams under ASGI are not capped.
+CHANGE_STREAM_MAX_SYNC_STREAMS = int(os.getenv("CHANGE_STREAM_MAX_SYNC_STREAMS", "2"))
+CHANGE_EVENTS_RETENTION_HOURS = float(os.getenv("CHANGE_EVENTS_RETENTION_HOURS", "24"))
+
+# `manage.py archive_time_entries` (tasks.archive) moves finished time entries
+# that started more than this many days ago into per-(task, day) summaries.
+TIME_ENTRY_ARCHIVE_DAYS = int(os.getenv("TIME_ENTRY_ARCHIVE_DAYS", "90"))
+
+# Postgres only, opt-in: partition the time entry table by month of start_time
+# (tasks.partitions). Read by migration tasks.0008; `manage.py
+# time_entry_partitions --enable/--disable` switches an existing database.
+# Partitions are created this many months ahead (by `boot` and that command).
+TIME_ENTRY_PARTITIONING = env_bool("TIME_ENTRY_PARTITIONING", default=False)
+TIME_ENTRY_PARTITION_MONTHS_AHEAD = int(os.getenv("TIME_ENTRY_PARTITION_MONTHS_AHEAD", "3"))
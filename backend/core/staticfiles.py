@@ -0,0 +1,36 @@
+"""WhiteNoise static file serving that also runs natively under ASGI.
+
+whitenoise.middleware.WhiteNoiseMiddleware is sync-only. Under ASGI Django
+then runs it on the thread-sensitive executor and everything below it (the
+rest of the middleware and the async views) through async_to_sync, so every
+request queues for that one thread. This subclass looks static files up in
+the event loop (a dict lookup unless WHITENOISE_AUTOREFRESH) and only hops to
+a thread to serve one.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
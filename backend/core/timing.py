@@ -0,0 +1,249 @@
+"""Per-request timing: Server-Timing headers and slow request/query logging.
+
+RequestTimingMiddleware records, for each request:
+
+- sql: number of queries and total time spent executing them (a database
+  execute wrapper installed on every connection);
+- serialize: time in serializer `.data` (TimedModelSerializer) and the
+  `.values()` list renderer (tasks.listing), wrapped in `timed("serialize")`;
+  queries a serializer triggers count here as well as under sql;
+- render: time in the core.renderers renderers and core.responses;
+- view: everything below the middleware (routing, the view, rendering).
+
+and, with REQUEST_TIMING_HEADER on, sends them as
+`Server-Timing: sql;dur=3.1;desc="4 queries", ...`, which browser devtools
+show next to each request. Streaming responses (exports, the change stream)
+are measured up to their headers.
+
+Requests slower than REQUEST_TIMING_SLOW_REQUEST_MS and queries slower than
+REQUEST_TIMING_SLOW_QUERY_MS are logged as warnings on the `core.timing`
+logger (see LOGGING) with the normalized SQL and the view or viewset action
+that ran them.
+
+With REQUEST_TIMING off the middleware removes itself at startup
+(MiddlewareNotUsed) and no execute wrapper is installed (unless core.metrics
+needs the query counts); `timed()` then costs one context variable lookup.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Slowest queries kept per request for the slow-request log line.
+SLOWEST_QUERIES = 3
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+_NOT_TIMED = nullcontext()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with literals and IN-lists collapsed, so equal query shapes log identically."""
+
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def view_name(request) -> str:
+    """Dotted path of the view that served `request`, with the viewset action if any."""
+
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return request.path
+    func = match.func
+    view = getattr(func, "cls", None) or getattr(func, "view_class", None) or func
+    # __name__: @api_view classes are named after the decorated function.
+    name = f"{view.__module__}.{view.__name__}"
+    action = (getattr(func, "actions", None) or {}).get(request.method.lower())
+    return f"{name}.{action}" if action else name
+
+
+class RequestTiming:
+    __slots__ = ("request", "queries", "sql_seconds", "spans", "slowest")
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.spans: dict[str, float] = {}
+        # Min-heap of (seconds, sql) holding the slowest queries.
+        self.slowest: list[tuple[float, str]] = []
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_query(self, sql: str, seconds: float):
+        self.queries += 1
+        self.sql_seconds += seconds
+        if len(self.slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self.slowest, (seconds, sql))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, sql))
+
+
+class _Span:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing: RequestTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timing.add(self.name, time.perf_counter() - self.started)
+
+
+def timed(name: str):
+    """Context manager adding its duration to the current request's `name` timing."""
+
+    timing = _current.get()
+    return _NOT_TIMED if timing is None else _Span(timing, name)
+
+
+def _record_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        timing.add_query(sql, seconds)
+        if settings.REQUEST_TIMING and seconds * 1000 >= settings.REQUEST_TIMING_SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query (%.1f ms) in %s: %s", seconds * 1000, view_name(timing.request), normalize_sql(sql)
+            )
+
+
+def _install(sender=None, connection=None, **kwargs):
+    # connection_created fires on every (re)connect of the same wrapper.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_recorder():
+    """Count queries on every connection (idempotent); only requests being timed pay for it."""
+
+    connection_created.connect(_install, dispatch_uid="core.timing")
+    for connection in connections.all(initialized_only=True):
+        _install(connection=connection)
+
+
+def begin(request):
+    """Start timing `request`, or join the timing an outer middleware started.
+
+    Returns (timing, token); pass the token to end().
+    """
+
+    timing = _current.get()
+    if timing is not None:
+        return timing, None
+    timing = RequestTiming(request)
+    return timing, _current.set(timing)
+
+
+def end(token):
+    if token is not None:
+        _current.reset(token)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer whose `.data` counts as serialize time.
+
+    Set `list_serializer_class = TimedListSerializer` in Meta to time many=True too.
+    """
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_query_recorder()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing, token = begin(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end(token)
+        return self.finish(request, response, timing, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timing, token = begin(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end(token)
+        return self.finish(request, response, timing, time.perf_counter() - started)
+
+    def finish(self, request, response, timing: RequestTiming, seconds: float):
+        if settings.REQUEST_TIMING_HEADER:
+            queries = f"{timing.queries} {'query' if timing.queries == 1 else 'queries'}"
+            metrics = [f'sql;dur={timing.sql_seconds * 1000:.1f};desc="{queries}"']
+            metrics += [f"{name};dur={spent * 1000:.1f}" for name, spent in timing.spans.items()]
+            metrics.append(f"view;dur={seconds * 1000:.1f}")
+            response.headers["Server-Timing"] = ", ".join(metrics)
+
+        if seconds * 1000 >= settings.REQUEST_TIMING_SLOW_REQUEST_MS:
+            spans = "".join(f", {name} {spent * 1000:.0f} ms" for name, spent in timing.spans.items())
+            queries = "".join(
+                f"\n  {spent * 1000:.1f} ms: {normalize_sql(sql)}" for spent, sql in sorted(timing.slowest, reverse=True)
+            )
+            logger.warning(
+                "Slow request %s %s -> %s in %.0f ms (%s; %d queries, sql %.0f ms%s)%s",
+                request.method,
+                request.get_full_path(),
+                response.status_code,
+                seconds * 1000,
+                view_name(request),
+                timing.queries,
+                timing.sql_seconds * 1000,
+                spans,
+                queries,
+            )
+        return response
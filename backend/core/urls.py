@@ -1,7 +1,15 @@
+from django.conf import settings
 from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import include, path
 
+from core import response_cache
+from core.metrics import metrics_view
+from dashboards.views import dashboard_async
+from events.views import change_stream_async
+from external_apis.views import world_time_async
+from tasks.views import export_rows_async, task_list_async, task_stats_async
+
 
 def api_index(_request):
     return JsonResponse(
@@ -9,26 +17,55 @@ def api_index(_request):
             "name": "Task Time Tracker API",
             "endpoints": {
                 "tasks": "/api/tasks/",
-                "tasks_populate": "/api/tasks/populate/?date=YYYY-MM-DD",
+                "tasks_populate": "/api/tasks/populate/?date=YYYY-MM-DD (or ?start=&end=)",
+                "tasks_batch": "/api/tasks/batch/ (POST, create/update/delete)",
                 "tasks_stats": "/api/tasks/stats/?date=YYYY-MM-DD (optional)",
                 "tasks_world_time": "/api/tasks/world-time/",
                 "templates": "/api/templates/",
                 "time_entries": "/api/time-entries/?task=<task_id>",
+                "time_entries_batch": "/api/time-entries/batch/ (POST, delete)",
+                "time_entries_import": "/api/time-entries/import/ (POST multipart file, CSV/NDJSON)",
                 "dashboard": "/api/dashboard/?date=YYYY-MM-DD",
+                "events": "/api/events/ (Server-Sent Events)",
+                "export": "/api/export/<tasks|time-entries>/?format=csv|ndjson&start=YYYY-MM-DD&end=YYYY-MM-DD",
+                "cache_stats": "/api/cache-stats/",
                 "world_time_legacy": "/api/world-time/",
+                "metrics": "/metrics (Prometheus text format)",
             },
         }
     )
 
 
+def cache_stats(_request):
+    """Response cache hit/miss counters of the worker process that serves the request."""
+
+    return JsonResponse({"backend": settings.CACHES["default"]["BACKEND"], "endpoints": response_cache.stats()})
+
+
 urlpatterns = [
     path("", api_index),
     path("admin/", admin.site.urls),
 
     path("api/tasks/", include("tasks.urls")),
     path("api/dashboard/", include("dashboards.urls")),
+    path("api/events/", include("events.urls")),
+    path("api/cache-stats/", cache_stats),
+    path("metrics", metrics_view),
 
     # Shared /api/... endpoints
     path("api/", include("tasks.api_urls")),
     path("api/", include("external_apis.urls")),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Under ASGI, serve the read-heavy endpoints from async views (async ORM and a
+    # pooled async HTTP client) ahead of the DRF routes they shadow.
+    urlpatterns = [
+        path("api/tasks/", task_list_async),
+        path("api/tasks/stats/", task_stats_async),
+        path("api/tasks/world-time/", world_time_async),
+        path("api/dashboard/", dashboard_async),
+        path("api/events/", change_stream_async),
+        path("api/export/<str:kind>/", export_rows_async),
+        path("api/world-time/", world_time_async),
+    ] + urlpatterns
@@ -0,0 +1,75 @@
+"""Backfill or repair DailyTaskRollup rows for a date range.
+
+Usage:
+    python manage.py rebuild_rollups [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--batch-size N]
+
+Both bounds are inclusive and default to today. Tasks are processed in
+primary-key batches, each committed in its own transaction, so the command
+can run against a live database.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from dashboards.models import DailyTaskRollup
+from dashboards.rollups import rebuild_task_rollups
+from tasks.models import Task
+from tasks.versions import bump_day_versions
+
+
+def _parse_date(value: str | None) -> date:
+    if not value:
+        return timezone.localdate()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value!r} (expected YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard's daily task rollups for a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (default: today).")
+        parser.add_argument("--end", help="Last date to rebuild (default: --start).")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = _parse_date(options["start"])
+        end = _parse_date(options["end"]) if options["end"] else start
+        batch_size = options["batch_size"]
+        if end < start:
+            raise CommandError("--end must not be before --start.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        task_ids = Task.objects.filter(date__range=(start, end)).values_list("id", flat=True)
+        # Rows whose task has since moved to a date outside the range are stale too.
+        moved_ids = (
+            DailyTaskRollup.objects.filter(date__range=(start, end))
+            .exclude(task__date__range=(start, end))
+            .values_list("task_id", flat=True)
+        )
+        ids = sorted(set(task_ids) | set(moved_ids))
+
+        # Repaired figures must not be answered with 304 from a stale ETag.
+        days = set(Task.objects.filter(pk__in=ids).values_list("user_id", "date"))
+        days |= set(DailyTaskRollup.objects.filter(task_id__in=ids).values_list("user_id", "date"))
+
+        rebuilt = 0
+        for offset in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                rebuilt += rebuild_task_rollups(ids[offset : offset + batch_size])
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  {rebuilt}/{len(ids)} tasks")
+
+        with transaction.atomic():
+            for user_id in {user_id for user_id, _ in days}:
+                bump_day_versions(user_id=user_id, dates=[day for owner, day in days if owner == user_id])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} rollup rows for {start}..{end}."))
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TimeEntry = apps.get_model("tasks", "TimeEntry")
+    DailyTaskRollup = apps.get_model("dashboards", "DailyTaskRollup")
+
+    totals = {
+        row["task_id"]: row
+        for row in TimeEntry.objects.values("task_id")
+        .annotate(tracked=Sum("duration_seconds"), entries=Count("id"))
+        .order_by()
+    }
+    rows = []
+    for task in Task.objects.all().iterator(chunk_size=1000):
+        total = totals.get(task.pk, {})
+        rows.append(
+            DailyTaskRollup(
+                task_id=task.pk,
+                user_id=task.user_id,
+                date=task.date,
+                title=task.title,
+                target_seconds=task.target_seconds,
+                completed=task.completed,
+                tracked_seconds=int(total.get("tracked") or 0),
+                entry_count=int(total.get("entries") or 0),
+            )
+        )
+    DailyTaskRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tasks', '0004_timeentry_start_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('title', models.CharField(max_length=255)),
+                ('target_seconds', models.IntegerField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+                ('tracked_seconds', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='tasks.task')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='rollup_user_date_idx'), models.Index(condition=models.Q(('user__isnull', True)), fields=['date'], name='rollup_anon_date_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from tasks.models import Task
+
+
+class DailyTaskRollup(models.Model):
+    """Per-(user bucket, date, task) summary that backs the dashboard.
+
+    Maintained incrementally by the timer services and task/time-entry views
+    (see dashboards.rollups); `manage.py rebuild_rollups` repairs it.
+    """
+
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, related_name="rollup")
+
+    # Denormalized from the task so the dashboard never has to join.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    date = models.DateField()
+    title = models.CharField(max_length=255)
+    target_seconds = models.IntegerField(default=0)
+    completed = models.BooleanField(default=False)
+
+    # Finished time only; running timers contribute once they are stopped.
+    tracked_seconds = models.IntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date"], name="rollup_user_date_idx"),
+            models.Index(
+                fields=["date"],
+                name="rollup_anon_date_idx",
+                condition=models.Q(user__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.date}): {self.tracked_seconds}s"
@@ -0,0 +1,98 @@
+"""Incremental maintenance of DailyTaskRollup.
+
+Writers call these helpers right after they change tasks or time entries;
+anything that bypasses them (admin edits, raw SQL) is repaired by
+`manage.py rebuild_rollups`.
+"""
+
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from tasks.archive import finished_entry_count, finished_seconds
+from tasks.models import Task
+
+from .models import DailyTaskRollup
+
+_SYNCED_FIELDS = ["user", "date", "title", "target_seconds", "completed", "tracked_seconds", "entry_count", "updated_at"]
+
+
+def sync_task_rollup(task: Task):
+    """Copy a created/updated task's own fields into its rollup row."""
+
+    updated = DailyTaskRollup.objects.filter(task_id=task.pk).update(
+        user_id=task.user_id,
+        date=task.date,
+        title=task.title,
+        target_seconds=task.target_seconds,
+        completed=task.completed,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        rebuild_task_rollups([task.pk])
+
+
+def add_tracked_time(task_id: int, *, seconds: int = 0, entries: int = 0):
+    """Apply a time delta to one task's rollup (negative values for deletions)."""
+
+    updated = DailyTaskRollup.objects.filter(task_id=task_id).update(
+        tracked_seconds=F("tracked_seconds") + seconds,
+        entry_count=F("entry_count") + entries,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        rebuild_task_rollups([task_id])
+
+
+def recount_tracked_time(task_ids):
+    """Copy the given tasks' tracked time into their rollups in one UPDATE.
+
+    `task_ids` may be a list or a values_list() subquery. Used after set-based
+    timer stops, where the closed durations only exist in the database, once
+    tasks.totals has added them to Task.tracked_seconds.
+    """
+
+    DailyTaskRollup.objects.filter(task_id__in=task_ids).update(
+        tracked_seconds=Subquery(Task.objects.filter(pk=OuterRef("task_id")).values("tracked_seconds")),
+        updated_at=timezone.now(),
+    )
+
+
+def ensure_task_rollups(task_qs) -> int:
+    """Create rollup rows for tasks in `task_qs` that have none (e.g. after bulk_create)."""
+
+    return rebuild_task_rollups(task_qs.filter(rollup__isnull=True).values_list("id", flat=True))
+
+
+def rebuild_task_rollups(task_ids) -> int:
+    """Recompute rollup rows for the given tasks from the source tables (archived time included)."""
+
+    task_ids = list(task_ids)
+    if not task_ids:
+        return 0
+
+    rows = []
+    for task in (
+        Task.objects.filter(pk__in=task_ids)
+        .only("id", "user_id", "date", "title", "target_seconds", "completed")
+        .annotate(tracked=finished_seconds(), entries=finished_entry_count())
+    ):
+        rows.append(
+            DailyTaskRollup(
+                task_id=task.pk,
+                user_id=task.user_id,
+                date=task.date,
+                title=task.title,
+                target_seconds=task.target_seconds,
+                completed=task.completed,
+                tracked_seconds=task.tracked,
+                entry_count=task.entries,
+            )
+        )
+
+    DailyTaskRollup.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["task"],
+        update_fields=_SYNCED_FIELDS,
+    )
+    return len(rows)
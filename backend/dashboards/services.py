@@ -1,64 +1,114 @@
-from django.db.models import Sum
+from django.db.models import Count, F, Q, Sum
 from django.db.models.functions import Coalesce, TruncDate
 
-from tasks.models import Task, TimeEntry
+from tasks.models import TimeEntry, TimeEntrySummary
 
+from .models import DailyTaskRollup
 
-def dashboard_metrics(*, user, date):
+
+def _dashboard_querysets(*, user, date):
     # Scope to user bucket
     if user is not None and getattr(user, "is_authenticated", False):
-        task_qs = Task.objects.filter(user=user)
+        rollup_qs = DailyTaskRollup.objects.filter(user=user)
         time_entry_qs = TimeEntry.objects.filter(task__user=user)
+        summary_qs = TimeEntrySummary.objects.filter(task__user=user)
     else:
-        task_qs = Task.objects.filter(user__isnull=True)
+        rollup_qs = DailyTaskRollup.objects.filter(user__isnull=True)
         time_entry_qs = TimeEntry.objects.filter(task__user__isnull=True)
+        summary_qs = TimeEntrySummary.objects.filter(task__user__isnull=True)
 
     # Scope to the selected day
-    task_qs = task_qs.filter(date=date)
+    rollup_qs = rollup_qs.filter(date=date)
     time_entry_qs = time_entry_qs.filter(task__date=date)
+    summary_qs = summary_qs.filter(task__date=date)
 
-    tasks_completed = task_qs.filter(completed=True).count()
-
-    total_target_seconds = int(task_qs.aggregate(total=Coalesce(Sum("target_seconds"), 0))["total"])
-    total_tracked_seconds = int(time_entry_qs.aggregate(total=Coalesce(Sum("duration_seconds"), 0))["total"])
-
-    # Count tasks by completion status
-    tasks_by_status = [
-        {"status": "completed", "count": tasks_completed},
-        {"status": "pending", "count": task_qs.filter(completed=False).count()},
-    ]
+    # Summary, status breakdown and targets reached in a single conditional aggregate.
+    # targets reached (based on completed entries only; running timers are excluded)
+    summary_aggregates = dict(
+        tasks_count=Count("id"),
+        tasks_completed=Count("id", filter=Q(completed=True)),
+        targets_reached=Count(
+            "id", filter=Q(target_seconds__gt=0, tracked_seconds__gte=F("target_seconds"))
+        ),
+        total_target_seconds=Coalesce(Sum("target_seconds"), 0),
+        total_tracked_seconds=Coalesce(Sum("tracked_seconds"), 0),
+    )
 
-    time_per_task = (
-        time_entry_qs.values("task_id", "task__title", "task__target_seconds")
-        .annotate(total_time=Coalesce(Sum("duration_seconds"), 0))
-        .order_by("task__title")
+    time_per_task_qs = (
+        rollup_qs.filter(entry_count__gt=0)
+        .values("task_id", "title", "target_seconds", "tracked_seconds")
+        .order_by("title", "task_id")
     )
 
-    # targets reached (based on completed entries only; running timers are excluded)
-    targets_reached = 0
-    for row in time_per_task:
-        target = int(row.get("task__target_seconds") or 0)
-        total = int(row.get("total_time") or 0)
-        if target > 0 and total >= target:
-            targets_reached += 1
-
-    productivity_trend = (
+    # Bucketed by the day each entry started, so this still reads the entries
+    # themselves, plus the summaries of archived ones (tasks.archive); one query,
+    # merged by _trend().
+    productivity_trend_qs = (
         time_entry_qs.annotate(date=TruncDate("start_time"))
         .values("date")
         .annotate(total_time=Coalesce(Sum("duration_seconds"), 0))
-        .order_by("date")
+        .order_by()
+        .union(
+            summary_qs.values("day").annotate(total_time=Coalesce(Sum("tracked_seconds"), 0)).order_by(),
+            all=True,
+        )
     )
 
+    return rollup_qs, summary_aggregates, time_per_task_qs, productivity_trend_qs
+
+
+def _trend(rows) -> list[dict]:
+    totals: dict = {}
+    for row in rows:
+        totals[row["date"]] = totals.get(row["date"], 0) + row["total_time"]
+    return [{"date": day, "total_time": total} for day, total in sorted(totals.items())]
+
+
+def _dashboard_payload(*, date, summary, time_per_task_rows, productivity_trend):
+    summary = {key: int(value) for key, value in summary.items()}
+
+    # Count tasks by completion status
+    tasks_by_status = [
+        {"status": "completed", "count": summary["tasks_completed"]},
+        {"status": "pending", "count": summary["tasks_count"] - summary["tasks_completed"]},
+    ]
+
+    time_per_task = [
+        {
+            "task_id": row["task_id"],
+            "task__title": row["title"],
+            "task__target_seconds": row["target_seconds"],
+            "total_time": row["tracked_seconds"],
+        }
+        for row in time_per_task_rows
+    ]
+
     return {
         "date": str(date),
-        "summary": {
-            "tasks_count": task_qs.count(),
-            "tasks_completed": tasks_completed,
-            "targets_reached": targets_reached,
-            "total_target_seconds": total_target_seconds,
-            "total_tracked_seconds": total_tracked_seconds,
-        },
+        "summary": summary,
         "tasks_by_status": tasks_by_status,
-        "time_per_task": list(time_per_task),
-        "productivity_trend": list(productivity_trend),
+        "time_per_task": time_per_task,
+        "productivity_trend": productivity_trend,
     }
+
+
+def dashboard_metrics(*, user, date):
+    rollup_qs, summary_aggregates, time_per_task_qs, trend_qs = _dashboard_querysets(user=user, date=date)
+    return _dashboard_payload(
+        date=date,
+        summary=rollup_qs.aggregate(**summary_aggregates),
+        time_per_task_rows=list(time_per_task_qs),
+        productivity_trend=_trend(trend_qs),
+    )
+
+
+async def adashboard_metrics(*, user, date):
+    """Async ORM variant of dashboard_metrics() for the ASGI views."""
+
+    rollup_qs, summary_aggregates, time_per_task_qs, trend_qs = _dashboard_querysets(user=user, date=date)
+    return _dashboard_payload(
+        date=date,
+        summary=await rollup_qs.aaggregate(**summary_aggregates),
+        time_per_task_rows=[row async for row in time_per_task_qs],
+        productivity_trend=_trend([row async for row in trend_qs]),
+    )
@@ -4,7 +4,11 @@ from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .services import dashboard_metrics
+from core import response_cache
+from core.responses import api_response, shadows_drf_view
+from tasks.versions import aday_stamp, day_stamp
+
+from .services import adashboard_metrics, dashboard_metrics
 
 
 def _parse_date_param(value: str | None) -> date:
@@ -20,4 +24,45 @@ def _parse_date_param(value: str | None) -> date:
 def dashboard_view(request):
     user = request.user if request.user.is_authenticated else None
     selected_date = _parse_date_param(request.query_params.get("date"))
-    return Response(dashboard_metrics(user=user, date=selected_date))
+
+    # Running timers are excluded from the figures, so the day's version alone decides.
+    user_id = getattr(user, "pk", None)
+    stamp = day_stamp("dashboard", user_id=user_id, day=selected_date)
+    not_modified = stamp.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+
+    payload, outcome = response_cache.get_or_compute(
+        "dashboard",
+        user_id=user_id,
+        day=selected_date,
+        compute=lambda: dashboard_metrics(user=user, date=selected_date),
+    )
+    response = Response(payload)
+    response["X-Cache"] = outcome.upper()
+    return stamp.apply(response)
+
+
+@shadows_drf_view(dashboard_view)
+async def dashboard_async(request):
+    """Async ORM variant of dashboard_view, routed when settings.ASYNC_VIEWS is on."""
+
+    user = await request.auser()
+    user = user if user.is_authenticated else None
+    selected_date = _parse_date_param(request.GET.get("date"))
+
+    user_id = getattr(user, "pk", None)
+    stamp = await aday_stamp("dashboard", user_id=user_id, day=selected_date)
+    not_modified = stamp.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+
+    payload, outcome = await response_cache.aget_or_compute(
+        "dashboard",
+        user_id=user_id,
+        day=selected_date,
+        compute=lambda: adashboard_metrics(user=user, date=selected_date),
+    )
+    response = api_response(request, payload)
+    response["X-Cache"] = outcome.upper()
+    return stamp.apply(response)
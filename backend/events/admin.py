@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import ChangeEvent
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "kind", "action", "user", "created_at"]
+    list_filter = ["kind", "action", "created_at"]
+    readonly_fields = ["created_at"]
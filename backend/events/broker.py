@@ -0,0 +1,274 @@
+"""Database-backed change stream with in-process wakeups.
+
+Writers call `publish()` inside the transaction that makes the change; the
+event rows commit (or roll back) together with it. After the commit, every
+stream waiting in this process is woken immediately. Streams served by other
+worker processes find the new rows on their next poll
+(CHANGE_STREAM_POLL_SECONDS), so no broker is needed between workers.
+
+Writers take the bucket's lock (`lock_bucket()`) before their first write,
+so within a bucket events commit in id order: a stream that has read event N
+never sees a smaller id of its bucket commit afterwards, and can resume from
+the highest id it has read.
+
+Events store references (ids), not serialized objects, so publishing costs
+one INSERT. The apps that publish them register a payload resolver
+(`register_resolver()`), which streams call once per batch of events read
+to expand the references into the current state.
+
+Under WSGI every open stream holds a worker thread, so a process serves at
+most CHANGE_STREAM_MAX_SYNC_STREAMS synchronous streams at once
+(`sync_stream_slots`); async streams (ASGI) hold no thread and are not
+capped.
+
+Configured in core/settings.py: CHANGE_STREAM_POLL_SECONDS,
+CHANGE_STREAM_HEARTBEAT_SECONDS, CHANGE_STREAM_MAX_SECONDS,
+CHANGE_STREAM_MAX_SYNC_STREAMS, CHANGE_EVENTS_RETENTION_HOURS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ChangeEvent
+
+# Events read per query; a stream that is further behind catches up in pages.
+STREAM_BATCH_SIZE = 200
+
+# Prune expired events after this many committed publishes (per process).
+PRUNE_EVERY = 500
+
+
+class _LocalNotifier:
+    """Wakes the streams of this process when events are committed."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def notify(self):
+        with self._condition:
+            self._generation += 1
+            generation = self._generation
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        if generation % PRUNE_EVERY == 0:
+            prune_events()
+
+    def wait(self, generation: int, timeout: float) -> bool:
+        """Block until a notify() after `generation`; False on timeout."""
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self._generation != generation, timeout)
+
+    async def await_change(self, generation: int, timeout: float) -> bool:
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._condition:
+            if self._generation != generation:
+                return True
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+
+
+_notifier = _LocalNotifier()
+
+
+class _StreamSlots:
+    """Counts the synchronous streams this process serves (CHANGE_STREAM_MAX_SYNC_STREAMS)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = 0
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._open >= settings.CHANGE_STREAM_MAX_SYNC_STREAMS:
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._open -= 1
+
+
+sync_stream_slots = _StreamSlots()
+
+# Called with each batch of events a stream read; see register_resolver().
+_resolvers: list[Callable[[list[ChangeEvent]], None]] = []
+
+
+def register_resolver(resolve: Callable[[list[ChangeEvent]], None]):
+    """Register `resolve(events)`, which expands the stored references of the events it knows in place.
+
+    It sets `event.payload` to what is sent, or to None to skip the event (its
+    object is gone and a later event says so).
+    """
+
+    if resolve not in _resolvers:
+        _resolvers.append(resolve)
+
+
+# Arbitrary namespace for pg_advisory_xact_lock(namespace, bucket) bucket locks.
+_BUCKET_LOCK_NAMESPACE = 7301
+
+
+def lock_bucket(user_id):
+    """Serialize the writes of one user bucket until the transaction ends.
+
+    Take it before the transaction's first write to the bucket (then rows are
+    always locked after it, never while waiting for it). Postgres: a
+    transaction-scoped advisory lock (there is no row to lock for the
+    anonymous bucket). SQLite: writers are already serialized by the database
+    lock, which a transaction holds from its first write to its commit.
+    """
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [_BUCKET_LOCK_NAMESPACE, user_id or 0])
+
+
+def change(kind: str, action: str, *, user_id, **payload) -> ChangeEvent:
+    """Build an unsaved event; `user_id=None` is the anonymous bucket."""
+
+    return ChangeEvent(user_id=user_id, kind=kind, action=action, payload=payload)
+
+
+def publish(events) -> int:
+    """Insert events in the current transaction and wake local streams on commit.
+
+    The transaction must hold `lock_bucket()` for the events' bucket.
+    """
+
+    events = list(events)
+    if not events:
+        return 0
+    ChangeEvent.objects.bulk_create(events)
+    transaction.on_commit(_notifier.notify)
+    return len(events)
+
+
+def prune_events(*, older_than: timedelta | None = None) -> int:
+    """Delete events older than the retention window. Returns the number deleted."""
+
+    if older_than is None:
+        older_than = timedelta(hours=settings.CHANGE_EVENTS_RETENTION_HOURS)
+    deleted, _ = ChangeEvent.objects.filter(created_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+
+def format_event(event: ChangeEvent) -> bytes:
+    data = json.dumps(
+        {"action": event.action, **event.payload}, cls=DjangoJSONEncoder, separators=(",", ":")
+    )
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {data}\n\n".encode("utf-8")
+
+
+class ChangeStream:
+    """Server-Sent Events for one user bucket, resuming after `last_event_id`.
+
+    Iterate it synchronously (WSGI) or asynchronously (ASGI). Each connection
+    lasts at most CHANGE_STREAM_MAX_SECONDS; EventSource reconnects on its own
+    and sends Last-Event-ID, so nothing is missed across reconnects. A `reset`
+    event tells the client its position was pruned and it must refetch.
+    """
+
+    def __init__(self, *, user_id, last_event_id: int | None):
+        self.user_id = user_id
+        self.last_event_id = last_event_id
+
+    def _bucket(self):
+        if self.user_id is None:
+            return ChangeEvent.objects.filter(user__isnull=True)
+        return ChangeEvent.objects.filter(user_id=self.user_id)
+
+    def _start(self) -> list[bytes]:
+        """Resolve the starting position; returns the preamble to send."""
+
+        retry_ms = int(settings.CHANGE_STREAM_POLL_SECONDS * 1000)
+        preamble = [f"retry: {retry_ms}\n\n".encode("ascii")]
+        position = self.last_event_id
+        if position and not ChangeEvent.objects.filter(pk=position).exists():
+            preamble.append(b"event: reset\ndata: {}\n\n")
+            position = None
+        if position is None:
+            position = ChangeEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        self.last_event_id = position
+        return preamble
+
+    def _fetch(self) -> list[ChangeEvent]:
+        events = list(self._bucket().filter(id__gt=self.last_event_id).order_by("id")[:STREAM_BATCH_SIZE])
+        if events:
+            self.last_event_id = events[-1].pk
+            for resolve in _resolvers:
+                resolve(events)
+        return events
+
+    def __iter__(self):
+        deadline = time.monotonic() + settings.CHANGE_STREAM_MAX_SECONDS
+        yield from self._start()
+        idle = 0.0
+        while time.monotonic() < deadline:
+            generation = _notifier.generation
+            events = self._fetch()
+            for event in events:
+                if event.payload is not None:
+                    yield format_event(event)
+            if len(events) == STREAM_BATCH_SIZE:
+                continue
+            if events:
+                idle = 0.0
+            elif idle >= settings.CHANGE_STREAM_HEARTBEAT_SECONDS:
+                yield b": keepalive\n\n"
+                idle = 0.0
+            started = time.monotonic()
+            _notifier.wait(generation, settings.CHANGE_STREAM_POLL_SECONDS)
+            idle += time.monotonic() - started
+
+    async def __aiter__(self):
+        deadline = time.monotonic() + settings.CHANGE_STREAM_MAX_SECONDS
+        for chunk in await sync_to_async(self._start)():
+            yield chunk
+        idle = 0.0
+        while time.monotonic() < deadline:
+            generation = _notifier.generation
+            events = await sync_to_async(self._fetch)()
+            for event in events:
+                if event.payload is not None:
+                    yield format_event(event)
+            if len(events) == STREAM_BATCH_SIZE:
+                continue
+            if events:
+                idle = 0.0
+            elif idle >= settings.CHANGE_STREAM_HEARTBEAT_SECONDS:
+                yield b": keepalive\n\n"
+                idle = 0.0
+            started = time.monotonic()
+            await _notifier.await_change(generation, settings.CHANGE_STREAM_POLL_SECONDS)
+            idle += time.monotonic() - started
@@ -0,0 +1,39 @@
+"""Delete change-stream events past their retention window.
+
+Usage:
+    python manage.py prune_change_events [--hours N]
+
+Publishing also prunes every few hundred events; run this from a scheduler
+when the write rate is low or the retention was shortened.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.broker import prune_events
+
+
+class Command(BaseCommand):
+    help = "Delete change-stream events older than the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=None,
+            help="Keep events from the last N hours (default: CHANGE_EVENTS_RETENTION_HOURS).",
+        )
+
+    def handle(self, *args, **options):
+        hours = options["hours"]
+        if hours is None:
+            hours = settings.CHANGE_EVENTS_RETENTION_HOURS
+        if hours < 0:
+            raise CommandError("--hours must not be negative.")
+
+        deleted = prune_events(older_than=timedelta(hours=hours))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change events older than {hours:g}h."))
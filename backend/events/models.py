@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class ChangeEvent(models.Model):
+    """One committed change, replayed to the bucket's change streams (see events.broker).
+
+    Rows are written in the same transaction as the change they describe, so a
+    stream never sees an event for a rolled-back write. The auto-increment id
+    is the SSE event id clients resume from.
+    """
+
+    KIND_TASK = "task"
+    KIND_TIMER = "timer"
+    KIND_ROLLUP = "rollup"
+    KIND_CHOICES = [
+        (KIND_TASK, "Task"),
+        (KIND_TIMER, "Timer"),
+        (KIND_ROLLUP, "Rollup"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        # Covered by changeevent_user_id_idx.
+        db_index=False,
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    action = models.CharField(max_length=16)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Streams read "events of my bucket after id N".
+            models.Index(fields=["user", "id"], name="changeevent_user_id_idx"),
+            models.Index(
+                fields=["id"],
+                name="changeevent_anon_id_idx",
+                condition=Q(user__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind}.{self.action}"
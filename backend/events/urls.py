@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import change_stream
+
+urlpatterns = [
+    path("", change_stream),
+]
@@ -0,0 +1,68 @@
+from django.http import HttpResponse, StreamingHttpResponse
+
+from core.responses import method_not_allowed
+
+from .broker import ChangeStream, sync_stream_slots
+
+
+def _last_event_id(request) -> int | None:
+    # EventSource resends the header on reconnect; the query param covers the first connect.
+    value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return max(0, int(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _event_stream_response(stream) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class _HeldStream:
+    """A synchronous stream that frees its slot when the server closes the response."""
+
+    def __init__(self, stream: ChangeStream):
+        self._chunks = iter(stream)
+        self._open = True
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self._chunks.close()
+            sync_stream_slots.release()
+
+
+def change_stream(request):
+    """GET /api/events/: task, timer and rollup changes of the caller's bucket (SSE).
+
+    Every stream holds a worker thread here, so once this process serves
+    CHANGE_STREAM_MAX_SYNC_STREAMS of them the answer is 204 No Content, which
+    tells EventSource not to reconnect; the client falls back to refetching.
+    """
+
+    if request.method != "GET":
+        return method_not_allowed(request)
+    if not sync_stream_slots.acquire():
+        return HttpResponse(status=204)
+
+    user_id = request.user.pk if request.user.is_authenticated else None
+    return _event_stream_response(_HeldStream(ChangeStream(user_id=user_id, last_event_id=_last_event_id(request))))
+
+
+async def change_stream_async(request):
+    """Async variant of change_stream: an idle stream holds no worker thread."""
+
+    if request.method != "GET":
+        return method_not_allowed(request)
+
+    user = await request.auser()
+    user_id = user.pk if user.is_authenticated else None
+    stream = ChangeStream(user_id=user_id, last_event_id=_last_event_id(request))
+    return _event_stream_response(stream.__aiter__())
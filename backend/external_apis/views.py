@@ -3,7 +3,18 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
-from .world_time import fetch_current_time
+from core.responses import api_response, shadows_drf_view
+
+from .world_time import afetch_current_time, fetch_current_time
+
+
+def _world_time_subset(data: dict) -> dict:
+    # Return a small, stable subset for the UI.
+    return {
+        "timezone": data.get("timezone"),
+        "datetime": data.get("datetime"),
+        "utc_offset": data.get("utc_offset"),
+    }
 
 
 @api_view(["GET"])
@@ -16,11 +27,20 @@ def world_time(_request):
             status=status.HTTP_502_BAD_GATEWAY,
         )
 
-    # Return a small, stable subset for the UI.
-    return Response(
-        {
-            "timezone": data.get("timezone"),
-            "datetime": data.get("datetime"),
-            "utc_offset": data.get("utc_offset"),
-        }
-    )
+    return Response(_world_time_subset(data))
+
+
+# Also routed over /api/tasks/world-time/, whose viewset action answers the same.
+@shadows_drf_view(world_time)
+async def world_time_async(request):
+    """Async variant of world_time (pooled httpx client, never blocks a thread)."""
+
+    try:
+        data = await afetch_current_time()
+    except RequestException as exc:
+        return api_response(
+            request,
+            {"detail": "Failed to fetch world time.", "error": str(exc)},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
+    return api_response(request, _world_time_subset(data))
@@ -1,7 +1,255 @@
+"""World Time API client with a TTL cache, stale-while-revalidate and a circuit breaker.
+
+The upstream only tells us "what time is it there", which we can keep
+answering locally: the last good response is stored together with the
+monotonic instant it was fetched, and every read returns that payload with
+the elapsed time added. Once the TTL passes, a single background thread
+refreshes the payload while readers keep getting the extrapolated value.
+After repeated upstream failures the circuit opens and the upstream is not
+called at all until the cool-down expires.
+
+Configured in core/settings.py: WORLD_TIME_URL, WORLD_TIME_TIMEOUT,
+WORLD_TIME_TTL_SECONDS, WORLD_TIME_FAILURE_THRESHOLD, WORLD_TIME_RESET_SECONDS.
+
+Async callers (ASGI views) use `afetch_current_time`, which shares the same
+cache and breaker but talks to the upstream through a pooled httpx client.
+The client and the async background refreshes live on one event loop owned
+by the cache (a daemon thread), not on the caller's loop: under WSGI every
+async_to_sync call runs on a loop that is closed right after, which would
+strand both.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
 import requests
+from django.conf import settings
+from requests import RequestException
+
+from core import metrics
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional, only needed by the async views
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+
+def _shift_iso(value: str | None, seconds: float) -> str | None:
+    if not value:
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    shifted = parsed + timedelta(seconds=seconds)
+    text = shifted.isoformat(timespec="microseconds")
+    return text.replace("+00:00", "Z") if value.endswith("Z") else text
+
+
+class WorldTimeCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._async_client = None
+        self._loop = None
+        self._loop_pid = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._payload: dict | None = None
+            self._fetched_at = 0.0  # time.monotonic() of the last good fetch
+            self._refreshing = False
+            self._failures = 0
+            self._open_until = 0.0
+
+    # -- public API -----------------------------------------------------------
+
+    def get(self) -> dict:
+        """Current world time, from cache when possible. Raises RequestException when cold."""
+
+        with self._lock:
+            payload, fetched_at = self._payload, self._fetched_at
+
+        if payload is None:
+            payload = self._fetch()
+            return dict(payload)
+
+        age = time.monotonic() - fetched_at
+        if age >= settings.WORLD_TIME_TTL_SECONDS:
+            self._refresh_in_background()
+        return self._extrapolate(payload, age)
+
+    async def aget(self) -> dict:
+        """Async variant of get(): never blocks the event loop on the upstream."""
+
+        with self._lock:
+            payload, fetched_at = self._payload, self._fetched_at
+
+        if payload is None:
+            payload = await self._afetch()
+            return dict(payload)
+
+        age = time.monotonic() - fetched_at
+        if age >= settings.WORLD_TIME_TTL_SECONDS:
+            self._arefresh_in_background()
+        return self._extrapolate(payload, age)
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    # -- internals ------------------------------------------------------------
+
+    @staticmethod
+    def _extrapolate(payload: dict, age: float) -> dict:
+        data = dict(payload)
+        data["datetime"] = _shift_iso(payload.get("datetime"), age)
+        if "utc_datetime" in payload:
+            data["utc_datetime"] = _shift_iso(payload.get("utc_datetime"), age)
+        if isinstance(payload.get("unixtime"), int):
+            data["unixtime"] = payload["unixtime"] + int(age)
+        return data
+
+    def _check_circuit(self):
+        if self.circuit_open:
+            metrics.WORLD_TIME_FETCHES.labels("circuit_open").inc()
+            raise CircuitOpenError("World time upstream disabled after repeated failures.")
+
+    def _store(self, payload: dict) -> dict:
+        metrics.WORLD_TIME_FETCHES.labels("ok").inc()
+        with self._lock:
+            self._payload = payload
+            self._fetched_at = time.monotonic()
+            self._failures = 0
+            self._open_until = 0.0
+        return payload
+
+    def _fetch(self) -> dict:
+        self._check_circuit()
+        try:
+            response = self._session.get(
+                settings.WORLD_TIME_URL,
+                timeout=settings.WORLD_TIME_TIMEOUT,
+            )
+            response.raise_for_status()
+            payload = response.json()
+        except (RequestException, ValueError) as exc:
+            self._record_failure(exc)
+            if isinstance(exc, RequestException):
+                raise
+            raise RequestException(f"Invalid world time response: {exc}") from exc
+        return self._store(payload)
+
+    def _upstream_loop(self) -> asyncio.AbstractEventLoop:
+        """The cache's own event loop, started on first use (again in a forked worker)."""
+
+        with self._lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._loop_pid = os.getpid()
+                # httpx clients are bound to the loop that first used them.
+                self._async_client = None
+                threading.Thread(target=self._loop.run_forever, name="world-time-io", daemon=True).start()
+            return self._loop
+
+    async def _afetch(self) -> dict:
+        if httpx is None:
+            from asgiref.sync import sync_to_async
+
+            return await sync_to_async(self._fetch, thread_sensitive=False)()
+
+        self._check_circuit()
+        future = asyncio.run_coroutine_threadsafe(self._afetch_upstream(), self._upstream_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _afetch_upstream(self) -> dict:
+        # Runs on the cache's loop only.
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=settings.WORLD_TIME_TIMEOUT,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        try:
+            response = await self._async_client.get(settings.WORLD_TIME_URL)
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            self._record_failure(exc)
+            # Callers only know about requests' exception hierarchy.
+            raise RequestException(str(exc) or exc.__class__.__name__) from exc
+        return self._store(payload)
+
+    def _record_failure(self, exc: Exception):
+        metrics.WORLD_TIME_FETCHES.labels("error").inc()
+        with self._lock:
+            self._failures += 1
+            if self._failures >= settings.WORLD_TIME_FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + settings.WORLD_TIME_RESET_SECONDS
+                metrics.WORLD_TIME_CIRCUIT_OPENS.inc()
+                logger.warning(
+                    "World time circuit opened after %s failures: %s", self._failures, exc
+                )
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._open_until:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self._fetch()
+            except RequestException as exc:
+                logger.info("World time background refresh failed: %s", exc)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, name="world-time-refresh", daemon=True).start()
+
+    def _arefresh_in_background(self):
+        if httpx is None:
+            self._refresh_in_background()
+            return
+
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._open_until:
+                return
+            self._refreshing = True
+
+        async def refresh():
+            try:
+                self._check_circuit()
+                await self._afetch_upstream()
+            except RequestException as exc:
+                logger.info("World time background refresh failed: %s", exc)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        # On the cache's loop, so it completes even if the caller's loop closes first.
+        asyncio.run_coroutine_threadsafe(refresh(), self._upstream_loop())
+
+
+_cache = WorldTimeCache()
 
 
 def fetch_current_time():
-    response = requests.get("https://worldtimeapi.org/api/ip", timeout=5)
-    response.raise_for_status()
-    return response.json()
+    return _cache.get()
+
+
+async def afetch_current_time():
+    return await _cache.aget()
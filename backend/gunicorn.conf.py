@@ -0,0 +1,180 @@
+"""Gunicorn configuration (used by render_start.sh).
+
+Sizing follows the CPUs actually available to the container (scheduler
+affinity and the cgroup CPU quota, not the host's core count):
+
+- SERVER_MODE=wsgi (default): gthread workers, 2 * CPUs + 1 processes with
+  GUNICORN_THREADS threads each;
+- SERVER_MODE=asgi: uvicorn workers, CPUs + 1 processes, each serving many
+  requests on its event loop.
+
+Environment overrides: WEB_CONCURRENCY (workers), GUNICORN_MAX_WORKERS,
+GUNICORN_THREADS, GUNICORN_TIMEOUT, GUNICORN_PRELOAD, GUNICORN_MAX_REQUESTS,
+GUNICORN_MAX_REQUESTS_JITTER, PORT.
+
+The app is preloaded in the master so workers share its memory copy-on-write;
+each worker then warms the URL resolver and serializers, checks the database
+connection, and logs how long it took to become ready. Workers are recycled
+after a jittered number of requests so they do not all restart at once.
+
+Prometheus metrics (core.metrics) are written by every worker to files in
+PROMETHEUS_MULTIPROC_DIR (default: a per-port directory under the temp dir,
+emptied when the server starts), so /metrics reports all workers combined.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import time
+
+
+def _env_int(name, default):
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
+def available_cpus():
+    """CPUs this process may use, honouring affinity and a cgroup (v2 or v1) quota."""
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            limit, period = handle.read().split()[:2]
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as handle:
+                limit = int(handle.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as handle:
+                period = int(handle.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").strip().lower()
+CPUS = available_cpus()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Set before the app is (pre)loaded: prometheus_client picks its multiprocess
+# value store at import time.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"task-scheduler-metrics-{os.getenv('PORT', '8000')}")
+)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+if SERVER_MODE == "asgi":
+    worker_class = "uvicorn_worker.UvicornWorker"
+    _default_workers = CPUS + 1
+else:
+    worker_class = "gthread"
+    threads = _env_int("GUNICORN_THREADS", 4)
+    _default_workers = 2 * CPUS + 1
+
+# WEB_CONCURRENCY (set by some hosts, Render included) wins; otherwise cap the
+# CPU-based default so a large host does not exhaust memory or DB connections.
+workers = max(1, _env_int("WEB_CONCURRENCY", min(_default_workers, _env_int("GUNICORN_MAX_WORKERS", 8))))
+
+timeout = _env_int("GUNICORN_TIMEOUT", 120)
+graceful_timeout = 30
+keepalive = 5
+
+# Load Django once in the master; forked workers share it copy-on-write.
+preload_app = _env_bool("GUNICORN_PRELOAD", default=True)
+
+# Recycle workers (guards against slow leaks); the jitter spreads restarts out.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def _warm_up(*, connect):
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from tasks import serializers
+
+    # Build the URL resolver's reverse/lookup tables.
+    get_resolver()._populate()
+    # Build each serializer's fields (model metadata, validators, lazy imports).
+    for serializer in (serializers.TaskSerializer, serializers.TimeEntrySerializer, serializers.HabitTemplateSerializer):
+        serializer().fields
+    if connect:
+        # Connections are per thread and requests run on the worker's thread
+        # pool, so this only loads the database backend and checks that the
+        # database is reachable before the worker accepts requests.
+        connection = connections["default"]
+        connection.ensure_connection()
+        connection.close()
+
+
+def on_starting(server):
+    # Values left by a previous run would be added to this one's.
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    server.log.info(
+        "Serving %s with %d %s worker(s)%s on %d CPU(s); preload=%s, max_requests=%d±%d",
+        SERVER_MODE,
+        workers,
+        worker_class,
+        f" x {threads} threads" if worker_class == "gthread" else "",
+        CPUS,
+        preload_app,
+        max_requests,
+        max_requests_jitter,
+    )
+    if preload_app:
+        # Warm in the master so every worker inherits it; never share a DB socket.
+        from django.db import connections
+
+        _warm_up(connect=False)
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    # The master closed its connections in when_ready, so nothing is shared here.
+    worker.started_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    try:
+        _warm_up(connect=True)
+    except Exception:
+        # A database that is still starting must not stop the worker from booting.
+        worker.log.exception("Worker %s warm-up failed", worker.pid)
+    worker.log.info("Worker %s ready in %.0f ms", worker.pid, (time.monotonic() - worker.started_at) * 1000)
+
+
+def child_exit(server, worker):
+    # Counters of a recycled worker stay in the totals; its live gauges go.
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
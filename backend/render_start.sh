@@ -4,8 +4,21 @@ set -euo pipefail
 # Render sets PORT; default for local usage.
 export PORT="${PORT:-8000}"
 
-python manage.py migrate --noinput
-python manage.py collectstatic --noinput
+# SERVER_MODE=wsgi (default): gunicorn gthread workers running core.wsgi.
+# SERVER_MODE=asgi: gunicorn managing uvicorn workers running core.asgi, with the
+# read-heavy endpoints served by async views (ASYNC_VIEWS).
+SERVER_MODE="${SERVER_MODE:-wsgi}"
 
-# Use gunicorn for production
-exec gunicorn core.wsgi:application --bind 0.0.0.0:"$PORT" --workers 2 --threads 4 --timeout 120
+# migrate/collectstatic only when something changed (under a lock, so one of
+# several instances starting together does the work); prints a timing breakdown.
+python manage.py boot
+
+# Use gunicorn for production. Worker class, sizing, preload and recycling come
+# from gunicorn.conf.py (WEB_CONCURRENCY, GUNICORN_THREADS, ... override them).
+export SERVER_MODE
+if [ "$SERVER_MODE" = "asgi" ]; then
+  export ASYNC_VIEWS="${ASYNC_VIEWS:-True}"
+  exec gunicorn core.asgi:application --config gunicorn.conf.py
+fi
+
+exec gunicorn core.wsgi:application --config gunicorn.conf.py
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import HabitTemplate, Task, TimeEntry
+from .models import HabitTemplate, Task, TimeEntry, TimeEntrySummary
 
 
 @admin.register(HabitTemplate)
@@ -25,6 +25,8 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ["date", "completed", "created_at", "user", "habit_template"]
     search_fields = ["title", "description"]
     date_hierarchy = "date"
+    # Kept by the timer paths; repaired by `manage.py check_task_totals --repair`.
+    readonly_fields = ["tracked_seconds", "active_entry"]
 
 
 @admin.register(TimeEntry)
@@ -34,3 +36,12 @@ class TimeEntryAdmin(admin.ModelAdmin):
     search_fields = ["task__title"]
     date_hierarchy = "start_time"
     readonly_fields = ["created_at"]
+
+
+@admin.register(TimeEntrySummary)
+class TimeEntrySummaryAdmin(admin.ModelAdmin):
+    list_display = ["task", "day", "entry_count", "tracked_seconds", "archived_at"]
+    list_filter = ["day"]
+    search_fields = ["task__title"]
+    date_hierarchy = "day"
+    readonly_fields = ["archived_at"]
@@ -1,9 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import HabitTemplateViewSet, TimeEntryViewSet
+from .views import HabitTemplateViewSet, TimeEntryViewSet, export_rows
 
 router = DefaultRouter()
 router.register("templates", HabitTemplateViewSet, basename="templates")
 router.register("time-entries", TimeEntryViewSet, basename="time_entries")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("export/<str:kind>/", export_rows),
+] + router.urls
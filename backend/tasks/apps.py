@@ -3,4 +3,12 @@ from django.apps import AppConfig
 
 class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "tasks"
\ No newline at end of file
+    name = "tasks"
+
+    def ready(self):
+        from events.broker import register_resolver
+
+        from . import signals  # noqa: F401  (connects the receivers)
+        from .changes import resolve_payloads
+
+        register_resolver(resolve_payloads)
@@ -0,0 +1,213 @@
+"""Archival of old finished time entries into per-(task, day) summaries.
+
+`archive_time_entries(before=...)` moves every finished entry that started
+before `before` out of TimeEntry, in batches of `batch_size` entries, each in
+its own transaction:
+
+- the entries are locked and read;
+- optionally written to a cold archive (NDJSON, one entry per line, with
+  the bucket, task title and day: enough to restore or audit them);
+- their duration and count are added to the TimeEntrySummary row of their
+  (task, local start day), which is created if needed;
+- the entries are deleted.
+
+Finished time is always the live entries plus the summaries: the stored task
+totals (tasks.totals), the rollups (dashboards.rollups) and the dashboard
+trend are computed from both, through the expressions below. Archiving
+therefore changes no reported figure, so no day version is bumped. Archived
+entries no longer appear in the time-entry listings and exports; the cold
+archive keeps them.
+
+Running entries are never archived.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .listing import date_formatter, datetime_formatter
+from .models import TimeEntry, TimeEntrySummary
+
+BATCH_SIZE = 5000
+
+# Columns of the cold archive, in order.
+ARCHIVE_COLUMNS = (
+    "id",
+    "user_id",
+    "task_id",
+    "title",
+    "date",
+    "start_time",
+    "end_time",
+    "duration_seconds",
+    "created_at",
+)
+
+
+def _task_total(model, outer: str, aggregate):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(task_id=OuterRef(outer))
+            .order_by()
+            .values("task_id")
+            .annotate(total=aggregate)
+            .values("total")
+        ),
+        0,
+    )
+
+
+def finished_seconds(outer: str = "pk"):
+    """Tracked seconds of the task `outer` refers to: live entries plus archived summaries."""
+
+    return _task_total(TimeEntry, outer, Sum("duration_seconds")) + _task_total(
+        TimeEntrySummary, outer, Sum("tracked_seconds")
+    )
+
+
+def finished_entry_count(outer: str = "pk"):
+    """Number of entries of the task `outer` refers to, archived ones included."""
+
+    return _task_total(TimeEntry, outer, Count("id")) + _task_total(TimeEntrySummary, outer, Sum("entry_count"))
+
+
+def archive_cutoff(days: int) -> datetime:
+    """Local midnight `days` days ago: entries that started before it get archived."""
+
+    day = timezone.localdate() - timedelta(days=days)
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+@dataclass
+class ArchiveResult:
+    archived: int = 0
+    seconds_archived: int = 0
+    summaries_created: int = 0
+    summaries_updated: int = 0
+    seconds: float = 0.0
+
+
+def cold_rows(qs):
+    """`qs` (TimeEntry) as tuples in ARCHIVE_COLUMNS order."""
+
+    return qs.annotate(user_id=F("task__user_id"), title=F("task__title"), date=F("task__date")).values_list(
+        *ARCHIVE_COLUMNS
+    )
+
+
+def write_cold(output, rows):
+    """Append `rows` (tuples in ARCHIVE_COLUMNS order) to the binary file `output` as NDJSON."""
+
+    format_date = date_formatter()
+    format_datetime = datetime_formatter()
+    lines = []
+    for row in rows:
+        record = dict(zip(ARCHIVE_COLUMNS, row))
+        record["date"] = format_date(record["date"])
+        for column in ("start_time", "end_time", "created_at"):
+            record[column] = format_datetime(record[column])
+        lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    output.write("".join(lines).encode("utf-8"))
+    output.flush()
+
+
+def _archive_batch(*, before: datetime, batch_size: int, output, result: ArchiveResult) -> int:
+    with transaction.atomic():
+        rows = list(
+            cold_rows(
+                TimeEntry.objects.select_for_update(of=("self",))
+                .filter(end_time__isnull=False, start_time__lt=before)
+                .order_by("start_time", "id")
+            )[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        # (task_id, day) -> [seconds, entries, first start, last end]
+        totals: dict = defaultdict(lambda: [0, 0, None, None])
+        for _, _, task_id, _, _, start, end, duration, _ in rows:
+            total = totals[(task_id, timezone.localdate(start))]
+            total[0] += duration
+            total[1] += 1
+            total[2] = start if total[2] is None else min(total[2], start)
+            total[3] = end if total[3] is None else max(total[3], end)
+
+        existing = {
+            (summary.task_id, summary.day): summary
+            for summary in TimeEntrySummary.objects.select_for_update().filter(
+                task_id__in={task_id for task_id, _ in totals}, day__in={day for _, day in totals}
+            )
+        }
+        created, updated = [], []
+        now = timezone.now()
+        for (task_id, day), (seconds, count, first_start, last_end) in totals.items():
+            summary = existing.get((task_id, day))
+            if summary is None:
+                created.append(
+                    TimeEntrySummary(
+                        task_id=task_id,
+                        day=day,
+                        tracked_seconds=seconds,
+                        entry_count=count,
+                        first_start=first_start,
+                        last_end=last_end,
+                        archived_at=now,
+                    )
+                )
+                continue
+            summary.tracked_seconds += seconds
+            summary.entry_count += count
+            summary.first_start = min(summary.first_start, first_start)
+            summary.last_end = max(summary.last_end, last_end)
+            summary.archived_at = now
+            updated.append(summary)
+        TimeEntrySummary.objects.bulk_create(created)
+        TimeEntrySummary.objects.bulk_update(
+            updated, ["tracked_seconds", "entry_count", "first_start", "last_end", "archived_at"]
+        )
+
+        if output is not None:
+            # Written before the commit: a crash can leave entries in the file
+            # that are still live (and archived again next run), never lose any.
+            write_cold(output, rows)
+        TimeEntry.objects.filter(pk__in=[row[0] for row in rows]).delete()
+
+    result.archived += len(rows)
+    result.seconds_archived += sum(row[7] for row in rows)
+    result.summaries_created += len(created)
+    result.summaries_updated += len(updated)
+    return len(rows)
+
+
+def archive_time_entries(*, before: datetime, batch_size: int = BATCH_SIZE, output=None, progress=None) -> ArchiveResult:
+    """Archive finished entries that started before `before`; `output` is a binary file for the cold archive.
+
+    `progress(result)` is called after each committed batch.
+    """
+
+    result = ArchiveResult()
+    started = time.monotonic()
+    while _archive_batch(before=before, batch_size=batch_size, output=output, result=result):
+        result.seconds = time.monotonic() - started
+        if progress:
+            progress(result)
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def pending_archive(*, before: datetime) -> tuple[int, int]:
+    """(entries, seconds) that archive_time_entries(before=...) would move."""
+
+    totals = TimeEntry.objects.filter(end_time__isnull=False, start_time__lt=before).aggregate(
+        entries=Count("id"), seconds=Coalesce(Sum("duration_seconds"), 0)
+    )
+    return totals["entries"], totals["seconds"]
@@ -0,0 +1,188 @@
+"""Batch mutations for tasks and time entries.
+
+A batch is a list of operations validated together and applied in a single
+transaction with set-based SQL (bulk_create / bulk_update / one DELETE):
+
+    {"operations": [
+        {"op": "create", "data": {"title": "Read", "target_seconds": 1800}},
+        {"op": "update", "id": 12, "data": {"completed": true}},
+        {"op": "delete", "id": 13}
+    ]}
+
+Either every operation is valid and all are applied, or nothing is written
+and the per-item errors are returned; the valid operations of a rejected
+batch are reported as "rolled_back".
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+
+from dashboards.rollups import rebuild_task_rollups
+from events.broker import lock_bucket
+
+from . import totals
+from .changes import publish_task_changes, publish_task_deletions, publish_timer_changes
+from .models import Task, TimeEntry
+from .serializers import TaskSerializer
+from .services import with_timer_annotations
+
+MAX_BATCH_OPERATIONS = 500
+
+TASK_OPS = {"create", "update", "delete"}
+TIME_ENTRY_OPS = {"delete"}
+
+
+class BatchError(Exception):
+    """The batch as a whole is malformed (not a per-item validation error)."""
+
+
+def _operations(payload, allowed_ops) -> list[dict]:
+    operations = payload.get("operations") if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('Expected a non-empty "operations" list.')
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f"At most {MAX_BATCH_OPERATIONS} operations per batch.")
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get("op") not in allowed_ops:
+            raise BatchError(f'Each operation needs an "op" in {sorted(allowed_ops)}.')
+    return operations
+
+
+def _rejected(operations, errors) -> list[dict]:
+    """Per-operation results of a batch that was not applied."""
+
+    return [
+        {"index": index, "op": operation["op"], "status": "error", "errors": errors[index]}
+        if index in errors
+        else {"index": index, "op": operation["op"], "status": "rolled_back"}
+        for index, operation in enumerate(operations)
+    ]
+
+
+def _target_ids(operations, errors) -> list[int]:
+    """Validate ids of update/delete operations; each object may be targeted once."""
+
+    seen = set()
+    for index, operation in enumerate(operations):
+        if operation["op"] == "create":
+            continue
+        obj_id = operation.get("id")
+        if not isinstance(obj_id, int):
+            errors[index] = {"id": ["A valid integer is required."]}
+        elif obj_id in seen:
+            errors[index] = {"id": ["Only one operation per id is allowed in a batch."]}
+        else:
+            seen.add(obj_id)
+    return list(seen)
+
+
+def apply_task_batch(*, user, task_qs, payload):
+    """Validate and apply task operations. Returns (ok, results)."""
+
+    operations = _operations(payload, TASK_OPS)
+    errors: dict[int, dict] = {}
+    existing = task_qs.in_bulk(_target_ids(operations, errors))
+
+    serializers = {}
+    for index, operation in enumerate(operations):
+        if index in errors:
+            continue
+        op = operation["op"]
+        if op != "create" and operation["id"] not in existing:
+            errors[index] = {"detail": "Not found."}
+            continue
+        if op == "delete":
+            continue
+        data = operation.get("data") or {}
+        if op == "create":
+            serializer = TaskSerializer(data=data)
+        else:
+            serializer = TaskSerializer(existing[operation["id"]], data=data, partial=True)
+        if serializer.is_valid():
+            serializers[index] = serializer
+        else:
+            errors[index] = serializer.errors
+
+    if errors:
+        return False, _rejected(operations, errors)
+
+    created: dict[int, Task] = {}
+    updated: dict[int, Task] = {}
+    update_fields: set[str] = set()
+    deleted = []
+    previous_dates = set()
+    for index, operation in enumerate(operations):
+        op = operation["op"]
+        if op == "create":
+            created[index] = Task(user=user, **serializers[index].validated_data)
+        elif op == "update":
+            task = existing[operation["id"]]
+            previous_dates.add(task.date)
+            for field, value in serializers[index].validated_data.items():
+                setattr(task, field, value)
+                update_fields.add(field)
+            updated[index] = task
+        else:
+            task = existing[operation["id"]]
+            deleted.append((task.pk, task.date))
+
+    user_id = getattr(user, "pk", user)
+    with transaction.atomic():
+        lock_bucket(user_id)
+        if created:
+            Task.objects.bulk_create(list(created.values()))
+        if updated and update_fields:
+            Task.objects.bulk_update(list(updated.values()), sorted(update_fields))
+        if deleted:
+            # Cascades to time entries and rollup rows.
+            Task.objects.filter(pk__in=[task_id for task_id, _ in deleted]).delete()
+        rebuild_task_rollups([task.pk for task in [*created.values(), *updated.values()]])
+
+        publish_task_changes("created", created.values(), user_id=user_id)
+        publish_task_changes("updated", updated.values(), user_id=user_id, previous_dates=previous_dates)
+        publish_task_deletions(deleted, user_id=user_id)
+
+    written = {task.pk for task in [*created.values(), *updated.values()]}
+    fresh = with_timer_annotations(Task.objects.filter(pk__in=written)).in_bulk() if written else {}
+
+    results = []
+    for index, operation in enumerate(operations):
+        op = operation["op"]
+        if op == "delete":
+            results.append({"index": index, "op": op, "status": "ok", "id": operation["id"]})
+            continue
+        task = fresh[(created.get(index) or updated.get(index)).pk]
+        results.append(
+            {"index": index, "op": op, "status": "ok", "id": task.pk, "data": TaskSerializer(task).data}
+        )
+    return True, results
+
+
+def apply_time_entry_batch(*, entry_qs, payload):
+    """Validate and apply time-entry operations (delete only). Returns (ok, results)."""
+
+    operations = _operations(payload, TIME_ENTRY_OPS)
+    errors: dict[int, dict] = {}
+    existing = entry_qs.in_bulk(_target_ids(operations, errors))
+    for index, operation in enumerate(operations):
+        if index not in errors and operation["id"] not in existing:
+            errors[index] = {"detail": "Not found."}
+
+    if errors:
+        return False, _rejected(operations, errors)
+
+    entries = list(existing.values())
+    # entry_qs is scoped to one bucket.
+    user_id = entries[0].task.user_id
+    with transaction.atomic():
+        lock_bucket(user_id)
+        TimeEntry.objects.filter(pk__in=list(existing)).delete()
+        totals.remove_entries(entries)
+        rebuild_task_rollups({entry.task_id for entry in entries})
+        publish_timer_changes("deleted", entries, user_id=user_id)
+
+    return True, [
+        {"index": index, "op": operation["op"], "status": "ok", "id": operation["id"]}
+        for index, operation in enumerate(operations)
+    ]
@@ -0,0 +1,176 @@
+"""Change notifications for task writes: SSE events and per-day version stamps.
+
+Call these inside the transaction of the write. Each call also bumps the
+DayVersion of every day the write touched (tasks.versions), which
+invalidates the ETags of that day's list, stats and dashboard. Events:
+
+- `task` events carry the serialized task (`created`/`updated`), or its id
+  and date (`deleted`), or the populated/imported range (`populated`,
+  `imported`);
+- `timer` events (`started`/`stopped`/`deleted`) carry the entry and the
+  serialized task it belongs to;
+- `rollup` events carry the dashboard rollup rows of the affected tasks.
+
+Tasks and rollup rows are stored as ids and serialized when a stream reads
+the event (`resolve_payloads`, registered with events.broker in
+TasksConfig.ready), so a write only pays for the INSERT. A stream therefore
+sends the state as of its read, never older than the event; events of tasks
+deleted since are skipped, as their `deleted` event follows. A client can
+apply them to its task list and dashboard in place.
+"""
+
+from __future__ import annotations
+
+from dashboards.models import DailyTaskRollup
+from events.broker import change, publish
+from events.models import ChangeEvent
+
+from .models import Task
+from .serializers import TaskSerializer, TimeEntrySerializer
+from .versions import bump_day_versions
+
+_ROLLUP_FIELDS = ["task_id", "date", "title", "target_seconds", "completed", "tracked_seconds", "entry_count"]
+
+
+def _serialized_tasks(task_ids) -> dict[int, dict]:
+    from .services import with_timer_annotations  # services imports this module.
+
+    tasks = with_timer_annotations(Task.objects.filter(pk__in=list(task_ids))).order_by()
+    return {task.pk: TaskSerializer(task).data for task in tasks}
+
+
+def _rollup_event(task_ids, *, user_id) -> ChangeEvent:
+    return change(ChangeEvent.KIND_ROLLUP, "updated", user_id=user_id, task_ids=sorted(task_ids))
+
+
+def resolve_payloads(events):
+    """Serialize the tasks and rollup rows a batch of events refers to, two queries at most."""
+
+    task_ids = {event.payload["task_id"] for event in events if "task_id" in event.payload}
+    rollup_ids = {task_id for event in events for task_id in event.payload.get("task_ids", ())}
+    tasks = _serialized_tasks(task_ids) if task_ids else {}
+    rows: dict[int, list[dict]] = {}
+    if rollup_ids:
+        for row in DailyTaskRollup.objects.filter(task_id__in=rollup_ids).values(*_ROLLUP_FIELDS):
+            rows.setdefault(row["task_id"], []).append(row)
+
+    for event in events:
+        payload = event.payload
+        if "task_id" in payload:
+            payload = {key: value for key, value in payload.items() if key != "task_id"}
+            payload["task"] = tasks.get(event.payload["task_id"])
+            if payload["task"] is None and event.kind == ChangeEvent.KIND_TASK:
+                payload = None
+        elif "task_ids" in payload:
+            payload = {"rows": [row for task_id in payload["task_ids"] for row in rows.get(task_id, ())]}
+        event.payload = payload
+
+
+def publish_task_changes(action: str, tasks, *, user_id, previous_dates=()) -> int:
+    """`created`/`updated` events for the given (saved) tasks plus their rollups.
+
+    `previous_dates` are the days updated tasks were moved away from.
+    """
+
+    tasks = list(tasks)
+    if not tasks:
+        return 0
+    bump_day_versions(user_id=user_id, dates={task.date for task in tasks} | set(previous_dates))
+    events = [change(ChangeEvent.KIND_TASK, action, user_id=user_id, task_id=task.pk) for task in tasks]
+    events.append(_rollup_event({task.pk for task in tasks}, user_id=user_id))
+    return publish(events)
+
+
+def publish_task_deletions(tasks, *, user_id) -> int:
+    """`deleted` events for (id, date) pairs, after the delete; rollup rows went with the tasks."""
+
+    from .services import _running_entries_for_user  # services imports this module.
+
+    tasks = list(tasks)
+    dates = {task_date for _, task_date in tasks}
+    # A deleted task may have taken the bucket's running timer with it.
+    running = set(
+        _running_entries_for_user(user=user_id).filter(task__date__in=dates).values_list("task__date", flat=True)
+    )
+    bump_day_versions(user_id=user_id, dates=dates - running, active_timer=False)
+    bump_day_versions(user_id=user_id, dates=running)
+    return publish(
+        change(ChangeEvent.KIND_TASK, "deleted", user_id=user_id, id=task_id, date=task_date)
+        for task_id, task_date in tasks
+    )
+
+
+def publish_populated(*, user_id, dates, created: int) -> int:
+    """One summary event for a populate run; clients refetch the affected days."""
+
+    dates = list(dates)
+    if not created or not dates:
+        return 0
+    bump_day_versions(user_id=user_id, dates=dates)
+    return publish(
+        [
+            change(
+                ChangeEvent.KIND_TASK,
+                "populated",
+                user_id=user_id,
+                start=min(dates),
+                end=max(dates),
+                created=created,
+            )
+        ]
+    )
+
+
+def publish_imported(*, user_id, dates, tasks_created: int, entries_created: int) -> int:
+    """One summary event per imported batch (tasks.imports); clients refetch the affected days."""
+
+    dates = list(dates)
+    if not dates:
+        return 0
+    bump_day_versions(user_id=user_id, dates=dates)
+    return publish(
+        [
+            change(
+                ChangeEvent.KIND_TASK,
+                "imported",
+                user_id=user_id,
+                start=min(dates),
+                end=max(dates),
+                tasks_created=tasks_created,
+                entries_created=entries_created,
+            )
+        ]
+    )
+
+
+def publish_timer_changes(action: str, entries, *, user_id) -> int:
+    """`started`/`stopped`/`deleted` events for time entries plus their tasks' rollups.
+
+    Reads `entry.task`, so fetch the entries with select_related("task").
+    """
+
+    entries = list(entries)
+    if not entries:
+        return 0
+    task_ids = {entry.task_id for entry in entries}
+    if action == "started":
+        active_timer = True
+    elif action == "stopped" or any(entry.end_time is None for entry in entries):
+        active_timer = False
+    else:
+        active_timer = None
+    bump_day_versions(
+        user_id=user_id, dates={entry.task.date for entry in entries}, active_timer=active_timer
+    )
+    events = [
+        change(
+            ChangeEvent.KIND_TIMER,
+            action,
+            user_id=user_id,
+            entry=TimeEntrySerializer(entry).data,
+            task_id=entry.task_id,
+        )
+        for entry in entries
+    ]
+    events.append(_rollup_event(task_ids, user_id=user_id))
+    return publish(events)
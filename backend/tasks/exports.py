@@ -0,0 +1,168 @@
+"""Streaming CSV/NDJSON export of tasks and time entries over a date range.
+
+An `Export` is iterated (sync, for WSGI and the management command) or
+async-iterated (ASGI) into byte chunks. Rows are read with a chunked
+`.iterator()` (a server-side cursor on Postgres) and encoded CHUNK_SIZE rows
+at a time, so memory stays flat however many rows the range holds. (An ASGI
+StreamingHttpResponse would buffer a sync iterator whole, hence __aiter__.)
+
+Dates of time entries are their task's day, like everywhere else in the API.
+Datetimes are formatted as in the JSON API (ISO 8601, local time zone).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+
+from .listing import date_formatter, datetime_formatter
+from .models import Task, TimeEntry
+
+# Rows fetched per database round trip and encoded per yielded chunk.
+CHUNK_SIZE = 2000
+
+KIND_TASKS = "tasks"
+KIND_TIME_ENTRIES = "time-entries"
+KINDS = (KIND_TASKS, KIND_TIME_ENTRIES)
+
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+FORMATS = tuple(CONTENT_TYPES)
+
+COLUMNS = {
+    KIND_TASKS: (
+        "id",
+        "date",
+        "title",
+        "description",
+        "habit_template_id",
+        "target_seconds",
+        "completed",
+        "tracked_seconds",
+        "created_at",
+    ),
+    KIND_TIME_ENTRIES: (
+        "id",
+        "task_id",
+        "task_title",
+        "date",
+        "start_time",
+        "end_time",
+        "duration_seconds",
+        "created_at",
+    ),
+}
+
+_DATE_COLUMNS = {"date"}
+_DATETIME_COLUMNS = {"created_at", "start_time", "end_time"}
+
+
+def _bucket_queryset(kind: str, user_id):
+    if kind == KIND_TASKS:
+        qs = Task.objects.all()
+        return qs.filter(user__isnull=True) if user_id is None else qs.filter(user_id=user_id)
+    qs = TimeEntry.objects.all()
+    return qs.filter(task__user__isnull=True) if user_id is None else qs.filter(task__user_id=user_id)
+
+
+def _csv_bytes(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+@dataclass(frozen=True)
+class Export:
+    kind: str
+    format: str
+    user_id: int | None
+    start: date
+    end: date
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown export kind {self.kind!r} (expected one of: {', '.join(KINDS)}).")
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown export format {self.format!r} (expected one of: {', '.join(FORMATS)}).")
+        if self.end < self.start:
+            raise ValueError("The end date must not be before the start date.")
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.kind}-{self.start}-{self.end}.{self.format}"
+
+    def queryset(self):
+        """Rows as tuples in COLUMNS order, oldest day first."""
+
+        qs = _bucket_queryset(self.kind, self.user_id)
+        if self.kind == KIND_TASKS:
+            return (
+                # tracked_seconds: finished time, stored on the task (tasks.totals).
+                qs.filter(date__range=(self.start, self.end))
+                .order_by("date", "-created_at", "-id")
+                .values_list(*COLUMNS[self.kind])
+            )
+        return (
+            qs.filter(task__date__range=(self.start, self.end))
+            .annotate(task_title=F("task__title"), date=F("task__date"))
+            .order_by("date", "start_time", "id")
+            .values_list(*COLUMNS[self.kind])
+        )
+
+    def _encoder(self):
+        """(header, encode): the leading bytes and a rows -> bytes function."""
+
+        columns = COLUMNS[self.kind]
+        format_date = date_formatter()
+        format_datetime = datetime_formatter()
+        converters = [
+            format_date if column in _DATE_COLUMNS else format_datetime if column in _DATETIME_COLUMNS else None
+            for column in columns
+        ]
+
+        def convert(row):
+            return [value if fn is None or value is None else fn(value) for fn, value in zip(converters, row)]
+
+        if self.format == "csv":
+            return _csv_bytes([columns]), lambda rows: _csv_bytes(map(convert, rows))
+
+        def encode(rows) -> bytes:
+            return "".join(
+                json.dumps(dict(zip(columns, convert(row))), ensure_ascii=False, separators=(",", ":")) + "\n"
+                for row in rows
+            ).encode("utf-8")
+
+        return b"", encode
+
+    def __iter__(self):
+        header, encode = self._encoder()
+        if header:
+            yield header
+        batch = []
+        for row in self.queryset().iterator(chunk_size=CHUNK_SIZE):
+            batch.append(row)
+            if len(batch) == CHUNK_SIZE:
+                yield encode(batch)
+                batch = []
+        if batch:
+            yield encode(batch)
+
+    async def __aiter__(self):
+        # Chunks are produced by the sync iterator in the (thread-sensitive)
+        # ORM thread: one hop per CHUNK_SIZE rows, on one database connection.
+        chunks = iter(self)
+        next_chunk = sync_to_async(next)
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
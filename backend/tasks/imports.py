@@ -0,0 +1,398 @@
+"""Bulk import of finished time entries from CSV or NDJSON.
+
+Each row is one entry of one bucket:
+
+    title,date,start_time,end_time,duration_seconds,target_seconds,description
+    Read,2024-03-01,2024-03-01T08:00:00+01:00,2024-03-01T08:25:00+01:00,,1800,
+
+`title`, `start_time` and `end_time` are required. `date` defaults to the
+local day of `start_time`, `duration_seconds` to the whole seconds between
+start and end. `target_seconds` and `description` only apply to tasks the
+import creates. Naive datetimes are in the server's TIME_ZONE.
+
+Rows are parsed as a stream and written in batches of `batch_size`, each in
+its own transaction:
+
+- the task of each (title, date) is looked up, or created with bulk_create;
+- entries already present (same task and start_time, or within the span of
+  an archived day of the task, see tasks.archive) are skipped, so an
+  interrupted import can simply be run again;
+- new entries are inserted with COPY on Postgres and bulk_create elsewhere;
+- the tracked time of the touched tasks (tasks.totals) and their rollups
+  are updated, day versions bumped (which invalidates the response cache)
+  and one `imported` change event is published.
+
+Invalid rows are skipped and reported with their line number; the first
+MAX_ERRORS are kept.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from dashboards.rollups import add_tracked_time, rebuild_task_rollups
+from events.broker import lock_bucket
+
+from . import totals
+from .changes import publish_imported
+from .models import Task, TimeEntry, TimeEntrySummary
+
+BATCH_SIZE = 5000
+MAX_ERRORS = 1000
+
+FORMATS = ("csv", "ndjson")
+REQUIRED_FIELDS = ("title", "start_time", "end_time")
+
+# (title, date) -> task id; dropped when it grows past this many tasks.
+_TASK_CACHE_LIMIT = 100_000
+
+_TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+
+
+class ImportFileError(Exception):
+    """The file as a whole cannot be imported (not a per-row error)."""
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    skipped: int = 0
+    tasks_created: int = 0
+    error_count: int = 0
+    errors: list[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def add_error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "tasks_created": self.tasks_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+@dataclass(frozen=True)
+class _Row:
+    title: str
+    date: date
+    start_time: datetime
+    end_time: datetime
+    duration_seconds: int
+    target_seconds: int
+    description: str
+
+
+def _records(text, format: str):
+    """(line number, dict) pairs from a text stream."""
+
+    if format == "csv":
+        reader = csv.DictReader(text)
+        missing = [name for name in REQUIRED_FIELDS if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ImportFileError(f"CSV header is missing column(s): {', '.join(missing)}.")
+        try:
+            for record in reader:
+                yield reader.line_num, record
+        except csv.Error as exc:
+            raise ImportFileError(f"Line {reader.line_num}: {exc}")
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        yield line_number, record if isinstance(record, dict) else "Expected a JSON object."
+
+
+def _optional(record: dict, name: str):
+    value = record.get(name)
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value in (None, "") else value
+
+
+def _datetime(record: dict, name: str) -> datetime:
+    value = _optional(record, name)
+    if value is None:
+        raise ValueError(f"{name} is required.")
+    parsed = None
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"{name} is not an ISO 8601 datetime: {value!r}.")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def _non_negative_int(record: dict, name: str) -> int | None:
+    value = _optional(record, name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer.")
+    if number < 0 or isinstance(value, bool):
+        raise ValueError(f"{name} must be a non-negative integer.")
+    return number
+
+
+def _parse(record: dict) -> _Row:
+    title = _optional(record, "title")
+    if not isinstance(title, str) or not title:
+        raise ValueError("title is required.")
+    if len(title) > _TITLE_MAX_LENGTH:
+        raise ValueError(f"title is longer than {_TITLE_MAX_LENGTH} characters.")
+
+    start_time = _datetime(record, "start_time")
+    end_time = _datetime(record, "end_time")
+    if end_time < start_time:
+        raise ValueError("end_time is before start_time.")
+
+    day = _optional(record, "date")
+    try:
+        day = date.fromisoformat(day) if day is not None else timezone.localdate(start_time)
+    except (TypeError, ValueError):
+        raise ValueError(f"date is not YYYY-MM-DD: {day!r}.")
+
+    duration = _non_negative_int(record, "duration_seconds")
+    if duration is None:
+        duration = max(0, int((end_time - start_time).total_seconds()))
+
+    description = _optional(record, "description") or ""
+    return _Row(
+        title=title,
+        date=day,
+        start_time=start_time,
+        end_time=end_time,
+        duration_seconds=duration,
+        target_seconds=_non_negative_int(record, "target_seconds") or 0,
+        description=str(description),
+    )
+
+
+def _bucket_tasks(user_id):
+    if user_id is None:
+        return Task.objects.filter(user__isnull=True)
+    return Task.objects.filter(user_id=user_id)
+
+
+def _resolve_tasks(rows: list[_Row], *, user_id, cache: dict) -> list[_Row]:
+    """Fill `cache` with the task id of every (title, date); returns the rows whose task was created."""
+
+    wanted: dict[tuple[str, date], _Row] = {}
+    for row in rows:
+        if (row.title, row.date) not in cache:
+            # The first row of a new task supplies its target and description.
+            wanted.setdefault((row.title, row.date), row)
+    if not wanted:
+        return []
+
+    def lookup():
+        existing = (
+            _bucket_tasks(user_id)
+            .filter(date__in={day for _, day in wanted}, title__in={title for title, _ in wanted})
+            .order_by("-id")
+            .values_list("title", "date", "id")
+        )
+        for title, day, task_id in existing:
+            # The oldest task wins when a day has several with the same title.
+            if (title, day) in wanted:
+                cache[(title, day)] = task_id
+
+    lookup()
+    missing = [row for key, row in wanted.items() if key not in cache]
+    created = Task.objects.bulk_create(
+        [
+            Task(
+                user_id=user_id,
+                title=row.title,
+                date=row.date,
+                target_seconds=row.target_seconds,
+                description=row.description,
+            )
+            for row in missing
+        ]
+    )
+    if created and created[0].pk is None:
+        # Backends that cannot return ids from a bulk insert.
+        lookup()
+    else:
+        for task in created:
+            cache[(task.title, task.date)] = task.pk
+    return missing
+
+
+def _copy_entries(entries: list[TimeEntry]):
+    """Insert with COPY ... FROM STDIN (Postgres; psycopg2 or psycopg 3)."""
+
+    columns = ["task_id", "start_time", "end_time", "duration_seconds", "created_at"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for entry in entries:
+        writer.writerow(
+            [
+                entry.task_id,
+                entry.start_time.isoformat(),
+                entry.end_time.isoformat(),
+                entry.duration_seconds,
+                entry.created_at.isoformat(),
+            ]
+        )
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        quote(TimeEntry._meta.db_table),
+        ", ".join(quote(TimeEntry._meta.get_field(name).column) for name in columns),
+    )
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            buffer.seek(0)
+            raw.copy_expert(sql, buffer)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _write_batch(rows: list[_Row], *, user_id, cache: dict, result: ImportResult):
+    with transaction.atomic():
+        lock_bucket(user_id)
+        new_tasks = _resolve_tasks(rows, user_id=user_id, cache=cache)
+        task_ids = {cache[(row.title, row.date)] for row in rows}
+
+        # Look up by start_time alone: that index is far more selective than the task's.
+        seen = {
+            key
+            for key in TimeEntry.objects.filter(start_time__in={row.start_time for row in rows})
+            .order_by()
+            .values_list("task_id", "start_time")
+            if key[0] in task_ids
+        }
+        archived = defaultdict(list)
+        for task_id, first_start, last_end in TimeEntrySummary.objects.filter(
+            task_id__in=task_ids,
+            first_start__lte=max(row.start_time for row in rows),
+            last_end__gte=min(row.start_time for row in rows),
+        ).values_list("task_id", "first_start", "last_end"):
+            archived[task_id].append((first_start, last_end))
+        now = timezone.now()
+        entries = []
+        for row in rows:
+            key = (cache[(row.title, row.date)], row.start_time)
+            if key in seen or any(first <= row.start_time <= last for first, last in archived[key[0]]):
+                result.skipped += 1
+                continue
+            seen.add(key)
+            entries.append(
+                TimeEntry(
+                    task_id=key[0],
+                    start_time=row.start_time,
+                    end_time=row.end_time,
+                    duration_seconds=row.duration_seconds,
+                    created_at=now,
+                )
+            )
+
+        if entries and connection.vendor == "postgresql":
+            _copy_entries(entries)
+        else:
+            TimeEntry.objects.bulk_create(entries, batch_size=1000)
+
+        tracked = defaultdict(int)
+        for entry in entries:
+            tracked[entry.task_id] += entry.duration_seconds
+        totals.add_tracked_seconds(tracked)
+
+        # New tasks get their rollup built from scratch; existing ones take a delta.
+        created_ids = {cache[(row.title, row.date)] for row in new_tasks}
+        rebuild_task_rollups(created_ids)
+        deltas = defaultdict(lambda: [0, 0])
+        for entry in entries:
+            if entry.task_id not in created_ids:
+                deltas[entry.task_id][0] += entry.duration_seconds
+                deltas[entry.task_id][1] += 1
+        for task_id, (seconds, count) in deltas.items():
+            add_tracked_time(task_id, seconds=seconds, entries=count)
+
+        touched = created_ids | {entry.task_id for entry in entries}
+        publish_imported(
+            user_id=user_id,
+            dates={row.date for row in rows if cache[(row.title, row.date)] in touched},
+            tasks_created=len(new_tasks),
+            entries_created=len(entries),
+        )
+
+    result.imported += len(entries)
+    result.tasks_created += len(new_tasks)
+    if len(cache) > _TASK_CACHE_LIMIT:
+        cache.clear()
+
+
+def import_time_entries(stream, *, format: str, user_id, batch_size: int = BATCH_SIZE, progress=None) -> ImportResult:
+    """Import a binary stream of CSV/NDJSON rows into one bucket (None: anonymous).
+
+    `progress(result)` is called after each committed batch.
+    """
+
+    if format not in FORMATS:
+        raise ImportFileError(f"Unknown format {format!r} (expected one of: {', '.join(FORMATS)}).")
+
+    result = ImportResult()
+    started = time.monotonic()
+    cache: dict = {}
+    batch: list[_Row] = []
+    # utf-8-sig: spreadsheet exports often start with a byte order mark.
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if format == "csv" else None)
+    try:
+        for line, record in _records(text, format):
+            result.rows += 1
+            if isinstance(record, str):
+                result.add_error(line, record)
+                continue
+            try:
+                batch.append(_parse(record))
+            except ValueError as exc:
+                result.add_error(line, str(exc))
+                continue
+            if len(batch) >= batch_size:
+                _write_batch(batch, user_id=user_id, cache=cache, result=result)
+                batch = []
+                result.seconds = time.monotonic() - started
+                if progress:
+                    progress(result)
+        if batch:
+            _write_batch(batch, user_id=user_id, cache=cache, result=result)
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(f"The file is not UTF-8 text: {exc}")
+    finally:
+        # Leave the caller's stream open.
+        text.detach()
+
+    result.seconds = time.monotonic() - started
+    if progress:
+        progress(result)
+    return result
@@ -0,0 +1,77 @@
+"""Move old finished time entries into per-(task, day) summaries.
+
+Usage:
+    python manage.py archive_time_entries [--days N] [--output PATH] [--batch-size N] [--dry-run]
+
+Entries that started before local midnight --days days ago (default:
+TIME_ENTRY_ARCHIVE_DAYS) are archived in batches, each committed on its own,
+so the command can run against a live database and be interrupted. Totals
+reported by the API do not change (see tasks.archive). With --output the
+entries are also appended to PATH as NDJSON (gzip-compressed if PATH ends in
+.gz). --dry-run only reports what would be archived.
+
+Run it from a scheduler to keep the time entry table (and its indexes)
+small. On Postgres, run VACUUM ANALYZE on it after the first large archive.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.archive import BATCH_SIZE, archive_cutoff, archive_time_entries, pending_archive
+
+
+class Command(BaseCommand):
+    help = "Archive finished time entries older than a horizon into daily per-task summaries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None, help="Keep entries from the last N days (default: TIME_ENTRY_ARCHIVE_DAYS)."
+        )
+        parser.add_argument("--output", help="Append the archived entries to this NDJSON (.gz) file.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Entries per transaction.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else settings.TIME_ENTRY_ARCHIVE_DAYS
+        if days < 1:
+            raise CommandError("--days must be at least 1 (today's entries are never archived).")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        before = archive_cutoff(days)
+
+        if options["dry_run"]:
+            entries, seconds = pending_archive(before=before)
+            self.stdout.write(f"Would archive {entries} entries ({seconds}s tracked) that started before {before}.")
+            return
+
+        def progress(result):
+            rate = result.archived / result.seconds if result.seconds else 0
+            self.stderr.write(f"{result.archived} entries archived ({rate:.0f} entries/s)")
+
+        path = options["output"]
+        try:
+            output = (gzip.open if path.endswith(".gz") else open)(path, "ab") if path else None
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            result = archive_time_entries(
+                before=before,
+                batch_size=options["batch_size"],
+                output=output,
+                progress=progress if options["verbosity"] >= 2 else None,
+            )
+        finally:
+            if output is not None:
+                output.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result.archived} entries ({result.seconds_archived}s tracked) that started before "
+                f"{before} in {result.seconds:.1f}s ({result.summaries_created} summaries created, "
+                f"{result.summaries_updated} updated)."
+            )
+        )
@@ -0,0 +1,218 @@
+"""Prepare the database and static files for startup, skipping what is up to date.
+
+Usage:
+    python manage.py boot [--force] [--skip-migrate] [--skip-static] [--lock-timeout SECONDS]
+
+Used by render_start.sh instead of running `migrate` and `collectstatic` on
+every start:
+
+- migrations: the migrations on disk are compared with the ones recorded as
+  applied; `migrate` only runs when some are pending. It runs under a lock (a
+  Postgres advisory lock, or a file lock next to a SQLite database) so that
+  when several instances start together one migrates and the others wait,
+  re-check and find nothing to do.
+- static files: a fingerprint of every file the staticfiles finders collect
+  (path and content) is stored next to the manifest in STATIC_ROOT;
+  `collectstatic` only runs when it differs or the manifest is missing, under
+  a file lock so instances sharing STATIC_ROOT do not collect at once.
+- partitions: when the time entry table is partitioned (Postgres, see
+  tasks.partitions), the upcoming monthly partitions are created.
+
+Prints the time spent in each phase. --force runs both steps regardless.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from tasks import partitions
+
+# pg_advisory_lock key: any constant shared by every instance of this app.
+_ADVISORY_LOCK_KEY = 0x7461736B  # "task"
+_FINGERPRINT_FILE = ".boot-fingerprint"
+_MANIFEST_FILE = "staticfiles.json"
+
+
+def pending_migrations(connection) -> list[str]:
+    """'app.migration' names on disk that are not recorded as applied."""
+
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+    return [f"{migration.app_label}.{migration.name}" for migration, _ in executor.migration_plan(targets)]
+
+
+def static_fingerprint() -> str:
+    """Hash of the collected static files (path and content) and the storage settings."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{settings.STATIC_URL}|{settings.STORAGES['staticfiles']['BACKEND']}".encode())
+    files = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(["CVS", ".*", "*~"]):
+            # Like collectstatic, the first finder to provide a path wins.
+            files.setdefault(path, storage)
+    for path in sorted(files):
+        digest.update(path.encode() + b"\0")
+        with files[path].open(path) as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def migration_lock(connection, timeout: float):
+    """Hold a lock shared by every instance migrating this database."""
+
+    deadline = time.monotonic() + timeout
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", [_ADVISORY_LOCK_KEY])
+                if cursor.fetchone()[0]:
+                    break
+                if time.monotonic() > deadline:
+                    raise CommandError(f"Timed out after {timeout:.0f}s waiting for the migration lock.")
+                time.sleep(0.5)
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [_ADVISORY_LOCK_KEY])
+    elif connection.vendor == "sqlite" and not connection.is_in_memory_db():
+        with file_lock(Path(f"{connection.settings_dict['NAME']}.boot-lock"), timeout):
+            yield
+    else:
+        # No other instance can share this database.
+        yield
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float):
+    """Exclusive flock on `path` (instances on one host); a no-op without fcntl."""
+
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    deadline = time.monotonic() + timeout
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as handle:
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f"Timed out after {timeout:.0f}s waiting for {path}.")
+                time.sleep(0.5)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class Command(BaseCommand):
+    help = "Run migrate and collectstatic only when needed, under a lock, and report the boot time per phase."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Run migrate and collectstatic regardless.")
+        parser.add_argument("--skip-migrate", action="store_true")
+        parser.add_argument("--skip-static", action="store_true")
+        parser.add_argument(
+            "--lock-timeout", type=float, default=300, help="Seconds to wait for another instance to finish a step."
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.phases = []
+        started = time.perf_counter()
+        if not options["skip_migrate"]:
+            self.migrate(force=options["force"], lock_timeout=options["lock_timeout"])
+            self.ensure_partitions()
+        if not options["skip_static"]:
+            self.collect_static(force=options["force"], lock_timeout=options["lock_timeout"])
+
+        self.stdout.write(f"{'phase':<22} {'ms':>8}  result")
+        for name, seconds, result in self.phases:
+            self.stdout.write(f"{name:<22} {seconds * 1000:>8.0f}  {result}")
+        self.stdout.write(self.style.SUCCESS(f"{'boot':<22} {(time.perf_counter() - started) * 1000:>8.0f}"))
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; it sets `outcome[0]` to describe the result."""
+
+        outcome = [""]
+        started = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            self.phases.append((name, time.perf_counter() - started, outcome[0]))
+
+    def migrate(self, *, force: bool, lock_timeout: float):
+        connection = connections[DEFAULT_DB_ALIAS]
+        with self.phase("migrations: check") as outcome:
+            pending = pending_migrations(connection)
+            outcome[0] = f"{len(pending)} pending" if pending else "up to date"
+        if not pending and not force:
+            return
+
+        waiting = time.perf_counter()
+        with migration_lock(connection, lock_timeout):
+            self.phases.append(("migrations: lock", time.perf_counter() - waiting, "acquired"))
+            with self.phase("migrations: apply") as outcome:
+                # Another instance may have migrated while we waited.
+                pending = pending_migrations(connection)
+                if pending or force:
+                    call_command("migrate", interactive=False, verbosity=max(0, self.verbosity - 1))
+                    outcome[0] = f"applied {len(pending)}"
+                else:
+                    outcome[0] = "applied by another instance"
+
+    def ensure_partitions(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if not partitions.is_partitioned(connection):
+            return
+        with self.phase("partitions: ensure") as outcome:
+            created = partitions.ensure_partitions(connection)
+            outcome[0] = f"created {', '.join(created)}" if created else "up to date"
+
+    def collect_static(self, *, force: bool, lock_timeout: float):
+        root = Path(settings.STATIC_ROOT)
+        with self.phase("static: fingerprint") as outcome:
+            fingerprint = static_fingerprint()
+            current = self.static_current(root, fingerprint)
+            outcome[0] = "up to date" if current else "changed or not collected"
+        if current and not force:
+            return
+
+        waiting = time.perf_counter()
+        # Instances on one host share STATIC_ROOT; collectstatic must not run twice at once.
+        with file_lock(root.parent / f".{root.name}.boot-lock", lock_timeout):
+            self.phases.append(("static: lock", time.perf_counter() - waiting, "acquired"))
+            with self.phase("static: collect") as outcome:
+                if not force and self.static_current(root, fingerprint):
+                    outcome[0] = "collected by another instance"
+                    return
+                call_command("collectstatic", interactive=False, verbosity=max(0, self.verbosity - 1))
+                # Written last (and atomically) so an interrupted run is redone next boot.
+                temporary = root / f"{_FINGERPRINT_FILE}.tmp"
+                temporary.write_text(fingerprint + "\n")
+                temporary.replace(root / _FINGERPRINT_FILE)
+                outcome[0] = "collected"
+
+    @staticmethod
+    def static_current(root: Path, fingerprint: str) -> bool:
+        stored = root / _FINGERPRINT_FILE
+        return stored.exists() and stored.read_text().strip() == fingerprint and (root / _MANIFEST_FILE).exists()
@@ -0,0 +1,105 @@
+"""Verify that the hot query paths are served by an index (EXPLAIN-based).
+
+Usage:
+    python manage.py check_query_plans [--verbose]
+
+Runs EXPLAIN for each query shape the API issues on every request and fails
+(non-zero exit) if any of them falls back to a full table scan. Works on
+SQLite (EXPLAIN QUERY PLAN) and Postgres (EXPLAIN with seq scans disabled so
+the check does not depend on table size/statistics).
+"""
+
+from __future__ import annotations
+
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from events.models import ChangeEvent
+from tasks.archive import archive_cutoff
+from tasks.exports import KIND_TASKS, KIND_TIME_ENTRIES, Export
+from tasks.models import DayVersion, Task, TimeEntry, TimeEntrySummary
+from tasks.services import _running_entries_for_user, with_timer_annotations
+
+# SQLite: "SCAN tasks_task" (no index) vs "SCAN tasks_task USING INDEX ..." / "SEARCH ...".
+_SQLITE_FULL_SCAN = re.compile(r"\bSCAN (?P<table>\w+)(?! USING)(?:\s|$)")
+# Postgres: any sequential scan on one of our tables.
+_POSTGRES_FULL_SCAN = re.compile(r"\bSeq Scan on (?P<table>\w+)")
+_PARTITION = re.compile(rf"(?<=^{TimeEntry._meta.db_table})_(?:p\d{{4}}_\d{{2}}|default)$")
+
+_CHECKED_TABLES = {
+    Task._meta.db_table,
+    TimeEntry._meta.db_table,
+    TimeEntrySummary._meta.db_table,
+    ChangeEvent._meta.db_table,
+    DayVersion._meta.db_table,
+}
+
+
+def hot_queries():
+    """(name, queryset) pairs mirroring the API's per-request access paths."""
+
+    today = timezone.localdate()
+    user = User(pk=1)
+
+    return [
+        ("task list (user, date)", with_timer_annotations(Task.objects.filter(user=user, date=today)).order_by("-created_at")),
+        ("task list (anonymous, date)", with_timer_annotations(Task.objects.filter(user__isnull=True, date=today)).order_by("-created_at")),
+        ("task stats (user, date)", Task.objects.filter(user=user, date=today, completed=True)),
+        ("populate existing (user, date)", Task.objects.filter(user=user, date=today, habit_template_id__in=[1]).values_list("habit_template_id", flat=True)),
+        ("running entries (user)", _running_entries_for_user(user=user)),
+        ("running entries (anonymous)", _running_entries_for_user(user=None)),
+        ("stop timer (task, running)", TimeEntry.objects.filter(task_id=1, end_time__isnull=True)),
+        ("task history (task)", TimeEntry.objects.filter(task_id=1).order_by("-start_time")),
+        ("day version (user, date)", DayVersion.objects.filter(user=user, date=today)),
+        ("day version (anonymous, date)", DayVersion.objects.filter(user__isnull=True, date=today)),
+        ("change stream (user)", ChangeEvent.objects.filter(user=user, id__gt=1).order_by("id")),
+        ("change stream (anonymous)", ChangeEvent.objects.filter(user__isnull=True, id__gt=1).order_by("id")),
+        ("export tasks (user, range)", Export(kind=KIND_TASKS, format="csv", user_id=1, start=today, end=today).queryset()),
+        ("export time entries (user, range)", Export(kind=KIND_TIME_ENTRIES, format="csv", user_id=1, start=today, end=today).queryset()),
+        ("archive batch (before)", TimeEntry.objects.filter(end_time__isnull=False, start_time__lt=archive_cutoff(90)).order_by("start_time", "id")[:5000]),
+    ]
+
+
+def full_scans(plan: str) -> list[str]:
+    pattern = _POSTGRES_FULL_SCAN if connection.vendor == "postgresql" else _SQLITE_FULL_SCAN
+    # A partitioned time entry table is scanned per partition (see tasks.partitions).
+    tables = [_PARTITION.sub("", m.group("table")) for m in pattern.finditer(plan)]
+    return [table for table in tables if table in _CHECKED_TABLES]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot query paths and fail if any of them needs a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose", action="store_true", help="Print each query plan.")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in {"sqlite", "postgresql"}:
+            raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Tiny tables make seq scans "cheaper"; we only care that an index is usable.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, qs in hot_queries():
+                plan = qs.explain()
+                scanned = full_scans(plan)
+                status = self.style.ERROR("FULL SCAN") if scanned else self.style.SUCCESS("index")
+                self.stdout.write(f"{name:<34} {status}")
+                if options["verbose"] or scanned:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+                if scanned:
+                    failures.append(f"{name}: {', '.join(sorted(set(scanned)))}")
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Queries without a usable index:\n  " + "\n  ".join(failures))
@@ -0,0 +1,94 @@
+"""Verify (and optionally repair) the timer state stored on tasks.
+
+Usage:
+    python manage.py check_task_totals [--repair] [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--batch-size N]
+
+Compares each task's tracked_seconds and active_entry (see tasks.totals)
+with its time entries and archived summaries, in primary-key batches, and
+lists the tasks that disagree. Without --repair it exits non-zero if any
+does; with --repair it recomputes them, one transaction per batch, and bumps
+their days' versions so no stale ETag is answered with 304.
+
+Both date bounds are inclusive and optional (default: every task).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks.models import Task
+from tasks.totals import drifted_tasks, rebuild_task_totals
+from tasks.versions import bump_day_versions
+
+# Drifted tasks printed in full; the rest are only counted.
+SHOWN = 20
+
+
+def _parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value!r} (expected YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Check the tracked time and running entry stored on tasks against their time entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Recompute the tasks that disagree.")
+        parser.add_argument("--start", help="First task date to check.")
+        parser.add_argument("--end", help="Last task date to check.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start, end = _parse_date(options["start"]), _parse_date(options["end"])
+        batch_size = options["batch_size"]
+        if start and end and end < start:
+            raise CommandError("--end must not be before --start.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        tasks = Task.objects.all()
+        if start:
+            tasks = tasks.filter(date__gte=start)
+        if end:
+            tasks = tasks.filter(date__lte=end)
+        ids = list(tasks.order_by("pk").values_list("pk", flat=True))
+
+        drifted = []
+        for offset in range(0, len(ids), batch_size):
+            batch = ids[offset : offset + batch_size]
+            if not options["repair"]:
+                drifted += drifted_tasks(Task.objects.filter(pk__in=batch))
+                continue
+            with transaction.atomic():
+                found = drifted_tasks(Task.objects.select_for_update().filter(pk__in=batch))
+                if found:
+                    repaired = [row[0] for row in found]
+                    rebuild_task_totals(repaired)
+                    days = set(Task.objects.filter(pk__in=repaired).values_list("user_id", "date"))
+                    for user_id in {user_id for user_id, _ in days}:
+                        bump_day_versions(user_id=user_id, dates=[day for owner, day in days if owner == user_id])
+            drifted += found
+
+        for task_id, seconds, entry_id, expected_seconds, expected_entry in drifted[:SHOWN]:
+            self.stdout.write(
+                f"  task {task_id}: tracked {seconds}s (expected {expected_seconds}s), "
+                f"running entry {entry_id} (expected {expected_entry})"
+            )
+        if len(drifted) > SHOWN:
+            self.stdout.write(f"  ... and {len(drifted) - SHOWN} more")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"All {len(ids)} tasks consistent."))
+        elif options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drifted)} of {len(ids)} tasks."))
+        else:
+            raise CommandError(
+                f"{len(drifted)} of {len(ids)} tasks disagree with their time entries; run with --repair."
+            )
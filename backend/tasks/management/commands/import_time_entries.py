@@ -0,0 +1,80 @@
+"""Bulk-import finished time entries (e.g. from another tracker) from CSV or NDJSON.
+
+Usage:
+    python manage.py import_time_entries PATH [--format csv|ndjson] [--user USERNAME]
+        [--batch-size N] [--errors N]
+
+PATH may be `-` for stdin; the format defaults to the file extension (csv).
+Without --user the rows go to the anonymous (demo) bucket. See tasks.imports
+for the columns. Each batch is committed on its own and re-running the same
+file skips the entries already imported. Exits non-zero if any row was
+rejected.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import BATCH_SIZE, FORMATS, ImportFileError, import_time_entries
+
+
+class Command(BaseCommand):
+    help = "Import finished time entries from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension, else csv.")
+        parser.add_argument("--user", help="Username of the bucket (default: anonymous bucket).")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per transaction.")
+        parser.add_argument("--errors", type=int, default=20, help="Rejected rows to print (default 20).")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("ndjson" if Path(path).suffix.lower() in {".ndjson", ".jsonl"} else "csv")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        user_id = None
+        if options["user"]:
+            user_id = User.objects.filter(username=options["user"]).values_list("pk", flat=True).first()
+            if user_id is None:
+                raise CommandError(f"No such user: {options['user']!r}")
+
+        def progress(result):
+            rate = result.rows / result.seconds if result.seconds else 0
+            self.stderr.write(
+                f"{result.rows} rows read, {result.imported} imported, {result.skipped} already present, "
+                f"{result.error_count} rejected ({rate:.0f} rows/s)"
+            )
+
+        try:
+            stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            result = import_time_entries(
+                stream,
+                format=fmt,
+                user_id=user_id,
+                batch_size=options["batch_size"],
+                progress=progress if options["verbosity"] >= 1 else None,
+            )
+        except ImportFileError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in result.errors[: options["errors"]]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        summary = (
+            f"Imported {result.imported} of {result.rows} rows in {result.seconds:.1f}s "
+            f"({result.tasks_created} tasks created, {result.skipped} already present, {result.error_count} rejected)."
+        )
+        if result.error_count:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,67 @@
+"""Generate template tasks ahead of time for every user bucket.
+
+Usage:
+    python manage.py populate_tasks [--start YYYY-MM-DD] [--days N] [--batch-size N]
+
+Defaults to tomorrow, so a nightly cron run means the first page load of the
+day finds its tasks already in place. Each batch of buckets is committed in
+its own transaction; re-running is harmless (existing tasks are skipped).
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import HabitTemplate
+from tasks.services import populate_tasks_from_templates
+
+
+class Command(BaseCommand):
+    help = "Create missing template tasks for all user buckets (default: tomorrow)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to populate (default: tomorrow).")
+        parser.add_argument("--days", type=int, default=1, help="Number of days from --start.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Buckets per transaction.")
+
+    def handle(self, *args, **options):
+        if options["start"]:
+            try:
+                start = date.fromisoformat(options["start"])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['start']!r} (expected YYYY-MM-DD)")
+        else:
+            start = timezone.localdate() + timedelta(days=1)
+        if options["days"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--days and --batch-size must be positive.")
+
+        dates = [start + timedelta(days=offset) for offset in range(options["days"])]
+
+        user_ids = list(
+            HabitTemplate.objects.filter(is_active=True)
+            .values_list("user_id", flat=True)
+            .distinct()
+            .order_by("user_id")
+        )
+        users = User.objects.in_bulk([user_id for user_id in user_ids if user_id is not None])
+        buckets = [None if user_id is None else users[user_id] for user_id in user_ids]
+
+        created = 0
+        batch_size = options["batch_size"]
+        for offset in range(0, len(buckets), batch_size):
+            with transaction.atomic():
+                for user in buckets[offset : offset + batch_size]:
+                    created += populate_tasks_from_templates(user=user, dates=dates)
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  {min(offset + batch_size, len(buckets))}/{len(buckets)} buckets")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} tasks for {len(buckets)} buckets, {dates[0]}..{dates[-1]}."
+            )
+        )
@@ -0,0 +1,110 @@
+"""Manage the monthly partitions of the time entry table (Postgres, opt-in).
+
+Usage:
+    python manage.py time_entry_partitions [--months-ahead N] [--drop-before YYYY-MM] [--output PATH]
+        [--enable | --disable]
+
+By default creates the partitions missing from this month through
+--months-ahead months ahead (default: TIME_ENTRY_PARTITION_MONTHS_AHEAD) and
+lists every partition with its estimated row count. Run it monthly (boot
+does the same on every start).
+
+--drop-before YYYY-MM folds each month before the given one into the
+per-(task, day) summaries (so reported totals do not change, see
+tasks.archive) and drops its partition in O(1). --output appends the dropped
+entries to an NDJSON (.gz) cold archive first.
+
+--enable rebuilds the table as a partitioned one (it is locked meanwhile);
+--disable turns it back into a plain table. See tasks.partitions.
+
+On SQLite, or with the table not partitioned, it reports that and exits
+without changing anything.
+"""
+
+from __future__ import annotations
+
+import gzip
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from tasks import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly partitions of the time entry table, drop old ones, or switch partitioning."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=None)
+        parser.add_argument("--drop-before", metavar="YYYY-MM", help="Fold and drop the partitions of earlier months.")
+        parser.add_argument("--output", help="With --drop-before: append the dropped entries to this NDJSON (.gz) file.")
+        switch = parser.add_mutually_exclusive_group()
+        switch.add_argument("--enable", action="store_true", help="Partition the table now.")
+        switch.add_argument("--disable", action="store_true", help="Turn it back into a plain table.")
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if options["months_ahead"] is not None and options["months_ahead"] < 0:
+            raise CommandError("--months-ahead must not be negative.")
+        drop_before = None
+        if options["drop_before"]:
+            try:
+                drop_before = date.fromisoformat(f"{options['drop_before']}-01")
+            except ValueError:
+                raise CommandError(f"Invalid month: {options['drop_before']!r} (expected YYYY-MM)")
+
+        try:
+            if options["enable"]:
+                notes = partitions.partition_table(connection, months_ahead=options["months_ahead"])
+                self.report_notes(notes)
+            elif options["disable"]:
+                if not partitions.is_partitioned(connection):
+                    self.stdout.write("The time entry table is not partitioned.")
+                    return
+                self.report_notes(partitions.unpartition_table(connection))
+                self.stdout.write(self.style.SUCCESS("The time entry table is a plain table again."))
+                return
+        except partitions.PartitioningError as exc:
+            raise CommandError(str(exc))
+
+        if not partitions.is_partitioned(connection):
+            if drop_before:
+                raise CommandError("The time entry table is not partitioned; use archive_time_entries instead.")
+            self.stdout.write(f"The time entry table is not partitioned ({connection.vendor}); nothing to do.")
+            return
+
+        for name in partitions.ensure_partitions(connection, months_ahead=options["months_ahead"]):
+            self.stdout.write(f"Created {name}")
+
+        if drop_before:
+            self.drop(connection, drop_before, options["output"])
+
+        self.stdout.write(f"{'partition':<32} {'rows (est.)':>12}")
+        for partition in partitions.list_partitions(connection):
+            rows = "-" if partition.rows < 0 else str(partition.rows)
+            self.stdout.write(f"{partition.name:<32} {rows:>12}")
+
+    def drop(self, connection, before: date, path: str | None):
+        months = [p.month for p in partitions.list_partitions(connection) if p.month is not None and p.month < before]
+        try:
+            output = (gzip.open if path.endswith(".gz") else open)(path, "ab") if path else None
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            for month in months:
+                dropped = partitions.drop_month(connection, month, output=output)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Dropped {dropped.name}: {dropped.entries} entries folded into {dropped.summaries} summaries."
+                    )
+                )
+        except partitions.PartitioningError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if output is not None:
+                output.close()
+
+    def report_notes(self, notes: list[str]):
+        for note in notes:
+            self.stdout.write(self.style.WARNING(note))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def close_duplicate_running_entries(apps, schema_editor):
+    """Keep only the newest running entry per task so the unique constraint applies."""
+
+    TimeEntry = apps.get_model("tasks", "TimeEntry")
+    seen = set()
+    running = TimeEntry.objects.filter(end_time__isnull=True).order_by("task_id", "-start_time")
+    for entry in running:
+        if entry.task_id not in seen:
+            seen.add(entry.task_id)
+            continue
+        # An older, forgotten timer: close it at its start (no tracked time invented).
+        entry.end_time = entry.start_time
+        entry.duration_seconds = 0
+        entry.save(update_fields=["end_time", "duration_seconds"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_task_options_task_date_task_target_seconds_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'date', '-created_at'], name='task_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('user__isnull', True)), fields=['date', '-created_at'], name='task_anon_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['task', '-start_time'], name='timeentry_task_start_idx'),
+        ),
+        migrations.RunPython(close_duplicate_running_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_time__isnull', True)), fields=('task',), name='timeentry_one_running_per_task'),
+        ),
+    ]
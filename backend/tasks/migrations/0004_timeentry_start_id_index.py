@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_indexes_and_running_entry_constraint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['-start_time', '-id'], name='timeentry_start_id_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def detach_duplicate_template_tasks(apps, schema_editor):
+    """Keep the oldest task per (user, template, date); detach the rest from the template.
+
+    Duplicates may carry tracked time, so they are kept as manual tasks rather than deleted.
+    """
+
+    Task = apps.get_model("tasks", "Task")
+    seen = set()
+    generated = Task.objects.filter(habit_template__isnull=False).order_by(
+        "user_id", "habit_template_id", "date", "created_at", "id"
+    )
+    for task in generated.iterator(chunk_size=1000):
+        key = (task.user_id, task.habit_template_id, task.date)
+        if key not in seen:
+            seen.add(key)
+            continue
+        task.habit_template_id = None
+        task.save(update_fields=["habit_template"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_timeentry_start_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_duplicate_template_tasks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('user', 'habit_template', 'date'), name='task_unique_template_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('habit_template', 'date'), name='task_unique_template_day_anon'),
+        ),
+    ]
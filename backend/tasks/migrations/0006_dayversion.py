@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_running_timers(apps, schema_editor):
+    """Days that already have a running timer must not be treated as settled."""
+
+    DayVersion = apps.get_model("tasks", "DayVersion")
+    TimeEntry = apps.get_model("tasks", "TimeEntry")
+    days = set(
+        TimeEntry.objects.filter(end_time__isnull=True).values_list("task__user_id", "task__date")
+    )
+    DayVersion.objects.bulk_create(
+        [DayVersion(user_id=user_id, date=day, version=1, active_timer=True) for user_id, day in days]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_unique_template_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DayVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('version', models.BigIntegerField(default=0)),
+                ('active_timer', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='dayversion_unique_user_date'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('date',), name='dayversion_unique_anon_date')],
+            },
+        ),
+        migrations.RunPython(flag_running_timers, migrations.RunPython.noop),
+    ]
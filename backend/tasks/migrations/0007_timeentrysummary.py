@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_dayversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeEntrySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('tracked_seconds', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('first_start', models.DateTimeField()),
+                ('last_end', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entry_summaries', to='tasks.task')),
+            ],
+            options={
+                'verbose_name_plural': 'Time entry summaries',
+                'constraints': [models.UniqueConstraint(fields=('task', 'day'), name='timeentrysummary_unique_task_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:31
+
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_time_entries(apps, schema_editor):
+    """Opt-in (TIME_ENTRY_PARTITIONING, Postgres only): see tasks.partitions."""
+
+    from tasks import partitions
+
+    connection = schema_editor.connection
+    if settings.TIME_ENTRY_PARTITIONING and partitions.is_supported(connection):
+        partitions.partition_table(connection)
+
+
+def unpartition_time_entries(apps, schema_editor):
+    from tasks import partitions
+
+    partitions.unpartition_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_timeentrysummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_time_entries, unpartition_time_entries),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_timer_totals(apps, schema_editor):
+    """Finished seconds (live entries plus archived summaries) and the running entry of every task."""
+
+    Task = apps.get_model("tasks", "Task")
+    TimeEntry = apps.get_model("tasks", "TimeEntry")
+    TimeEntrySummary = apps.get_model("tasks", "TimeEntrySummary")
+
+    def total(model, field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(task_id=OuterRef("pk"))
+                .order_by()
+                .values("task_id")
+                .annotate(total=Sum(field))
+                .values("total")
+            ),
+            0,
+        )
+
+    Task.objects.update(
+        tracked_seconds=total(TimeEntry, "duration_seconds") + total(TimeEntrySummary, "tracked_seconds"),
+        active_entry=Subquery(
+            TimeEntry.objects.filter(task_id=OuterRef("pk"), end_time__isnull=True).values("pk")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_timeentry_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='active_entry',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.timeentry'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tracked_seconds',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_timer_totals, migrations.RunPython.noop),
+    ]
@@ -54,8 +54,56 @@ class Task(models.Model):
     # optional. If/when you add auth, you can make this required again.
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
 
+    # Timer state kept by the write paths (see tasks.totals), so listing a day
+    # reads no time entries: seconds of finished entries, archived ones
+    # included, and the running entry.
+    tracked_seconds = models.IntegerField(default=0)
+    # No database constraint: a partitioned TimeEntry (tasks.partitions) has no
+    # unique key on id alone. Only read through the task, so not indexed.
+    active_entry = models.ForeignKey(
+        "TimeEntry",
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
+        db_index=False,
+    )
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # List/stats/dashboard/populate all filter one bucket's day.
+            models.Index(fields=["user", "date", "-created_at"], name="task_user_date_idx"),
+            # Anonymous (demo) bucket: user IS NULL cannot use the leading user column
+            # efficiently on every backend, so give it its own partial index.
+            models.Index(
+                fields=["date", "-created_at"],
+                name="task_anon_date_idx",
+                condition=models.Q(user__isnull=True),
+            ),
+        ]
+        constraints = [
+            # One generated task per template per day, even under concurrent populate calls.
+            models.UniqueConstraint(
+                fields=["user", "habit_template", "date"],
+                name="task_unique_template_day",
+            ),
+            # NULLs are distinct in unique constraints, so the anonymous bucket needs its own.
+            models.UniqueConstraint(
+                fields=["habit_template", "date"],
+                condition=models.Q(user__isnull=True),
+                name="task_unique_template_day_anon",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a save that moves the task can invalidate the old day too.
+        if "date" in field_names:
+            instance._loaded_date = instance.date
+        return instance
 
     def __str__(self):
         return f"{self.title} ({self.date})"
@@ -71,6 +119,80 @@ class TimeEntry(models.Model):
     class Meta:
         verbose_name_plural = "Time Entries"
         ordering = ["-start_time"]
+        indexes = [
+            # Per-task history listings and the per-task duration totals.
+            models.Index(fields=["task", "-start_time"], name="timeentry_task_start_idx"),
+            # Bucket-wide history walks entries newest-first (keyset on start_time, id).
+            models.Index(fields=["-start_time", "-id"], name="timeentry_start_id_idx"),
+        ]
+        constraints = [
+            # At most one running entry per task. Being partial, the backing unique
+            # index also serves every "end_time IS NULL" lookup (running timers).
+            models.UniqueConstraint(
+                fields=["task"],
+                condition=models.Q(end_time__isnull=True),
+                name="timeentry_one_running_per_task",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.task.title} - {self.start_time}"
+
+
+class TimeEntrySummary(models.Model):
+    """Finished time entries of one task and day, compacted by `manage.py archive_time_entries`.
+
+    Counted wherever finished time is totalled (task list, rollups, dashboard
+    trend), so archiving an entry does not change any figure the API reports.
+    """
+
+    # Covered by timeentrysummary_unique_task_day.
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="entry_summaries", db_index=False)
+    # Local day the entries started on (the dashboard trend's bucket).
+    day = models.DateField()
+    tracked_seconds = models.IntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+    first_start = models.DateTimeField()
+    last_end = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Time entry summaries"
+        constraints = [
+            # Also serves the per-task totals (task_id prefix).
+            models.UniqueConstraint(fields=["task", "day"], name="timeentrysummary_unique_task_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} {self.day}: {self.entry_count} entries, {self.tracked_seconds}s"
+
+
+class DayVersion(models.Model):
+    """Change counter of one (user bucket, date), bumped by every task/time-entry write.
+
+    Backs the ETag/Last-Modified validators of the per-day read endpoints, so a
+    conditional GET is answered from this table alone (see tasks.versions).
+    """
+
+    # Covered by dayversion_unique_user_date.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+    date = models.DateField()
+    version = models.BigIntegerField(default=0)
+
+    # A running timer makes the day's task progress change by the second.
+    active_timer = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="dayversion_unique_user_date"),
+            models.UniqueConstraint(
+                fields=["date"],
+                condition=models.Q(user__isnull=True),
+                name="dayversion_unique_anon_date",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} v{self.version}"
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in keyset (cursor) pagination over a composite ordering.
+
+    Pagination only kicks in when the client sends `cursor` or `page_size`, so
+    existing callers keep receiving a plain list. Pages are located with a
+    `WHERE (a, id) < (last_a, last_id)` style predicate instead of OFFSET, so
+    the cost of a page does not grow with the amount of history in the bucket.
+    The last ordering field must be unique (the primary key) to break ties.
+    """
+
+    ordering: tuple[str, ...] = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(queryset.model, params.get(self.cursor_query_param))
+
+        ordering = self._reversed(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        self.position = position
+        return rows
+
+    def get_page_size(self, request) -> int:
+        max_size = settings.API_MAX_PAGE_SIZE
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, ""))
+        except ValueError:
+            size = settings.API_PAGE_SIZE
+        return max(1, min(size, max_size))
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Walked before the start: the next page begins at the old position.
+            return self.encode_cursor(reverse=False, values=self.position)
+        return self.encode_cursor(reverse=False, values=self._position_of(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Walked past the end: the previous page ends at the old position.
+            return self.encode_cursor(reverse=True, values=self.position)
+        return self.encode_cursor(reverse=True, values=self._position_of(self.page[0]))
+
+    def encode_cursor(self, *, reverse: bool, values) -> str:
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in values]
+        payload = json.dumps({"r": int(reverse), "p": values}, separators=(",", ":"))
+        token = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, model, token: str | None):
+        if not token:
+            return False, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            raw_values = payload["p"]
+            if not isinstance(raw_values, list) or len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(raw)
+                for field, raw in zip(self.ordering, raw_values)
+            ]
+            # The ordering fields are not nullable; a null would build `created_at__lt=None`.
+            if None in values:
+                raise ValueError
+            return bool(payload["r"]), values
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _position_of(self, obj):
+        return [getattr(obj, field.lstrip("-")) for field in self.ordering]
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+    @staticmethod
+    def _after(ordering, position) -> Q:
+        """Rows strictly after `position` in `ordering` (lexicographic keyset predicate)."""
+
+        condition = Q()
+        for index in reversed(range(len(ordering))):
+            field = ordering[index].lstrip("-")
+            lookup = "lt" if ordering[index].startswith("-") else "gt"
+            step = Q(**{f"{field}__{lookup}": position[index]})
+            if index < len(ordering) - 1:
+                step |= Q(**{field: position[index]}) & condition
+            condition = step
+        return condition
+
+
+class TaskCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class TimeEntryCursorPagination(KeysetPagination):
+    ordering = ("-start_time", "-id")
@@ -0,0 +1,399 @@
+"""Opt-in monthly range partitioning of TimeEntry by start_time (Postgres only).
+
+With TIME_ENTRY_PARTITIONING=True, migration tasks.0008 rebuilds
+`tasks_timeentry` as a declaratively partitioned table (PARTITION BY RANGE
+(start_time)): one partition per calendar month of TIME_ZONE, named
+`tasks_timeentry_pYYYY_MM`, plus a DEFAULT partition that catches rows outside
+the created months. Enable it later with `manage.py time_entry_partitions
+--enable`; `--disable` (or migrating back past 0008) reverts to a plain table.
+On SQLite, and with the setting off, nothing changes.
+
+What partitioning changes:
+
+- queries bounded on start_time (time entry pagination cursors, archival)
+  only visit the matching months, and newest-first scans stop early;
+- a past month is removed with DETACH + DROP instead of row-by-row DELETEs
+  (drop_month(), after adding it to the TimeEntrySummary rows so no reported
+  total changes, see tasks.archive);
+- the primary key becomes (id, start_time): Postgres requires the partition
+  key in every unique index. For the same reason the "one running entry per
+  task" index is kept but no longer unique, and a trigger of the same name
+  enforces the rule instead: it locks the task row and rejects a second
+  running entry with the same unique_violation (IntegrityError) the index
+  raised (needs Postgres 13+). Any other unique index without start_time
+  makes partition_table() refuse.
+
+Future months must exist before rows arrive (rows would otherwise land in the
+DEFAULT partition, which ensure_partitions() moves out again): `manage.py
+boot` and `manage.py time_entry_partitions` create them
+TIME_ENTRY_PARTITION_MONTHS_AHEAD months ahead.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import UniqueConstraint
+from django.utils import timezone
+
+from .archive import cold_rows, write_cold
+from .models import Task, TimeEntry, TimeEntrySummary
+
+TABLE = TimeEntry._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_KEY = "start_time"
+
+_MONTH_PARTITION = re.compile(rf"^{TABLE}_p(?P<year>\d{{4}})_(?P<month>\d{{2}})$")
+# Rows per chunk written to the cold archive by drop_month().
+_COLD_CHUNK = 2000
+
+# Enforced by a trigger while the table is partitioned (see _RUNNING_ENTRY_TRIGGER).
+RUNNING_ENTRY_CONSTRAINT = "timeentry_one_running_per_task"
+_RUNNING_ENTRY_FUNCTION = f"{TABLE}_one_running_per_task"
+_RUNNING_ENTRY_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION {_RUNNING_ENTRY_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    -- Held until commit: concurrent starts of one task take turns.
+    PERFORM 1 FROM {Task._meta.db_table} WHERE id = NEW.task_id FOR NO KEY UPDATE;
+    IF EXISTS (
+        SELECT 1 FROM {TABLE} WHERE task_id = NEW.task_id AND end_time IS NULL AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION 'task % already has a running time entry', NEW.task_id
+            USING ERRCODE = 'unique_violation', CONSTRAINT = '{RUNNING_ENTRY_CONSTRAINT}';
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {RUNNING_ENTRY_CONSTRAINT}
+BEFORE INSERT OR UPDATE OF task_id, end_time ON {TABLE}
+FOR EACH ROW WHEN (NEW.end_time IS NULL)
+EXECUTE FUNCTION {_RUNNING_ENTRY_FUNCTION}();
+"""
+
+
+class PartitioningError(Exception):
+    """The requested partition change cannot be made."""
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    month: date | None  # None for the DEFAULT partition
+    rows: int  # planner estimate (-1: never analyzed)
+
+
+def is_supported(connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(connection) -> bool:
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """[start, end) of `month` in TIME_ZONE, as aware datetimes."""
+
+    start = timezone.make_aware(datetime(month.year, month.month, 1))
+    return start, timezone.make_aware(datetime.combine(add_months(month, 1), datetime.min.time()))
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _quote(connection, name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _bound(value: datetime) -> str:
+    # DDL cannot take bind parameters; the value is a formatted datetime.
+    return f"'{value.isoformat()}'"
+
+
+def list_partitions(connection) -> list[Partition]:
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, child.reltuples::bigint
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            ORDER BY child.relname
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, estimate in rows:
+        match = _MONTH_PARTITION.match(name)
+        month = date(int(match["year"]), int(match["month"]), 1) if match else None
+        partitions.append(Partition(name=name, month=month, rows=int(estimate)))
+    return partitions
+
+
+def _create_month(cursor, connection, month: date):
+    """Create the partition of `month`, moving its rows out of the DEFAULT partition if any."""
+
+    start, end = month_bounds(month)
+    table, name, default = (_quote(connection, n) for n in (TABLE, partition_name(month), DEFAULT_PARTITION))
+    bounds = f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s)", [start, end]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} {bounds}")
+        return
+    # A partition cannot be created over rows the DEFAULT partition holds.
+    cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {default} WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        [start, end],
+    )
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}")
+
+
+def ensure_partitions(connection, *, months_ahead: int | None = None) -> list[str]:
+    """Create the missing partitions from this month through `months_ahead` months ahead."""
+
+    if not is_partitioned(connection):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.TIME_ENTRY_PARTITION_MONTHS_AHEAD
+    existing = {partition.month for partition in list_partitions(connection)}
+    current = timezone.localdate().replace(day=1)
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                _create_month(cursor, connection, month)
+                created.append(partition_name(month))
+    return created
+
+
+def _table_definition(cursor, table: str) -> tuple[list, list]:
+    """(constraints, indexes) of `table`: (name, type, definition) and (name, CREATE INDEX statement, unique)."""
+
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f', 'c')
+        ORDER BY contype DESC, conname
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT idx.relname, pg_get_indexdef(pg_index.indexrelid), pg_index.indisunique
+        FROM pg_index
+        JOIN pg_class idx ON idx.oid = pg_index.indexrelid
+        WHERE pg_index.indrelid = to_regclass(%s)
+          AND NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE pg_constraint.conindid = pg_index.indexrelid AND pg_constraint.conrelid = pg_index.indrelid
+          )
+        ORDER BY idx.relname
+        """,
+        [table],
+    )
+    return constraints, cursor.fetchall()
+
+
+def _model_unique_indexes() -> set[str]:
+    return {
+        constraint.name
+        for constraint in TimeEntry._meta.constraints
+        if isinstance(constraint, UniqueConstraint) and PARTITION_KEY not in constraint.fields
+    }
+
+
+def _rebuild(connection, *, partitioned: bool, months_ahead: int) -> list[str]:
+    """Recreate `tasks_timeentry` (partitioned or plain) with the same rows, keys and indexes.
+
+    Returns notes about unique indexes that changed.
+    """
+
+    def qn(name):
+        return _quote(connection, name)
+
+    old = f"{TABLE}_rebuild"
+    notes = []
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        constraints, indexes = _table_definition(cursor, TABLE)
+        if partitioned:
+            for name, statement, unique in indexes:
+                if unique and PARTITION_KEY not in statement and name != RUNNING_ENTRY_CONSTRAINT:
+                    raise PartitioningError(f"Unique index {name} does not include {PARTITION_KEY}.")
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT attidentity <> '' FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'", [TABLE]
+        )
+        identity = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(old)}")
+        if sequence and not identity:
+            # A serial sequence would be dropped with the old table.
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        clause = f" PARTITION BY RANGE ({PARTITION_KEY})" if partitioned else ""
+        cursor.execute(f"CREATE TABLE {qn(TABLE)} (LIKE {qn(old)} INCLUDING DEFAULTS){clause}")
+
+        if partitioned:
+            cursor.execute(f"SELECT MIN({PARTITION_KEY}) FROM {qn(old)}")
+            oldest = cursor.fetchone()[0]
+            current = timezone.localdate().replace(day=1)
+            month = timezone.localdate(oldest).replace(day=1) if oldest else current
+            cursor.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+            while month <= add_months(current, months_ahead):
+                start, end = month_bounds(month)
+                cursor.execute(
+                    f"CREATE TABLE {qn(partition_name(month))} PARTITION OF {qn(TABLE)} "
+                    f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+                )
+                month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(old)}")
+        cursor.execute(f"DROP TABLE {qn(old)}")
+
+        if identity:
+            # Identity columns on partitioned tables need Postgres 17; an owned sequence works everywhere.
+            sequence = qn(f"{TABLE}_id_seq")
+            cursor.execute(f"CREATE SEQUENCE {sequence} AS bigint")
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {qn(TABLE)}.id")
+            cursor.execute(f"SELECT setval('{sequence}', COALESCE(MAX(id), 0) + 1, false) FROM {qn(TABLE)}")
+
+        for name, kind, definition in constraints:
+            if kind == "p":
+                definition = f"PRIMARY KEY (id, {PARTITION_KEY})" if partitioned else "PRIMARY KEY (id)"
+            elif kind == "u" and partitioned and PARTITION_KEY not in definition:
+                raise PartitioningError(f"Unique constraint {name} does not include {PARTITION_KEY}.")
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}")
+
+        restore_unique = _model_unique_indexes()
+        for name, statement, unique in indexes:
+            # Captured from the parent before the rename; ONLY would skip the partitions.
+            statement = re.sub(rf" ON (?:ONLY )?(?:\S+\.)?{TABLE} ", f" ON {qn(TABLE)} ", statement, count=1)
+            if partitioned and unique and PARTITION_KEY not in statement:
+                statement = statement.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+                cursor.execute(_RUNNING_ENTRY_TRIGGER)
+                notes.append(f"{name} is enforced by a trigger (the index cannot be unique without {PARTITION_KEY})")
+            elif not partitioned and not unique and name in restore_unique:
+                statement = statement.replace("CREATE INDEX", "CREATE UNIQUE INDEX", 1)
+                notes.append(f"{name} is a unique index again")
+            cursor.execute(statement)
+        if not partitioned:
+            # The trigger went with the partitioned table.
+            cursor.execute(f"DROP FUNCTION IF EXISTS {_RUNNING_ENTRY_FUNCTION}()")
+    return notes
+
+
+def partition_table(connection, *, months_ahead: int | None = None) -> list[str]:
+    """Rebuild tasks_timeentry as a monthly partitioned table (in one transaction; locks it)."""
+
+    if not is_supported(connection):
+        raise PartitioningError(f"Partitioning needs Postgres (this database is {connection.vendor}).")
+    if is_partitioned(connection):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.TIME_ENTRY_PARTITION_MONTHS_AHEAD
+    with transaction.atomic(using=connection.alias):
+        return _rebuild(connection, partitioned=True, months_ahead=months_ahead)
+
+
+def unpartition_table(connection) -> list[str]:
+    """Rebuild tasks_timeentry as a plain table."""
+
+    if not is_partitioned(connection):
+        return []
+    with transaction.atomic(using=connection.alias):
+        return _rebuild(connection, partitioned=False, months_ahead=0)
+
+
+@dataclass
+class DroppedMonth:
+    name: str
+    entries: int
+    summaries: int
+
+
+def drop_month(connection, month: date, *, output=None) -> DroppedMonth:
+    """Fold a past month into TimeEntrySummary, then detach and drop its partition.
+
+    `output` (a binary file) receives the month's entries as a cold archive first.
+    """
+
+    name = partition_name(month)
+    if month >= timezone.localdate().replace(day=1):
+        raise PartitioningError(f"Only past months can be dropped ({name} is not).")
+    if name not in {partition.name for partition in list_partitions(connection)}:
+        raise PartitioningError(f"No partition {name}.")
+
+    table, partition = _quote(connection, TABLE), _quote(connection, name)
+    summaries = _quote(connection, TimeEntrySummary._meta.db_table)
+    start, end = month_bounds(month)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # No new rows can arrive while the month is being folded.
+        cursor.execute(f"LOCK TABLE {partition} IN SHARE MODE")
+        cursor.execute(f"SELECT COUNT(*), COUNT(*) FILTER (WHERE end_time IS NULL) FROM {partition}")
+        entries, running = cursor.fetchone()
+        if running:
+            raise PartitioningError(f"{name} has {running} running time entries; stop them first.")
+
+        if output is not None and entries:
+            rows = cold_rows(
+                TimeEntry.objects.using(connection.alias)
+                .filter(start_time__gte=start, start_time__lt=end)
+                .order_by("start_time", "id")
+            )
+            chunk = []
+            for row in rows.iterator(chunk_size=_COLD_CHUNK):
+                chunk.append(row)
+                if len(chunk) == _COLD_CHUNK:
+                    write_cold(output, chunk)
+                    chunk = []
+            write_cold(output, chunk)
+
+        # Same grouping as tasks.archive: (task, local start day), added to existing rows.
+        cursor.execute(
+            f"""
+            INSERT INTO {summaries} (task_id, day, tracked_seconds, entry_count, first_start, last_end, archived_at)
+            SELECT task_id, (start_time AT TIME ZONE %s)::date, SUM(duration_seconds), COUNT(*),
+                   MIN(start_time), MAX(end_time), now()
+            FROM {partition}
+            GROUP BY 1, 2
+            ON CONFLICT (task_id, day) DO UPDATE SET
+                tracked_seconds = {summaries}.tracked_seconds + EXCLUDED.tracked_seconds,
+                entry_count = {summaries}.entry_count + EXCLUDED.entry_count,
+                first_start = LEAST({summaries}.first_start, EXCLUDED.first_start),
+                last_end = GREATEST({summaries}.last_end, EXCLUDED.last_end),
+                archived_at = EXCLUDED.archived_at
+            """,
+            [settings.TIME_ZONE],
+        )
+        folded = cursor.rowcount
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+        cursor.execute(f"DROP TABLE {partition}")
+    return DroppedMonth(name=name, entries=entries, summaries=folded)
@@ -1,12 +1,15 @@
 from django.utils import timezone
 from rest_framework import serializers
 
+from core.timing import TimedListSerializer, TimedModelSerializer
+
 from .models import HabitTemplate, Task, TimeEntry
 
 
-class HabitTemplateSerializer(serializers.ModelSerializer):
+class HabitTemplateSerializer(TimedModelSerializer):
     class Meta:
         model = HabitTemplate
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "title",
@@ -18,7 +21,7 @@ class HabitTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedModelSerializer):
     # Annotated in TaskViewSet.get_queryset()
     has_active_timer = serializers.BooleanField(read_only=True)
     total_time_seconds = serializers.IntegerField(read_only=True)
@@ -33,6 +36,7 @@ class TaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "title",
@@ -63,6 +67,14 @@ class TaskSerializer(serializers.ModelSerializer):
             "target_reached",
         ]
 
+    def update(self, instance: Task, validated_data):
+        # Save only the edited fields: a full save would write back the timer
+        # state (tracked_seconds, active_entry) as it was when the task was read.
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
     def _running_seconds(self, obj: Task) -> int:
         if not obj.active_entry_start_time:
             return 0
@@ -88,9 +100,10 @@ class TaskSerializer(serializers.ModelSerializer):
         return target > 0 and self.get_progress_seconds(obj) >= target
 
 
-class TimeEntrySerializer(serializers.ModelSerializer):
+class TimeEntrySerializer(TimedModelSerializer):
     class Meta:
         model = TimeEntry
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "task",
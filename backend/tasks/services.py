@@ -1,51 +1,214 @@
+from django.db import NotSupportedError, connections, transaction
+from django.db.models import (
+    BooleanField,
+    DateTimeField,
+    ExpressionWrapper,
+    F,
+    FilteredRelation,
+    Func,
+    IntegerField,
+    Q,
+    Value,
+)
+from django.db.models.sql import UpdateQuery
 from django.utils import timezone
 
-from .models import Task, TimeEntry
+from core import metrics
+from dashboards.rollups import add_tracked_time, recount_tracked_time, ensure_task_rollups
+from events.broker import lock_bucket
+
+from . import totals
+from .changes import publish_populated, publish_timer_changes
+from .models import HabitTemplate, Task, TimeEntry
+
+
+def _bucket_entries(user):
+    """All time entries of a bucket; `user` is a User, a user id or None (anonymous)."""
+
+    if user is None:
+        return TimeEntry.objects.filter(task__user__isnull=True)
+    return TimeEntry.objects.filter(task__user=user)
 
 
 def _running_entries_for_user(*, user):
-    qs = TimeEntry.objects.filter(end_time__isnull=True)
+    return _bucket_entries(user).filter(end_time__isnull=True)
+
+
+def populate_tasks_from_templates(*, user, dates) -> int:
+    """Create the missing template tasks of one bucket for each of `dates`.
+
+    Existing (template, date) pairs are skipped up front; the unique constraints
+    plus ignore_conflicts make concurrent calls safe. Returns the number of
+    tasks this call inserted (exact unless another call raced it).
+    """
+
+    metrics.POPULATE_CALLS.inc()
+    dates = list(dates)
+    template_qs = HabitTemplate.objects.filter(is_active=True)
+    task_qs = Task.objects.all()
     if user is None:
-        return qs.filter(task__user__isnull=True)
-    return qs.filter(task__user=user)
+        template_qs = template_qs.filter(user__isnull=True)
+        task_qs = task_qs.filter(user__isnull=True)
+    else:
+        template_qs = template_qs.filter(user=user)
+        task_qs = task_qs.filter(user=user)
+
+    templates = list(template_qs.only("id", "title", "description", "default_target_seconds"))
+    if not templates or not dates:
+        return 0
+
+    task_qs = task_qs.filter(date__in=dates)
+    existing = set(
+        task_qs.filter(habit_template_id__in=[tmpl.id for tmpl in templates]).values_list(
+            "habit_template_id", "date"
+        )
+    )
+    missing = [
+        Task(
+            user=user,
+            habit_template=tmpl,
+            title=tmpl.title,
+            description=tmpl.description,
+            date=day,
+            target_seconds=tmpl.default_target_seconds,
+        )
+        for day in dates
+        for tmpl in templates
+        if (tmpl.id, day) not in existing
+    ]
+    if missing:
+        user_id = getattr(user, "pk", user)
+        lock_bucket(user_id)
+        Task.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+        ensure_task_rollups(task_qs)
+        publish_populated(user_id=user_id, dates=dates, created=len(missing))
+        metrics.POPULATE_CREATED.inc(len(missing))
+    return len(missing)
+
+
+def with_timer_annotations(qs):
+    """Annotate a Task queryset with the fields TaskSerializer reads.
+
+    Reads the timer state stored on the task (tasks.totals): one primary-key
+    join to the running entry, no per-task aggregation.
+    """
+
+    return qs.annotate(
+        # The end_time condition keeps a stale pointer from showing a running timer.
+        running_entry=FilteredRelation("active_entry", condition=Q(active_entry__end_time__isnull=True)),
+        active_entry_start_time=F("running_entry__start_time"),
+        has_active_timer=ExpressionWrapper(Q(active_entry_start_time__isnull=False), output_field=BooleanField()),
+        total_time_seconds=F("tracked_seconds"),
+    )
 
 
-def stop_all_running_timers(*, user):
-    """Enforce a single active timer per user/anonymous bucket."""
+class ElapsedSeconds(Func):
+    """Whole seconds from `start` to `end`, truncated and never negative, computed in SQL.
 
-    now = timezone.now()
-    entries = list(_running_entries_for_user(user=user).select_related("task"))
+    Mirrors `max(0, int((end - start).total_seconds()))` so a set-based UPDATE can
+    close entries without loading them.
+    """
 
-    for entry in entries:
-        duration = int((now - entry.start_time).total_seconds())
-        entry.end_time = now
-        entry.duration_seconds = max(0, duration)
-        entry.save(update_fields=["end_time", "duration_seconds"])
+    output_field = IntegerField()
 
-    return entries
+    def __init__(self, start, end, **extra):
+        super().__init__(start, end, **extra)
 
+    def _render(self, compiler, connection, template):
+        (start_sql, start_params), (end_sql, end_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        return template.format(start=start_sql, end=end_sql), (*end_params, *start_params)
 
-def start_task_timer(task: Task):
-    # Only one running timer across all tasks.
-    stop_all_running_timers(user=task.user)
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"ElapsedSeconds is not implemented for {connection.vendor}.")
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # julianday() is exact to the millisecond; integer division truncates like int().
+        template = "MAX(0, CAST(ROUND((julianday({end}) - julianday({start})) * 86400000) AS INTEGER) / 1000)"
+        return self._render(compiler, connection, template)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        template = "GREATEST(0, FLOOR(EXTRACT(EPOCH FROM ({end} - {start}))))::integer"
+        return self._render(compiler, connection, template)
 
-    return TimeEntry.objects.create(
-        task=task,
-        start_time=timezone.now(),
+
+def _update_returning_pks(qs, **values) -> list[int]:
+    """`qs.update(**values)` that returns the primary keys of the rows it updated (UPDATE ... RETURNING)."""
+
+    query = qs.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    query.annotations = {}
+    compiler = query.get_compiler(qs.db)
+    sql, params = compiler.as_sql()
+    if not sql:
+        return []
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {compiler.quote_name_unless_alias(qs.model._meta.pk.column)}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _close_running_entries(scope_qs, end_time) -> list[TimeEntry]:
+    """Close the running entries within `scope_qs` at `end_time` in one UPDATE.
+
+    The UPDATE is the first statement, so on SQLite it also takes the write lock
+    (a SELECT first could not upgrade to it under contention). It returns the ids
+    it closed, so entries that already ended at the same instant are never
+    reloaded. Returns the closed entries, whose durations were added to their tasks.
+    """
+
+    closed = _update_returning_pks(
+        scope_qs.filter(end_time__isnull=True),
+        end_time=end_time,
+        duration_seconds=ElapsedSeconds("start_time", Value(end_time, output_field=DateTimeField())),
     )
+    if not closed:
+        return []
+    entries = list(TimeEntry.objects.filter(pk__in=closed).select_related("task").order_by("id"))
+    totals.finish_entries(entries)
+    recount_tracked_time({entry.task_id for entry in entries})
+    return entries
 
 
-def stop_task_timer(task: Task):
-    active_entry = TimeEntry.objects.filter(task=task, end_time__isnull=True).first()
+def stop_all_running_timers(*, user) -> int:
+    """Enforce a single active timer per user/anonymous bucket.
+
+    Closes every running entry of the bucket in one UPDATE and returns how many
+    were closed.
+    """
 
-    if not active_entry:
-        return None
+    user_id = getattr(user, "pk", user)
+    with transaction.atomic():
+        lock_bucket(user_id)
+        closed = _close_running_entries(_bucket_entries(user_id), timezone.now())
+        publish_timer_changes("stopped", closed, user_id=user_id)
+    metrics.TIMER_STOPS.inc(len(closed))
+    return len(closed)
 
-    end_time = timezone.now()
-    duration = int((end_time - active_entry.start_time).total_seconds())
 
-    active_entry.end_time = end_time
-    active_entry.duration_seconds = max(0, duration)
-    active_entry.save(update_fields=["end_time", "duration_seconds"])
+def start_task_timer(task: Task):
+    with transaction.atomic():
+        lock_bucket(task.user_id)
+        now = timezone.now()
+
+        # Only one running timer across all tasks.
+        closed = _close_running_entries(_bucket_entries(task.user_id), now)
+        publish_timer_changes("stopped", closed, user_id=task.user_id)
 
-    return active_entry
+        entry = TimeEntry.objects.create(task=task, start_time=now)
+        totals.start_entry(entry)
+        add_tracked_time(task.pk, entries=1)
+        publish_timer_changes("started", [entry], user_id=task.user_id)
+    metrics.TIMER_STARTS.inc()
+    metrics.TIMER_STOPS.inc(len(closed))
+    return entry
+
+
+def stop_task_timer(task: Task):
+    with transaction.atomic():
+        lock_bucket(task.user_id)
+        closed = _close_running_entries(TimeEntry.objects.filter(task=task), timezone.now())
+        publish_timer_changes("stopped", closed, user_id=task.user_id)
+    metrics.TIMER_STOPS.inc(len(closed))
+    # At most one entry per task can be running.
+    return closed[-1] if closed else None
@@ -0,0 +1,76 @@
+"""Signals of the tasks app and the receivers that keep the response cache current.
+
+`days_changed` is sent by tasks.versions.bump_day_versions(), i.e. by every API
+write path, bulk ones included (populate, batch, set-based timer stops). The
+model signals cover saves and deletes that bypass those paths (admin, shell).
+Invalidation runs after commit, so readers never re-cache pre-commit data.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from core import response_cache
+
+from .models import Task, TimeEntry
+
+# Sent with user_id (None for the anonymous bucket) and dates.
+days_changed = Signal()
+
+_pending = threading.local()
+
+
+def _defer_invalidation(*, days=(), task_ids=()):
+    """Collect invalidations until the transaction commits (immediately in autocommit).
+
+    Work left behind by a rolled-back transaction is flushed with the next one;
+    invalidating too much is harmless.
+    """
+
+    state = _pending.__dict__.setdefault("state", {"days": set(), "task_ids": set()})
+    state["days"].update(days)
+    state["task_ids"].update(task_ids)
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    state = _pending.__dict__.pop("state", None)
+    if not state:
+        return
+    days = set(state["days"])
+    if state["task_ids"]:
+        # Tasks deleted in the meantime invalidated their own day.
+        days.update(Task.objects.filter(pk__in=state["task_ids"]).values_list("user_id", "date"))
+
+    by_bucket: dict = {}
+    for user_id, day in days:
+        by_bucket.setdefault(user_id, set()).add(day)
+    for user_id, dates in by_bucket.items():
+        response_cache.invalidate(user_id=user_id, dates=dates)
+
+
+@receiver(days_changed)
+def _days_changed(sender, *, user_id, dates, **kwargs):
+    _defer_invalidation(days=[(user_id, day) for day in dates])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def _task_written(sender, instance: Task, **kwargs):
+    days = {(instance.user_id, instance.date)}
+    loaded_date = getattr(instance, "_loaded_date", None)
+    if loaded_date is not None:
+        # The task was moved away from this day.
+        days.add((instance.user_id, loaded_date))
+    _defer_invalidation(days=days)
+
+
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+def _time_entry_written(sender, instance: TimeEntry, **kwargs):
+    # Resolved to (user, day) in one query at flush time.
+    _defer_invalidation(task_ids=[instance.task_id])
@@ -0,0 +1,79 @@
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from benchmarks.common import seed_day
+from tasks import totals
+from tasks.archive import archive_cutoff, archive_time_entries
+from tasks.models import Task, TimeEntry, TimeEntrySummary
+from tasks.totals import drifted_tasks
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.days = [today - timedelta(days=offset) for offset in (12, 11, 10, 2, 0)]
+        cls.user = User.objects.create_user("alice", password="secret")
+        for day in cls.days:
+            seed_day(day=day, tasks=2, entries_per_task=3)
+            seed_day(user=cls.user, day=day, tasks=1, entries_per_task=2)
+
+    def figures(self):
+        """Every reported figure of both buckets, computed afresh."""
+
+        cache.clear()
+        figures = {}
+        for bucket in ("anonymous", "user"):
+            if bucket == "user":
+                self.client.force_login(self.user)
+            for day in self.days:
+                for path in ("/api/tasks/", "/api/tasks/stats/", "/api/dashboard/"):
+                    response = self.client.get(path, {"date": day})
+                    self.assertEqual(response.status_code, 200)
+                    figures[(bucket, str(day), path)] = response.json()
+            self.client.logout()
+        return figures
+
+    def test_archive_keeps_the_dashboard_figures(self):
+        before = self.figures()
+        cold = io.BytesIO()
+        expected = TimeEntry.objects.filter(end_time__isnull=False, start_time__lt=archive_cutoff(5))
+        expected_ids = set(expected.values_list("id", flat=True))
+        self.assertEqual(len(expected_ids), 3 * (2 * 3 + 2))
+
+        result = archive_time_entries(before=archive_cutoff(5), batch_size=5, output=cold)
+
+        self.assertEqual(result.archived, len(expected_ids))
+        self.assertEqual(result.seconds_archived, 300 * len(expected_ids))
+        # Batches of 5 split some (task, day) groups: those summaries are updated, not duplicated.
+        self.assertGreater(result.summaries_updated, 0)
+        self.assertEqual(TimeEntrySummary.objects.count(), 3 * 3)
+        self.assertFalse(TimeEntry.objects.filter(pk__in=expected_ids).exists())
+        self.assertEqual({json.loads(line)["id"] for line in cold.getvalue().splitlines()}, expected_ids)
+
+        self.assertEqual(self.figures(), before)
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
+
+    def test_rearchiving_is_a_no_op(self):
+        archive_time_entries(before=archive_cutoff(5))
+        before = self.figures()
+        result = archive_time_entries(before=archive_cutoff(5))
+        self.assertEqual(result.archived, 0)
+        self.assertEqual(self.figures(), before)
+
+    def test_running_entries_are_kept(self):
+        task = Task.objects.filter(user=None, date=self.days[0]).first()
+        start = timezone.make_aware(datetime.combine(self.days[0], time(20)))
+        running = TimeEntry.objects.create(task=task, start_time=start)
+        totals.start_entry(running)
+
+        archive_time_entries(before=archive_cutoff(5))
+        self.assertEqual(list(TimeEntry.objects.filter(task__date=self.days[0])), [running])
+        self.assertEqual(Task.objects.get(pk=task.pk).active_entry_id, running.pk)
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
@@ -0,0 +1,110 @@
+from django.test import TestCase
+
+from benchmarks.common import seed_day
+from dashboards.models import DailyTaskRollup
+from tasks.models import Task, TimeEntry
+
+
+class TaskBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tasks = seed_day(tasks=3, entries_per_task=2)
+
+    def post(self, payload, path="/api/tasks/batch/"):
+        return self.client.post(path, payload, content_type="application/json")
+
+    def test_applies_every_operation(self):
+        keep, edit, drop = self.tasks
+        response = self.post(
+            {
+                "operations": [
+                    {"op": "create", "data": {"title": "Read", "target_seconds": 1800}},
+                    {"op": "update", "id": edit.pk, "data": {"completed": True}},
+                    {"op": "delete", "id": drop.pk},
+                ]
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        created, updated, deleted = response.json()["results"]
+
+        self.assertEqual([created["index"], created["op"], created["status"]], [0, "create", "ok"])
+        self.assertEqual(created["data"]["id"], created["id"])
+        self.assertEqual(created["data"]["title"], "Read")
+        self.assertEqual([updated["op"], updated["status"], updated["id"]], ["update", "ok", edit.pk])
+        self.assertIs(updated["data"]["completed"], True)
+        self.assertEqual(updated["data"]["total_time_seconds"], 600)
+        self.assertEqual(deleted, {"index": 2, "op": "delete", "status": "ok", "id": drop.pk})
+
+        self.assertTrue(Task.objects.filter(pk=created["id"], title="Read").exists())
+        self.assertTrue(Task.objects.get(pk=edit.pk).completed)
+        self.assertFalse(Task.objects.filter(pk=drop.pk).exists())
+        self.assertFalse(TimeEntry.objects.filter(task_id=drop.pk).exists())
+        self.assertFalse(DailyTaskRollup.objects.filter(task_id=drop.pk).exists())
+        self.assertEqual(Task.objects.get(pk=keep.pk).title, keep.title)
+
+    def test_invalid_operation_rolls_back_the_batch(self):
+        edit, drop = self.tasks[:2]
+        response = self.post(
+            {
+                "operations": [
+                    {"op": "update", "id": edit.pk, "data": {"title": "Renamed"}},
+                    {"op": "create", "data": {"title": ""}},
+                    {"op": "delete", "id": drop.pk},
+                    {"op": "delete", "id": 999999},
+                ]
+            }
+        )
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["rolled_back", "error", "rolled_back", "error"])
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3])
+        self.assertIn("title", results[1]["errors"])
+        self.assertEqual(results[3]["errors"], {"detail": "Not found."})
+        self.assertNotIn("errors", results[0])
+
+        self.assertEqual(Task.objects.get(pk=edit.pk).title, edit.title)
+        self.assertTrue(Task.objects.filter(pk=drop.pk).exists())
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_each_id_may_be_targeted_once(self):
+        task = self.tasks[0]
+        response = self.post({"operations": [{"op": "delete", "id": task.pk}, {"op": "delete", "id": task.pk}]})
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["rolled_back", "error"])
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+    def test_malformed_batches_are_rejected(self):
+        task = self.tasks[0]
+        for payload in [
+            [{"op": "delete", "id": task.pk}],
+            {"operations": []},
+            {"operations": {"op": "delete", "id": task.pk}},
+            {"operations": [{"op": "archive", "id": task.pk}]},
+            {"operations": ["delete"]},
+            {},
+        ]:
+            with self.subTest(payload=payload):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+                self.assertNotIn("results", response.json())
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_time_entry_batch(self):
+        task = self.tasks[0]
+        first, second = TimeEntry.objects.filter(task=task).order_by("pk")
+        path = "/api/time-entries/batch/"
+
+        response = self.post({"operations": [{"op": "delete", "id": first.pk}, {"op": "delete", "id": 999999}]}, path)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["status"] for result in response.json()["results"]], ["rolled_back", "error"])
+        self.assertEqual(TimeEntry.objects.filter(task=task).count(), 2)
+
+        self.assertEqual(self.post([{"op": "delete", "id": first.pk}], path).status_code, 400)
+
+        response = self.post({"operations": [{"op": "delete", "id": first.pk}]}, path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [{"index": 0, "op": "delete", "status": "ok", "id": first.pk}])
+        self.assertEqual(list(TimeEntry.objects.filter(task=task)), [second])
+        self.assertEqual(Task.objects.get(pk=task.pk).tracked_seconds, 300)
@@ -0,0 +1,60 @@
+import threading
+
+from django.db import connections, transaction
+from django.test import Client, TransactionTestCase, override_settings
+
+from events.broker import ChangeStream, change, lock_bucket, publish
+from events.models import ChangeEvent
+
+
+# The blocked write is slow on purpose; keep it out of the slow request log.
+@override_settings(REQUEST_TIMING=False)
+class ChangeStreamOrderTests(TransactionTestCase):
+    """A stream never skips an event that commits after a higher id of its bucket."""
+
+    def test_writer_cannot_commit_past_an_open_transaction(self):
+        stream = ChangeStream(user_id=None, last_event_id=None)
+        stream._start()
+
+        published = threading.Event()
+        release = threading.Event()
+
+        def slow_writer():
+            # Holds the first event id of the bucket until released.
+            try:
+                with transaction.atomic():
+                    lock_bucket(None)
+                    publish([change(ChangeEvent.KIND_TASK, "populated", user_id=None, created=1)])
+                    published.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        responses = []
+
+        def task_writer():
+            try:
+                responses.append(Client().post("/api/tasks/", {"title": "Later"}, content_type="application/json"))
+            finally:
+                connections.close_all()
+
+        slow = threading.Thread(target=slow_writer)
+        slow.start()
+        self.assertTrue(published.wait(10))
+        fast = threading.Thread(target=task_writer)
+        fast.start()
+
+        # The task write waits for the open transaction instead of committing a higher id first.
+        fast.join(0.5)
+        self.assertTrue(fast.is_alive())
+        self.assertEqual(stream._fetch(), [])
+
+        release.set()
+        slow.join(10)
+        fast.join(10)
+        self.assertEqual(responses[0].status_code, 201)
+
+        delivered = [event.pk for event in stream._fetch()]
+        self.assertEqual(delivered, list(ChangeEvent.objects.order_by("id").values_list("id", flat=True)))
+        self.assertEqual(ChangeEvent.objects.get(pk=delivered[0]).action, "populated")
+        self.assertEqual(len(delivered), 3)  # populated, then the task's created and rollup events
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.cache import get_max_age
+
+from benchmarks.common import seed_day
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yesterday = timezone.localdate() - timedelta(days=1)
+        cls.tasks = seed_day(day=cls.yesterday, tasks=3, entries_per_task=2)
+        cls.user = User.objects.create_user("alice", password="secret")
+        seed_day(user=cls.user, day=cls.yesterday, tasks=2, entries_per_task=1)
+
+    def test_revalidation_answers_304(self):
+        for path in ["/api/tasks/", "/api/tasks/stats/", "/api/dashboard/"]:
+            with self.subTest(path=path):
+                url = f"{path}?date={self.yesterday}"
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], first["ETag"])
+                self.assertEqual(response.content, b"")
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_past_anonymous_day_is_publicly_cacheable(self):
+        response = self.client.get(f"/api/tasks/?date={self.yesterday}")
+        self.assertIn("public", response["Cache-Control"])
+        self.assertEqual(get_max_age(response), 86400)
+        # A shared cache must not answer a Basic-authenticated request from the anonymous bucket.
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_user_days_are_private(self):
+        self.client.force_login(self.user)
+        response = self.client.get(f"/api/tasks/?date={self.yesterday}")
+        self.assertEqual(len(response.json()), 2)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertNotIn("public", response["Cache-Control"])
+
+    def test_today_is_revalidated(self):
+        response = self.client.get("/api/tasks/")
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("ETag", response)
+
+    def test_edit_invalidates_the_etag(self):
+        url = f"/api/tasks/?date={self.yesterday}"
+        first = self.client.get(url)
+        task = self.tasks[0]
+        self.client.patch(f"/api/tasks/{task.pk}/", {"title": "Renamed"}, content_type="application/json")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertIn("Last-Modified", response)
+        self.assertIn("Renamed", [row["title"] for row in response.json()])
+        # The untouched user bucket keeps its validator.
+        self.client.force_login(self.user)
+        own = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=own["ETag"]).status_code, 304)
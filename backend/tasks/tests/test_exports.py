@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from benchmarks.common import seed_day
+from tasks.exports import COLUMNS, Export
+from tasks.models import Task, TimeEntry
+
+DAY = date(2024, 3, 1)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for offset in range(3):
+            seed_day(day=DAY + timedelta(days=offset), tasks=2, entries_per_task=2)
+        cls.user = User.objects.create_user("alice", password="secret")
+        seed_day(user=cls.user, day=DAY, tasks=1, entries_per_task=1)
+
+    def export(self, kind, **params):
+        response = self.client.get(f"/api/export/{kind}/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_tasks_csv(self):
+        response, body = self.export("tasks", start=DAY, end=DAY + timedelta(days=1))
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="tasks-2024-03-01-2024-03-02.csv"')
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        header, *rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(header, list(COLUMNS["tasks"]))
+        expected = Task.objects.filter(user=None, date__range=(DAY, DAY + timedelta(days=1)))
+        expected = expected.order_by("date", "-created_at", "-id").values_list("id", flat=True)
+        self.assertEqual([int(row[0]) for row in rows], list(expected))
+        self.assertEqual({row[1] for row in rows}, {"2024-03-01", "2024-03-02"})
+        self.assertEqual({row[7] for row in rows}, {"600"})
+
+    def test_time_entries_ndjson(self):
+        response, body = self.export("time-entries", format="ndjson", start=DAY, end=DAY)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        entries = TimeEntry.objects.filter(task__user=None, task__date=DAY).order_by("start_time", "id")
+        self.assertEqual([row["id"] for row in rows], [entry.pk for entry in entries])
+        self.assertEqual(list(rows[0]), list(COLUMNS["time-entries"]))
+        self.assertEqual(rows[0]["date"], "2024-03-01")
+        self.assertEqual(rows[0]["duration_seconds"], 300)
+        self.assertTrue(rows[0]["start_time"].startswith("2024-03-01T08:00:00"))
+
+    def test_buckets_are_separate(self):
+        self.client.force_login(self.user)
+        _, body = self.export("tasks", format="ndjson", start=DAY, end=DAY + timedelta(days=2))
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [Task.objects.get(user=self.user).pk])
+
+    def test_chunked_output_is_identical(self):
+        export = Export(kind="time-entries", format="csv", user_id=None, start=DAY, end=DAY + timedelta(days=2))
+        whole = b"".join(export)
+        with mock.patch("tasks.exports.CHUNK_SIZE", 5):
+            chunks = list(export)
+        self.assertEqual(len(chunks), 1 + 3)
+        self.assertEqual(b"".join(chunks), whole)
+
+        async def collect():
+            return b"".join([chunk async for chunk in export])
+
+        self.assertEqual(async_to_sync(collect)(), whole)
+
+    def test_management_command_writes_the_same_rows(self):
+        _, body = self.export("time-entries", start=DAY, end=DAY + timedelta(days=2))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "entries.csv")
+            end = str(DAY + timedelta(days=2))
+            call_command("export_history", "time-entries", start=str(DAY), end=end, output=path, stdout=io.StringIO())
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), body)
+
+    def test_invalid_requests(self):
+        for kind, params in [
+            ("habits", {}),
+            ("tasks", {"format": "xlsx"}),
+            ("tasks", {"start": "2024-03-02", "end": "2024-03-01"}),
+            ("tasks", {"start": "yesterday"}),
+        ]:
+            with self.subTest(kind=kind, params=params):
+                response = self.client.get(f"/api/export/{kind}/", params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+        self.assertEqual(self.client.post("/api/export/tasks/").status_code, 405)
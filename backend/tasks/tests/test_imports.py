@@ -0,0 +1,97 @@
+from datetime import date
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Sum
+from django.test import TestCase
+
+from dashboards.models import DailyTaskRollup
+from tasks.models import Task, TimeEntry
+from tasks.totals import drifted_tasks
+
+DAY = date(2024, 3, 1)
+
+CSV = """title,date,start_time,end_time,duration_seconds,target_seconds,description
+Read,2024-03-01,2024-03-01T08:00:00+00:00,2024-03-01T08:25:00+00:00,,1800,
+Read,2024-03-01,2024-03-01T09:00:00+00:00,2024-03-01T09:10:00+00:00,,1800,
+,2024-03-01,2024-03-01T10:00:00+00:00,2024-03-01T10:05:00+00:00,,,
+Walk,2024-03-01,2024-03-01T11:00:00+00:00,2024-03-01T11:30:00+00:00,1500,,outside
+Walk,2024-03-01,2024-03-01T12:30:00+00:00,2024-03-01T12:00:00+00:00,,,
+Walk,01/03/2024,2024-03-01T13:00:00+00:00,2024-03-01T13:05:00+00:00,,,
+"""
+
+
+class TimeEntryImportTests(TestCase):
+    def upload(self, content, name="entries.csv", **data):
+        file = SimpleUploadedFile(name, content.encode("utf-8"))
+        return self.client.post("/api/time-entries/import/", {"file": file, **data})
+
+    def assertTotalsConsistent(self):
+        tasks = Task.objects.filter(date=DAY)
+        self.assertEqual(drifted_tasks(tasks), [])
+        for task in tasks:
+            entries = TimeEntry.objects.filter(task=task)
+            rollup = DailyTaskRollup.objects.get(task=task)
+            self.assertEqual(rollup.tracked_seconds, entries.aggregate(total=Sum("duration_seconds"))["total"])
+            self.assertEqual(rollup.entry_count, entries.count())
+
+    def test_import_reports_bad_lines(self):
+        response = self.upload(CSV)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(
+            {key: result[key] for key in ["rows", "imported", "skipped", "tasks_created", "error_count"]},
+            {"rows": 6, "imported": 3, "skipped": 0, "tasks_created": 2, "error_count": 3},
+        )
+        self.assertEqual([error["line"] for error in result["errors"]], [4, 6, 7])
+        self.assertIn("title", result["errors"][0]["error"])
+        self.assertIn("end_time is before start_time", result["errors"][1]["error"])
+        self.assertIn("date", result["errors"][2]["error"])
+
+        read = Task.objects.get(title="Read", date=DAY)
+        walk = Task.objects.get(title="Walk", date=DAY)
+        self.assertEqual((read.tracked_seconds, read.target_seconds), (2100, 1800))
+        self.assertEqual((walk.tracked_seconds, walk.description), (1500, "outside"))
+        self.assertTotalsConsistent()
+
+    def test_reimport_is_idempotent(self):
+        self.upload(CSV)
+        entries = TimeEntry.objects.count()
+
+        result = self.upload(CSV).json()
+        self.assertEqual((result["imported"], result["skipped"], result["tasks_created"]), (0, 3, 0))
+        self.assertEqual(result["error_count"], 3)
+        self.assertEqual(TimeEntry.objects.count(), entries)
+        self.assertEqual(Task.objects.filter(date=DAY).count(), 2)
+        self.assertEqual(Task.objects.get(title="Read", date=DAY).tracked_seconds, 2100)
+        self.assertTotalsConsistent()
+
+    def test_adds_to_existing_tasks(self):
+        task = Task.objects.create(title="Read", date=DAY, target_seconds=600)
+        self.upload(CSV)
+
+        task.refresh_from_db()
+        self.assertEqual((task.tracked_seconds, task.target_seconds), (2100, 600))
+        self.assertEqual(Task.objects.filter(title="Read", date=DAY).count(), 1)
+        self.assertTotalsConsistent()
+
+    def test_ndjson_by_file_name(self):
+        content = "\n".join(
+            [
+                '{"title": "Read", "start_time": "2024-03-01T08:00:00+00:00", "end_time": "2024-03-01T08:20:00+00:00"}',
+                "{not json",
+                "[1, 2]",
+                "",
+                '{"title": "Read", "start_time": "2024-03-01T09:00:00+00:00", "end_time": "2024-03-01T09:05:00+00:00"}',
+            ]
+        )
+        result = self.upload(content, name="entries.ndjson").json()
+        self.assertEqual((result["rows"], result["imported"], result["error_count"]), (4, 2, 2))
+        self.assertEqual([error["line"] for error in result["errors"]], [2, 3])
+        self.assertEqual(Task.objects.get(title="Read", date=DAY).tracked_seconds, 1500)
+        self.assertTotalsConsistent()
+
+    def test_file_level_errors(self):
+        self.assertEqual(self.client.post("/api/time-entries/import/").status_code, 400)
+        self.assertEqual(self.upload("title,start_time\nRead,2024-03-01T08:00:00\n").status_code, 400)
+        self.assertEqual(self.upload(CSV, format="xlsx").status_code, 400)
+        self.assertFalse(TimeEntry.objects.exists())
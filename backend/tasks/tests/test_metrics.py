@@ -0,0 +1,39 @@
+from unittest import skipUnless
+
+from django.test import TestCase, override_settings
+
+from core import metrics
+
+
+@skipUnless(metrics.ENABLED, "metrics are off (METRICS or prometheus_client missing)")
+@override_settings(DEBUG=False, METRICS_TOKEN="")
+class MetricsAccessTests(TestCase):
+    def test_closed_without_debug_or_token(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("METRICS_TOKEN", response.json()["detail"])
+
+    @override_settings(DEBUG=True)
+    def test_open_with_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required_once_set(self):
+        for header in [None, "Bearer wrong", "s3cret", "Basic s3cret"]:
+            with self.subTest(header=header):
+                extra = {"HTTP_AUTHORIZATION": header} if header else {}
+                self.assertEqual(self.client.get("/metrics", **extra).status_code, 401)
+
+        self.client.get("/api/tasks/stats/")
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.prometheus_client.CONTENT_TYPE_LATEST)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertIn(
+            'http_requests_total{method="GET",route="tasks.views.TaskViewSet.stats",status="200"}',
+            response.content.decode(),
+        )
+
+    @override_settings(DEBUG=True, METRICS_TOKEN="s3cret")
+    def test_token_applies_with_debug_too(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
@@ -0,0 +1,69 @@
+import base64
+import json
+
+from django.test import TestCase
+
+from benchmarks.common import seed_day
+from tasks.models import Task, TimeEntry
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_day(tasks=5, entries_per_task=1)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            url = pages[-1]["next"]
+        return pages
+
+    def test_next_links_walk_every_row_once(self):
+        expected = list(Task.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        pages = self.walk("/api/tasks/?page_size=2")
+
+        self.assertEqual([len(page["results"]) for page in pages], [2, 2, 1])
+        self.assertEqual([row["id"] for page in pages for row in page["results"]], expected)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertIsNotNone(pages[-1]["previous"])
+
+    def test_previous_link_returns_the_previous_page(self):
+        first = self.client.get("/api/tasks/?page_size=2").json()
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+        self.assertEqual(back["next"], first["next"])
+
+    def test_time_entries_are_paginated_by_start_time(self):
+        expected = list(TimeEntry.objects.order_by("-start_time", "-id").values_list("id", flat=True))
+        pages = self.walk("/api/time-entries/?page_size=3")
+        self.assertEqual([row["id"] for page in pages for row in page["results"]], expected)
+
+    def test_plain_list_without_pagination_params(self):
+        self.assertEqual(len(self.client.get("/api/tasks/").json()), 5)
+
+    def test_invalid_cursors_are_not_found(self):
+        task = Task.objects.first()
+        for cursor in [
+            "not-base64!",
+            _cursor([1, 2]),
+            _cursor({"r": 0}),
+            _cursor({"r": 0, "p": [task.created_at.isoformat()]}),
+            _cursor({"r": 0, "p": ["yesterday", task.pk]}),
+            _cursor({"r": 0, "p": [None, task.pk]}),
+            _cursor({"r": 0, "p": [task.created_at.isoformat(), None]}),
+            _cursor({"r": 0, "p": {"a": 1, "b": 2}}),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/tasks/", {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
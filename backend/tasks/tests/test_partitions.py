@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from tasks import partitions
+from tasks.models import Task, TimeEntry, TimeEntrySummary
+from tasks.services import start_task_timer, stop_task_timer
+from tasks.totals import drifted_tasks, rebuild_task_totals
+
+
+def _running_index_is_unique() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indisunique FROM pg_index WHERE indexrelid = to_regclass(%s)",
+            [partitions.RUNNING_ENTRY_CONSTRAINT],
+        )
+        return cursor.fetchone()[0]
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs Postgres.")
+class PartitionLifecycleTests(TransactionTestCase):
+    def setUp(self):
+        # Start from a plain table even when TIME_ENTRY_PARTITIONING built it partitioned.
+        self.was_partitioned = partitions.is_partitioned(connection)
+        partitions.unpartition_table(connection)
+
+    def tearDown(self):
+        partitions.unpartition_table(connection)
+        if self.was_partitioned:
+            partitions.partition_table(connection)
+
+    def test_partition_timers_drop_month_and_unpartition(self):
+        today = timezone.localdate()
+        task = Task.objects.create(title="Focus", date=today)
+        other = Task.objects.create(title="Read", date=today)
+        old_month = partitions.add_months(today.replace(day=1), -2)
+        old_start = partitions.month_bounds(old_month)[0] + timedelta(hours=12)
+        TimeEntry.objects.create(
+            task=task, start_time=old_start, end_time=old_start + timedelta(minutes=30), duration_seconds=1800
+        )
+        rebuild_task_totals([task.pk])
+
+        notes = partitions.partition_table(connection, months_ahead=1)
+        self.assertTrue(partitions.is_partitioned(connection))
+        self.assertIn(partitions.partition_name(old_month), {p.name for p in partitions.list_partitions(connection)})
+        self.assertTrue(any(partitions.RUNNING_ENTRY_CONSTRAINT in note for note in notes))
+        self.assertFalse(_running_index_is_unique())
+
+        # Starting another task's timer stops the first one: one running entry per bucket.
+        start_task_timer(task)
+        start_task_timer(other)
+        self.assertEqual(TimeEntry.objects.filter(end_time__isnull=True).count(), 1)
+        self.assertIsNotNone(stop_task_timer(other))
+        start_task_timer(task)
+
+        # The trigger still rejects a second running entry of one task.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TimeEntry.objects.create(task=task, start_time=timezone.now())
+        stop_task_timer(task)
+
+        dropped = partitions.drop_month(connection, old_month)
+        self.assertEqual(dropped.entries, 1)
+        self.assertFalse(TimeEntry.objects.filter(start_time__lt=partitions.month_bounds(old_month)[1]).exists())
+        self.assertEqual(TimeEntrySummary.objects.get(task=task).tracked_seconds, 1800)
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
+
+        notes = partitions.unpartition_table(connection)
+        self.assertFalse(partitions.is_partitioned(connection))
+        self.assertTrue(_running_index_is_unique())
+        self.assertTrue(any(partitions.RUNNING_ENTRY_CONSTRAINT in note for note in notes))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TimeEntry.objects.create(task=task, start_time=timezone.now())
+            TimeEntry.objects.create(task=task, start_time=timezone.now())
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
@@ -0,0 +1,65 @@
+"""Hard query-count ceilings for the hot endpoints (see also benchmarks.query_budgets).
+
+Raise a number here only together with the change that needs the extra
+round-trip, and say why next to it.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from benchmarks.common import seed_day
+from tasks.models import TimeEntry
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tasks = seed_day(tasks=25, entries_per_task=8)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_dashboard(self):
+        # Day version (validators) + summary aggregate + per-task totals + productivity trend.
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get("/api/dashboard/").status_code, 200)
+        # Served from the response cache.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/dashboard/").status_code, 200)
+
+    def test_task_stats(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get("/api/tasks/stats/").status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/tasks/stats/").status_code, 200)
+
+    def test_task_list(self):
+        # Day version (validators) + one values() query, however many tasks the day has.
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(len(response.json()), len(self.tasks))
+
+    def test_revalidation_reads_only_the_day_version(self):
+        for path in ["/api/dashboard/", "/api/tasks/", "/api/tasks/stats/"]:
+            with self.subTest(path=path):
+                etag = self.client.get(path)["ETag"]
+                with self.assertNumQueries(1):
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_timer_start_and_stop(self):
+        first, second = self.tasks[:2]
+        # Task lookup, then in one transaction (SAVEPOINT/RELEASE here): close running
+        # entries, insert, task totals, rollup, day version bump (created on the day's
+        # first write) and the change event insert. Postgres also takes the bucket's
+        # advisory lock (events.broker.lock_bucket).
+        lock = int(connection.vendor == "postgresql")
+        with self.assertNumQueries(11 + lock):
+            self.assertEqual(self.client.post(f"/api/tasks/{first.pk}/start-timer/").status_code, 201)
+        # Switching also closes the running entry and recounts its rollup.
+        with self.assertNumQueries(14 + lock):
+            self.assertEqual(self.client.post(f"/api/tasks/{second.pk}/start-timer/").status_code, 201)
+        with self.assertNumQueries(9 + lock):
+            self.assertEqual(self.client.post(f"/api/tasks/{second.pk}/stop-timer/").status_code, 200)
+        self.assertFalse(TimeEntry.objects.filter(end_time__isnull=True).exists())
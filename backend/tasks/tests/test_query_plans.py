@@ -0,0 +1,24 @@
+from django.db import connection, transaction
+from django.test import TestCase
+
+from tasks.management.commands.check_query_plans import full_scans, hot_queries
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_an_index(self):
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Tiny tables make seq scans "cheaper"; only whether an index is usable matters.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, qs in hot_queries():
+                with self.subTest(query=name):
+                    plan = qs.explain()
+                    self.assertEqual(full_scans(plan), [], plan)
+
+    def test_full_scan_detection(self):
+        if connection.vendor == "postgresql":
+            plan = "Seq Scan on tasks_timeentry_p2026_01  (cost=0.00..1.01 rows=1 width=8)"
+        else:
+            plan = "SCAN tasks_task"
+        self.assertEqual(len(full_scans(plan)), 1)
@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.common import seed_day
+from core import compression
+from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+
+
+class RendererTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_day(tasks=3, entries_per_task=1)
+
+    def test_orjson_output_matches_drf(self):
+        data = {
+            "when": datetime(2024, 3, 1, 8, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            "amount": Decimal("1.50"),
+            "title": "Lesen üben \u2028\u2029 </script>",
+            "items": [1, 2.5, None, True],
+            "big": 2**70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_negotiation(self):
+        expected = self.client.get("/api/tasks/").json()
+
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        response = self.client.get("/api/tasks/?format=msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        self.assertTrue(self.client.get("/api/tasks/")["Content-Type"].startswith("application/json"))
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_request_body(self):
+        body = MessagePackRenderer().render({"title": "Read", "target_seconds": 1800})
+        response = self.client.post(
+            "/api/tasks/", body, content_type="application/msgpack", HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Read")
+
+        response = self.client.post("/api/tasks/", b"\xc1", content_type="application/msgpack")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(API_COMPRESSION=True, API_COMPRESSION_MIN_BYTES=1024)
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_day(tasks=20, entries_per_task=1)
+
+    def test_choose_encoding(self):
+        br = "br" if compression.brotli is not None else "gzip"
+        self.assertEqual(compression.choose_encoding("gzip, deflate, br"), br)
+        self.assertEqual(compression.choose_encoding("gzip;q=1, br;q=0.5"), "gzip")
+        self.assertEqual(compression.choose_encoding("br;q=0, *"), "gzip")
+        self.assertIsNone(compression.choose_encoding("gzip;q=0"))
+        self.assertIsNone(compression.choose_encoding("identity"))
+        self.assertIsNone(compression.choose_encoding(""))
+
+    def test_gzip(self):
+        plain = self.client.get("/api/tasks/")
+        self.assertGreater(len(plain.content), 1024)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli(self):
+        plain = self.client.get("/api/tasks/")
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(json.loads(compression.brotli.decompress(response.content)), plain.json())
+
+    def test_small_and_streaming_responses_are_not_compressed(self):
+        response = self.client.get("/api/tasks/stats/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertLess(len(response.content), 1024)
+        self.assertNotIn("Content-Encoding", response)
+
+        response = self.client.get("/api/export/tasks/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(response.streaming)
+        self.assertNotIn("Content-Encoding", response)
+
+    @override_settings(API_COMPRESSION=False)
+    def test_disabled(self):
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
@@ -0,0 +1,52 @@
+import re
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.common import seed_day
+from core.timing import normalize_sql
+
+_METRIC = re.compile(r'(\w+);dur=[\d.]+(?:;desc="(\d+) quer(?:y|ies)")?')
+
+
+@override_settings(REQUEST_TIMING=True, REQUEST_TIMING_SLOW_REQUEST_MS=60_000, REQUEST_TIMING_SLOW_QUERY_MS=60_000)
+class RequestTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_day(tasks=3, entries_per_task=1)
+
+    def test_header_is_opt_in(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/tasks/"))
+
+    @override_settings(REQUEST_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/")
+
+        metrics = {name: count for name, count in _METRIC.findall(response["Server-Timing"])}
+        self.assertEqual(list(metrics), ["sql", "serialize", "render", "view"])
+        self.assertEqual(int(metrics["sql"]), len(queries))
+
+    @override_settings(REQUEST_TIMING=False, REQUEST_TIMING_HEADER=True)
+    def test_disabled(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/tasks/"))
+
+    @override_settings(REQUEST_TIMING_SLOW_REQUEST_MS=0, REQUEST_TIMING_SLOW_QUERY_MS=0)
+    def test_slow_requests_and_queries_are_logged(self):
+        with self.assertLogs("core.timing", "WARNING") as logs:
+            self.client.get("/api/tasks/")
+
+        request_lines = [line for line in logs.output if "Slow request" in line]
+        self.assertEqual(len(request_lines), 1)
+        self.assertIn("GET /api/tasks/ -> 200", request_lines[0])
+        self.assertIn("tasks.views.TaskViewSet.list", request_lines[0])
+        query_lines = [line for line in logs.output if "Slow query" in line]
+        self.assertTrue(query_lines)
+        self.assertTrue(all("tasks.views.TaskViewSet.list: SELECT" in line for line in query_lines))
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s)\n AND c > 10"),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ?",
+        )
@@ -0,0 +1,54 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.test import Client, TransactionTestCase
+
+from dashboards.models import DailyTaskRollup
+from dashboards.rollups import rebuild_task_rollups
+from tasks.models import Task, TimeEntry
+from tasks.totals import drifted_tasks
+
+THREADS = 8
+REQUESTS = 15
+
+
+class TimerConcurrencyTests(TransactionTestCase):
+    """Concurrent start/stop calls keep one running timer per bucket (benchmarks.timer_concurrency at scale)."""
+
+    def test_concurrent_starts_and_stops(self):
+        tasks = Task.objects.bulk_create([Task(title=f"Task {i}") for i in range(4)])
+        task_ids = [task.pk for task in tasks]
+        rebuild_task_rollups(task_ids)
+        statuses = []
+        lock = threading.Lock()
+        violations = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            client = Client()
+            try:
+                for _ in range(REQUESTS):
+                    action = rng.choice(["start-timer", "stop-timer"])
+                    response = client.post(f"/api/tasks/{rng.choice(task_ids)}/{action}/")
+                    running = TimeEntry.objects.filter(end_time__isnull=True).count()
+                    with lock:
+                        statuses.append(response.status_code)
+                        if running > 1:
+                            violations.append(running)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            list(pool.map(worker, range(THREADS)))
+
+        self.assertEqual(len(statuses), THREADS * REQUESTS)
+        self.assertTrue(set(statuses) <= {200, 201, 400}, sorted(set(statuses)))
+        self.assertEqual(violations, [])
+        self.assertLessEqual(TimeEntry.objects.filter(end_time__isnull=True).count(), 1)
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
+        for rollup in DailyTaskRollup.objects.all():
+            entries = TimeEntry.objects.filter(task_id=rollup.task_id)
+            self.assertEqual(rollup.tracked_seconds, sum(entry.duration_seconds for entry in entries))
+            self.assertEqual(rollup.entry_count, entries.count())
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import ChangeEvent
+from tasks.models import Task, TimeEntry
+from tasks.services import start_task_timer, stop_task_timer
+from tasks.totals import add_tracked_seconds, drifted_tasks
+
+
+class TimerTransitionTests(TestCase):
+    def test_stop_closes_only_the_running_entry(self):
+        task = Task.objects.create(title="Task")
+        now = timezone.now()
+        with mock.patch("tasks.services.timezone.now", return_value=now - timedelta(minutes=5)):
+            running = start_task_timer(task)
+        # Already finished at the very instant the timer is stopped (an import, a frozen clock).
+        TimeEntry.objects.create(task=task, start_time=now - timedelta(hours=1), end_time=now, duration_seconds=3600)
+        add_tracked_seconds({task.pk: 3600})
+        ChangeEvent.objects.all().delete()
+
+        with mock.patch("tasks.services.timezone.now", return_value=now):
+            stopped = stop_task_timer(task)
+
+        self.assertEqual(stopped.pk, running.pk)
+        self.assertEqual(stopped.duration_seconds, 300)
+        self.assertEqual(drifted_tasks(Task.objects.all()), [])
+        task.refresh_from_db()
+        self.assertEqual(task.tracked_seconds, 3900)
+        stops = ChangeEvent.objects.filter(kind=ChangeEvent.KIND_TIMER, action="stopped")
+        self.assertEqual([event.payload["entry"]["id"] for event in stops], [running.pk])
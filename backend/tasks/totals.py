@@ -0,0 +1,112 @@
+"""Timer state stored on each task: Task.tracked_seconds and Task.active_entry.
+
+The task list, task detail and task events read these two columns (see
+services.with_timer_annotations) instead of totalling every task's entries.
+The write paths update them in the same transaction as the entries:
+
+- closing running entries (timer start/stop) adds their durations and clears
+  the pointer, and starting a timer points the task at its new entry
+  (tasks.services);
+- deleting entries (API, batch) subtracts their durations and clears a
+  pointer to them;
+- imports add the imported durations (tasks.imports).
+
+Archiving (tasks.archive, partition drops) moves finished time into
+TimeEntrySummary rows, which tracked_seconds already counts, so it touches
+neither column. Anything that bypasses these helpers (admin edits, raw SQL)
+is found and repaired by `manage.py check_task_totals`.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Value, When
+
+from .archive import finished_seconds
+from .models import Task, TimeEntry
+
+
+def _seconds_by_task(entries) -> dict[int, int]:
+    seconds: dict[int, int] = defaultdict(int)
+    for entry in entries:
+        seconds[entry.task_id] += entry.duration_seconds
+    return seconds
+
+
+def _per_task(seconds: dict[int, int]):
+    # One UPDATE for all tasks: each takes its own delta.
+    if len(seconds) == 1:
+        return Value(next(iter(seconds.values())))
+    return Case(
+        *[When(pk=task_id, then=Value(value)) for task_id, value in seconds.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def add_tracked_seconds(seconds: dict[int, int]):
+    """Add seconds of newly stored finished entries, {task_id: seconds}, to their tasks."""
+
+    if seconds:
+        Task.objects.filter(pk__in=list(seconds)).update(tracked_seconds=F("tracked_seconds") + _per_task(seconds))
+
+
+def finish_entries(entries):
+    """Entries that were just closed: add their durations and clear their tasks' running entry."""
+
+    seconds = _seconds_by_task(entries)
+    if seconds:
+        Task.objects.filter(pk__in=list(seconds)).update(
+            tracked_seconds=F("tracked_seconds") + _per_task(seconds), active_entry=None
+        )
+
+
+def start_entry(entry: TimeEntry):
+    """Point the task at its newly started entry."""
+
+    Task.objects.filter(pk=entry.task_id).update(active_entry=entry)
+
+
+def remove_entries(entries):
+    """Entries that were just deleted: subtract their durations (0 if running) and drop pointers to them."""
+
+    seconds = _seconds_by_task(entries)
+    if seconds:
+        Task.objects.filter(pk__in=list(seconds)).update(
+            tracked_seconds=F("tracked_seconds") - _per_task(seconds),
+            active_entry=Case(
+                When(active_entry__in=[entry.pk for entry in entries], then=None),
+                default=F("active_entry"),
+            ),
+        )
+
+
+def _running_entry():
+    running = TimeEntry.objects.filter(task_id=OuterRef("pk"), end_time__isnull=True)
+    return Subquery(running.order_by("-start_time").values("pk")[:1])
+
+
+def rebuild_task_totals(task_ids) -> int:
+    """Recompute the timer state of the given tasks from their entries and summaries in one UPDATE.
+
+    `task_ids` may be a list or a values_list() subquery. Returns the number of tasks updated.
+    """
+
+    return Task.objects.filter(pk__in=task_ids).update(
+        tracked_seconds=finished_seconds(), active_entry=_running_entry()
+    )
+
+
+def drifted_tasks(task_qs) -> list[tuple[int, int, int | None, int, int | None]]:
+    """Tasks of `task_qs` whose stored timer state disagrees with their entries.
+
+    Rows of (id, tracked_seconds, active_entry_id, expected seconds, expected entry id).
+    """
+
+    rows = task_qs.order_by().annotate(expected_seconds=finished_seconds(), expected_entry=_running_entry())
+    return [
+        row
+        for row in rows.values_list("pk", "tracked_seconds", "active_entry_id", "expected_seconds", "expected_entry")
+        if row[1:3] != row[3:5]
+    ]
@@ -0,0 +1,148 @@
+"""Per-day version stamps and the HTTP validators derived from them.
+
+Every write to a bucket's tasks or time entries bumps the DayVersion row of
+each day it touches (tasks.changes does this next to publishing the change
+events). The per-day read endpoints turn the row into a strong ETag and a
+Last-Modified date, and answer a matching conditional GET with 304 after a
+single lookup in this table.
+
+A day is *settled* once it is in the past and has no running timer. Its
+responses may be cached by the browser for PAST_DAY_CACHE_SECONDS; today,
+future days and days with a running timer must be revalidated each time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date as date_type, datetime
+
+from django.conf import settings
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import DayVersion
+from .signals import days_changed
+
+# Bump when the payload of a versioned endpoint changes shape, so clients do
+# not keep revalidating a representation rendered by the previous code.
+REPRESENTATION_VERSION = 1
+
+
+def _bucket_versions(user_id):
+    if user_id is None:
+        return DayVersion.objects.filter(user__isnull=True)
+    return DayVersion.objects.filter(user_id=user_id)
+
+
+def bump_day_versions(*, user_id, dates, active_timer: bool | None = None) -> None:
+    """Advance the version of each of `dates` in one bucket (inside the write's transaction).
+
+    `active_timer` records whether those days now have a running timer; None
+    leaves the flag alone.
+    """
+
+    dates = {date_type.fromisoformat(day) if isinstance(day, str) else day for day in dates}
+    if not dates:
+        return
+
+    changes = {"version": F("version") + 1, "updated_at": timezone.now()}
+    if active_timer is not None:
+        changes["active_timer"] = active_timer
+
+    scope = _bucket_versions(user_id).filter(date__in=dates)
+    if scope.update(**changes) < len(dates):
+        # First write to some of these days. Create them at version 0 and bump
+        # again; bumping the existing rows twice is harmless.
+        DayVersion.objects.bulk_create(
+            [DayVersion(user_id=user_id, date=day) for day in dates],
+            ignore_conflicts=True,
+        )
+        scope.update(**changes)
+    days_changed.send(sender=DayVersion, user_id=user_id, dates=dates)
+
+
+@dataclass(frozen=True)
+class Stamp:
+    etag: str
+    last_modified: datetime | None
+    settled: bool
+    # The anonymous (demo) bucket is the same for everyone; user data is not.
+    shared: bool
+
+    def not_modified(self, request):
+        """The 304 (or 412) response for a matching conditional request, else None."""
+
+        last_modified = int(self.last_modified.timestamp()) if self.last_modified else None
+        response = get_conditional_response(request, etag=self.etag, last_modified=last_modified)
+        return self.apply(response) if response is not None else None
+
+    def apply(self, response):
+        """Attach the validators and the caching policy to a response."""
+
+        if response.status_code not in (200, 304):
+            return response
+        response["ETag"] = self.etag
+        if self.last_modified:
+            response["Last-Modified"] = http_date(self.last_modified.timestamp())
+        scope = {"public": True} if self.shared else {"private": True}
+        if self.shared:
+            # Header-authenticated (Basic) requests to the same URL see their own bucket.
+            patch_vary_headers(response, ["Authorization"])
+        if self.settled:
+            patch_cache_control(response, max_age=settings.PAST_DAY_CACHE_SECONDS, **scope)
+        else:
+            patch_cache_control(response, no_cache=True, **scope)
+        return response
+
+
+def _etag(scope: str, user_id, key, version) -> str:
+    raw = f"{REPRESENTATION_VERSION}:{scope}:{user_id}:{key}:{version}"
+    return '"%s"' % hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _day_stamp(scope: str, user_id, day: date_type, row: dict | None, *, timer_sensitive: bool) -> Stamp | None:
+    row = row or {"version": 0, "updated_at": None, "active_timer": False}
+    if timer_sensitive and row["active_timer"]:
+        # The payload includes the running timer's live progress: no stable representation.
+        return None
+    settled = day < timezone.localdate() and not row["active_timer"]
+    return Stamp(_etag(scope, user_id, day, row["version"]), row["updated_at"], settled, user_id is None)
+
+
+_DAY_FIELDS = ("version", "updated_at", "active_timer")
+
+
+def day_stamp(scope: str, *, user_id, day: date_type, timer_sensitive: bool = False) -> Stamp | None:
+    """Validators for a response that only depends on one day of one bucket.
+
+    `timer_sensitive` responses (the task list) get no stamp while a timer runs.
+    """
+
+    row = _bucket_versions(user_id).filter(date=day).values(*_DAY_FIELDS).first()
+    return _day_stamp(scope, user_id, day, row, timer_sensitive=timer_sensitive)
+
+
+async def aday_stamp(scope: str, *, user_id, day: date_type, timer_sensitive: bool = False) -> Stamp | None:
+    row = await _bucket_versions(user_id).filter(date=day).values(*_DAY_FIELDS).afirst()
+    return _day_stamp(scope, user_id, day, row, timer_sensitive=timer_sensitive)
+
+
+_BUCKET_AGGREGATES = {"version": Sum("version"), "updated_at": Max("updated_at")}
+
+
+def _bucket_stamp(scope: str, user_id, row: dict) -> Stamp:
+    # Versions only grow, so their sum changes whenever any day changes.
+    return Stamp(_etag(scope, user_id, "all", row["version"] or 0), row["updated_at"], False, user_id is None)
+
+
+def bucket_stamp(scope: str, *, user_id) -> Stamp:
+    """Validators for a response over all days of one bucket."""
+
+    return _bucket_stamp(scope, user_id, _bucket_versions(user_id).aggregate(**_BUCKET_AGGREGATES))
+
+
+async def abucket_stamp(scope: str, *, user_id) -> Stamp:
+    return _bucket_stamp(scope, user_id, await _bucket_versions(user_id).aaggregate(**_BUCKET_AGGREGATES))
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 
-from django.db.models import Exists, OuterRef, Subquery, Sum
-from django.db.models.functions import Coalesce
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from requests import RequestException
 from rest_framework import mixins, status
@@ -11,11 +12,31 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from core import response_cache
+from core.responses import api_response, json_response, method_not_allowed, shadows_drf_view
+from core.timing import timed
+from dashboards.rollups import add_tracked_time, sync_task_rollup
+from events.broker import lock_bucket
 from external_apis.world_time import fetch_current_time
 
+from . import totals
+from .batch import BatchError, apply_task_batch, apply_time_entry_batch
+from .changes import publish_task_changes, publish_task_deletions, publish_timer_changes
+from .exports import Export
+from .imports import ImportFileError, import_time_entries
+from .listing import VALUE_FIELDS, task_list_rows
 from .models import HabitTemplate, Task, TimeEntry
+from .pagination import TaskCursorPagination, TimeEntryCursorPagination
 from .serializers import HabitTemplateSerializer, TaskSerializer, TimeEntrySerializer
-from .services import start_task_timer, stop_task_timer
+from .services import (
+    populate_tasks_from_templates,
+    start_task_timer,
+    stop_task_timer,
+    with_timer_annotations,
+)
+from .versions import abucket_stamp, aday_stamp, bucket_stamp, day_stamp
+
+MAX_POPULATE_DAYS = 31
 
 
 def _bucket_user(request):
@@ -23,6 +44,18 @@ def _bucket_user(request):
     return user if user.is_authenticated else None
 
 
+async def _abucket_user(request):
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def _tasks_for_bucket(user):
+    qs = Task.objects.all()
+    if user is None:
+        return qs.filter(user__isnull=True)
+    return qs.filter(user=user)
+
+
 def _parse_date_param(value: str | None) -> date:
     if not value:
         return timezone.localdate()
@@ -32,6 +65,48 @@ def _parse_date_param(value: str | None) -> date:
         return timezone.localdate()
 
 
+_STATS_AGGREGATES = {
+    # Aliases must not clash with the `completed` field itself.
+    "completed_count": Count("id", filter=Q(completed=True)),
+    "pending_count": Count("id", filter=Q(completed=False)),
+}
+
+
+def _stats_scope(qs, date_param: str | None):
+    selected_date = None
+    if date_param is not None:
+        selected_date = _parse_date_param(date_param)
+        qs = qs.filter(date=selected_date)
+    return qs, selected_date
+
+
+def _is_paginated(params) -> bool:
+    return "cursor" in params or "page_size" in params
+
+
+def _stats_stamp(user, date_param: str | None):
+    user_id = getattr(user, "pk", None)
+    if date_param is None:
+        return bucket_stamp("stats", user_id=user_id)
+    return day_stamp("stats", user_id=user_id, day=_parse_date_param(date_param))
+
+
+async def _astats_stamp(user, date_param: str | None):
+    user_id = getattr(user, "pk", None)
+    if date_param is None:
+        return await abucket_stamp("stats", user_id=user_id)
+    return await aday_stamp("stats", user_id=user_id, day=_parse_date_param(date_param))
+
+
+def _stats_payload(selected_date, counts) -> dict:
+    return {
+        "date": str(selected_date) if selected_date else None,
+        "total": counts["completed_count"] + counts["pending_count"],
+        "completed": counts["completed_count"],
+        "pending": counts["pending_count"],
+    }
+
+
 class HabitTemplateViewSet(ModelViewSet):
     serializer_class = HabitTemplateSerializer
 
@@ -49,13 +124,10 @@ class HabitTemplateViewSet(ModelViewSet):
 
 class TaskViewSet(ModelViewSet):
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
 
     def _scoped_queryset(self):
-        user = _bucket_user(self.request)
-        qs = Task.objects.all()
-        if user is None:
-            return qs.filter(user__isnull=True)
-        return qs.filter(user=user)
+        return _tasks_for_bucket(_bucket_user(self.request))
 
     @action(detail=False, methods=["get"], url_path="stats")
     def stats(self, request):
@@ -64,25 +136,23 @@ class TaskViewSet(ModelViewSet):
         Returns counts of completed vs pending tasks, optionally scoped to a date.
         """
 
-        qs = self._scoped_queryset()
-
         date_param = request.query_params.get("date")
-        selected_date = None
-        if date_param is not None:
-            selected_date = _parse_date_param(date_param)
-            qs = qs.filter(date=selected_date)
-
-        completed = qs.filter(completed=True).count()
-        pending = qs.filter(completed=False).count()
+        stamp = _stats_stamp(_bucket_user(request), date_param)
+        not_modified = stamp.not_modified(request)
+        if not_modified is not None:
+            return not_modified
 
-        return Response(
-            {
-                "date": str(selected_date) if selected_date else None,
-                "total": completed + pending,
-                "completed": completed,
-                "pending": pending,
-            }
+        user = _bucket_user(request)
+        qs, selected_date = _stats_scope(_tasks_for_bucket(user), date_param)
+        payload, outcome = response_cache.get_or_compute(
+            "stats",
+            user_id=getattr(user, "pk", None),
+            day=selected_date or response_cache.ALL_DAYS,
+            compute=lambda: _stats_payload(selected_date, qs.aggregate(**_STATS_AGGREGATES)),
         )
+        response = Response(payload)
+        response["X-Cache"] = outcome.upper()
+        return stamp.apply(response)
 
     @action(detail=False, methods=["get"], url_path="world-time")
     def world_time(self, _request):
@@ -116,58 +186,104 @@ class TaskViewSet(ModelViewSet):
             selected_date = _parse_date_param(self.request.query_params.get("date"))
             qs = qs.filter(date=selected_date)
 
-        active_entry_qs = (
-            TimeEntry.objects.filter(task=OuterRef("pk"), end_time__isnull=True)
-            .order_by("-start_time")
-        )
-
-        return qs.annotate(
-            has_active_timer=Exists(active_entry_qs),
-            active_entry_start_time=Subquery(active_entry_qs.values("start_time")[:1]),
-            total_time_seconds=Coalesce(Sum("time_entries__duration_seconds"), 0),
-        ).order_by("-created_at")
+        return with_timer_annotations(qs).order_by("-created_at", "-id")
+
+    def list(self, request, *args, **kwargs):
+        # Paginated reads span days and are not versioned.
+        stamp = None
+        if not _is_paginated(request.query_params):
+            stamp = day_stamp(
+                "tasks",
+                user_id=getattr(_bucket_user(request), "pk", None),
+                day=_parse_date_param(request.query_params.get("date")),
+                timer_sensitive=True,
+            )
+        if stamp is None:
+            return self._list(request, *args, **kwargs)
+
+        not_modified = stamp.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        return stamp.apply(self._list(request, *args, **kwargs))
+
+    def _list(self, request, *args, **kwargs):
+        if _is_paginated(request.query_params):
+            # The cursor paginator reads positions off model instances.
+            return super().list(request, *args, **kwargs)
+        rows = list(self.filter_queryset(self.get_queryset()).values(*VALUE_FIELDS))
+        with timed("serialize"):
+            return Response(task_list_rows(rows))
 
     def perform_create(self, serializer):
         user = _bucket_user(self.request)
-        serializer.save(user=user)
+        with transaction.atomic():
+            lock_bucket(getattr(user, "pk", user))
+            task = serializer.save(user=user)
+            sync_task_rollup(task)
+            publish_task_changes("created", [task], user_id=task.user_id)
+        # The response needs the timer annotations a fresh instance lacks.
+        serializer.instance = with_timer_annotations(Task.objects.filter(pk=task.pk)).get()
+
+    def perform_update(self, serializer):
+        previous_date = serializer.instance.date
+        with transaction.atomic():
+            lock_bucket(serializer.instance.user_id)
+            task = serializer.save()
+            sync_task_rollup(task)
+            publish_task_changes("updated", [task], user_id=task.user_id, previous_dates=[previous_date])
+
+    def perform_destroy(self, instance):
+        # Deleting a task cascades to its rollup row.
+        deleted = [(instance.pk, instance.date)]
+        with transaction.atomic():
+            lock_bucket(instance.user_id)
+            instance.delete()
+            publish_task_deletions(deleted, user_id=instance.user_id)
 
     @action(detail=False, methods=["post"], url_path="populate")
     def populate(self, request):
-        """Create missing daily tasks from active templates for the given date."""
+        """Create missing daily tasks from active templates.
 
-        user = _bucket_user(request)
-        selected_date = _parse_date_param(request.query_params.get("date"))
+        Accepts `?date=` (single day, default today) or an inclusive `?start=&end=`
+        range of at most MAX_POPULATE_DAYS days.
+        """
 
-        template_qs = HabitTemplate.objects.filter(is_active=True)
-        if user is None:
-            template_qs = template_qs.filter(user__isnull=True)
-            task_qs = Task.objects.filter(user__isnull=True)
+        user = _bucket_user(request)
+        params = request.query_params
+        if "start" in params or "end" in params:
+            start = _parse_date_param(params.get("start"))
+            end = _parse_date_param(params.get("end")) if params.get("end") else start
         else:
-            template_qs = template_qs.filter(user=user)
-            task_qs = Task.objects.filter(user=user)
+            start = end = _parse_date_param(params.get("date"))
 
-        template_ids = list(template_qs.values_list("id", flat=True))
-        existing = set(
-            task_qs.filter(date=selected_date, habit_template_id__in=template_ids).values_list(
-                "habit_template_id", flat=True
+        span = (end - start).days + 1
+        if span < 1 or span > MAX_POPULATE_DAYS:
+            return Response(
+                {"detail": f"Date range must cover 1 to {MAX_POPULATE_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        )
 
-        created = 0
-        for tmpl in template_qs:
-            if tmpl.id in existing:
-                continue
-            Task.objects.create(
-                user=user,
-                habit_template=tmpl,
-                title=tmpl.title,
-                description=tmpl.description,
-                date=selected_date,
-                target_seconds=tmpl.default_target_seconds,
+        with transaction.atomic():
+            created = populate_tasks_from_templates(
+                user=user, dates=[start + timedelta(days=offset) for offset in range(span)]
             )
-            created += 1
 
-        return Response({"created": created, "date": str(selected_date)})
+        return Response({"created": created, "date": str(start), "start": str(start), "end": str(end)})
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
+        """Apply many create/update/delete operations in one transaction (see tasks.batch)."""
+
+        try:
+            ok, results = apply_task_batch(
+                user=_bucket_user(request), task_qs=self._scoped_queryset(), payload=request.data
+            )
+        except BatchError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"results": results},
+            status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST,
+        )
 
     @action(detail=True, methods=["post"], url_path="start-timer")
     def start_timer(self, request, pk=None):
@@ -189,12 +305,18 @@ class TaskViewSet(ModelViewSet):
     @action(detail=True, methods=["get"], url_path="time-entries")
     def time_entries(self, request, pk=None):
         task = self.get_object()
-        entries = TimeEntry.objects.filter(task=task).order_by("-start_time")
+        entries = TimeEntry.objects.filter(task=task).order_by("-start_time", "-id")
+
+        paginator = TimeEntryCursorPagination()
+        page = paginator.paginate_queryset(entries, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(TimeEntrySerializer(page, many=True).data)
         return Response(TimeEntrySerializer(entries, many=True).data)
 
 
 class TimeEntryViewSet(mixins.ListModelMixin, mixins.DestroyModelMixin, GenericViewSet):
     serializer_class = TimeEntrySerializer
+    pagination_class = TimeEntryCursorPagination
 
     def get_queryset(self):
         user = _bucket_user(self.request)
@@ -208,4 +330,150 @@ class TimeEntryViewSet(mixins.ListModelMixin, mixins.DestroyModelMixin, GenericV
         if task_id:
             qs = qs.filter(task_id=task_id)
 
-        return qs.order_by("-start_time")
+        return qs.order_by("-start_time", "-id")
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
+        """Delete many time entries in one transaction (see tasks.batch)."""
+
+        try:
+            ok, results = apply_time_entry_batch(entry_qs=self.get_queryset(), payload=request.data)
+        except BatchError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"results": results},
+            status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_entries(self, request):
+        """Bulk-import finished entries from an uploaded CSV/NDJSON `file` (see tasks.imports).
+
+        The format comes from the `format` form field, else the file name
+        (.ndjson/.jsonl), else CSV. Large migrations are better run with
+        `manage.py import_time_entries`.
+        """
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"detail": 'Upload the file as multipart field "file".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        fmt = request.data.get("format") or (
+            "ndjson" if upload.name.lower().endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        user = _bucket_user(request)
+        try:
+            result = import_time_entries(upload.file, format=fmt, user_id=getattr(user, "pk", None))
+        except ImportFileError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
+
+    def perform_destroy(self, instance):
+        entry_id = instance.pk
+        with transaction.atomic():
+            lock_bucket(instance.task.user_id)
+            instance.delete()
+            # delete() cleared the pk; the totals and the event still name the removed entry.
+            instance.pk = entry_id
+            totals.remove_entries([instance])
+            add_tracked_time(instance.task_id, seconds=-instance.duration_seconds, entries=-1)
+            publish_timer_changes("deleted", [instance], user_id=instance.task.user_id)
+
+
+# -----------------------------
+# Exports (see tasks.exports)
+# -----------------------------
+def _export_from_request(request, kind: str, user) -> Export:
+    """Build the Export for GET /api/export/<kind>/?format=&start=&end=; ValueError if invalid."""
+
+    params = request.GET
+    today = timezone.localdate()
+    start = date.fromisoformat(params["start"]) if params.get("start") else today
+    end = date.fromisoformat(params["end"]) if params.get("end") else max(start, today)
+    return Export(kind=kind, format=params.get("format", "csv"), user_id=getattr(user, "pk", None), start=start, end=end)
+
+
+def _export_response(export: Export, stream) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type=export.content_type)
+    response["Content-Disposition"] = f'attachment; filename="{export.filename}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def export_rows(request, kind):
+    """GET /api/export/<tasks|time-entries>/: stream a date range as CSV or NDJSON."""
+
+    if request.method != "GET":
+        return method_not_allowed(request)
+    try:
+        export = _export_from_request(request, kind, _bucket_user(request))
+    except ValueError as exc:
+        return json_response({"detail": str(exc)}, status=400)
+    return _export_response(export, iter(export))
+
+
+async def export_rows_async(request, kind):
+    """Async variant of export_rows: rows are fetched in chunks on the async ORM."""
+
+    if request.method != "GET":
+        return method_not_allowed(request)
+    try:
+        export = _export_from_request(request, kind, await _abucket_user(request))
+    except ValueError as exc:
+        return json_response({"detail": str(exc)}, status=400)
+    return _export_response(export, export.__aiter__())
+
+
+# -----------------------------
+# Async read paths (ASGI, see core.urls / settings.ASYNC_VIEWS)
+# -----------------------------
+@shadows_drf_view(TaskViewSet.as_view({"get": "list", "post": "create"}))
+async def task_list_async(request):
+    """GET /api/tasks/ on the async ORM; writes and paginated reads use the viewset."""
+
+    if _is_paginated(request.GET):
+        return await task_list_async.drf_view(request)
+
+    user = await _abucket_user(request)
+    selected_date = _parse_date_param(request.GET.get("date"))
+    stamp = await aday_stamp(
+        "tasks", user_id=getattr(user, "pk", None), day=selected_date, timer_sensitive=True
+    )
+    if stamp is not None:
+        not_modified = stamp.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+    qs = with_timer_annotations(_tasks_for_bucket(user).filter(date=selected_date))
+    rows = [row async for row in qs.order_by("-created_at", "-id").values(*VALUE_FIELDS)]
+    with timed("serialize"):
+        rows = task_list_rows(rows)
+    response = api_response(request, rows)
+    return stamp.apply(response) if stamp is not None else response
+
+
+@shadows_drf_view(TaskViewSet.as_view({"get": "stats"}))
+async def task_stats_async(request):
+    user = await _abucket_user(request)
+    date_param = request.GET.get("date")
+    stamp = await _astats_stamp(user, date_param)
+    not_modified = stamp.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+
+    qs, selected_date = _stats_scope(_tasks_for_bucket(user), date_param)
+
+    async def compute():
+        return _stats_payload(selected_date, await qs.aaggregate(**_STATS_AGGREGATES))
+
+    payload, outcome = await response_cache.aget_or_compute(
+        "stats",
+        user_id=getattr(user, "pk", None),
+        day=selected_date or response_cache.ALL_DAYS,
+        compute=compute,
+    )
+    response = api_response(request, payload)
+    response["X-Cache"] = outcome.upper()
+    return stamp.apply(response)
@@ -1,6 +1,6 @@
 "use client";
 
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 
 import TaskChart from "@/components/TaskChart";
 import WorldTimePanel from "@/components/WorldTimePanel";
@@ -18,11 +18,12 @@ import {
   populateTasks,
   startTimer,
   stopTimer,
+  subscribeToChanges,
   updateTask,
   updateTemplate,
 } from "@/lib/api";
 import type { DashboardMetrics } from "@/types/dashboard";
-import type { TaskStats } from "@/lib/api";
+import type { ChangeEvent, TaskStats } from "@/lib/api";
 import type { HabitTemplate } from "@/types/habitTemplate";
 import type { Task } from "@/types/task";
 import type { TimeEntry } from "@/types/timeEntry";
@@ -104,8 +105,13 @@ export default function TasksPage() {
       });
   }, []);
 
-  const refreshTasksAndSummary = useCallback((date: string) => {
-    Promise.allSettled([listTasks(date), getDashboard(date), getTaskStats(date)]).then(results => {
+  // Days changed during this session; their cached (past-day) responses may be stale.
+  const changedDates = useRef(new Set<string>());
+
+  const refreshTasksAndSummary = useCallback((date: string, cached = false) => {
+    if (!cached) changedDates.current.add(date);
+    const opts = { cached: cached && !changedDates.current.has(date) };
+    Promise.allSettled([listTasks(date, opts), getDashboard(date, opts), getTaskStats(date, opts)]).then(results => {
       const [tasksRes, dashboardRes, statsRes] = results;
 
       if (tasksRes.status === "fulfilled") {
@@ -155,7 +161,7 @@ export default function TasksPage() {
   }, [refreshTemplates]);
 
   useEffect(() => {
-    refreshTasksAndSummary(selectedDate);
+    refreshTasksAndSummary(selectedDate, true);
 
     // Collapse entries panel when switching days (avoid setState directly in effect body).
     Promise.resolve().then(() => {
@@ -164,6 +170,56 @@ export default function TasksPage() {
     });
   }, [selectedDate, refreshTasksAndSummary]);
 
+  // Apply pushed changes (other tabs/devices included) without refetching the task list.
+  useEffect(() => {
+    const upsert = (task: Task) =>
+      setTasks(prev => {
+        if (task.date !== selectedDate) return prev.filter(t => t.id !== task.id);
+        const idx = prev.findIndex(t => t.id === task.id);
+        if (idx === -1) return [task, ...prev];
+        const next = prev.slice();
+        next[idx] = task;
+        return next;
+      });
+
+    const refreshSummary = () => {
+      getDashboard(selectedDate).then(setDashboard).catch(() => undefined);
+      getTaskStats(selectedDate).then(setStats).catch(() => undefined);
+    };
+
+    const onEvent = (event: ChangeEvent) => {
+      switch (event.kind) {
+        case "task":
+          if (event.action === "deleted") {
+            changedDates.current.add(event.date);
+            setTasks(prev => prev.filter(t => t.id !== event.id));
+            if (event.date === selectedDate) refreshSummary();
+          } else if (event.action === "populated" || event.action === "imported") {
+            if (event.start <= selectedDate && selectedDate <= event.end) refreshTasksAndSummary(selectedDate);
+          } else {
+            changedDates.current.add(event.task.date);
+            upsert(event.task);
+          }
+          break;
+        case "timer":
+          if (event.task) {
+            changedDates.current.add(event.task.date);
+            upsert(event.task);
+          }
+          break;
+        case "rollup":
+          event.rows.forEach(row => changedDates.current.add(row.date));
+          if (event.rows.some(row => row.date === selectedDate)) refreshSummary();
+          break;
+        case "reset":
+          refreshTasksAndSummary(selectedDate);
+          break;
+      }
+    };
+
+    return subscribeToChanges(onEvent);
+  }, [selectedDate, refreshTasksAndSummary]);
+
   const statusCounts = useMemo(() => {
     // Prefer the dedicated /api/tasks/stats/ endpoint (assignment requirement).
     if (stats) {
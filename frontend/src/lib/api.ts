@@ -1,4 +1,4 @@
-import api from "./axios";
+import api, { baseURL } from "./axios";
 
 import type { DashboardMetrics } from "@/types/dashboard";
 import type { HabitTemplate } from "@/types/habitTemplate";
@@ -44,9 +44,14 @@ export const deleteTemplate = async (id: number) => {
 // -----------------------------
 // Daily tasks
 // -----------------------------
-export const listTasks = async (date?: DateString) => {
+// Pass `{ cached: true }` for plain browsing: past days are then served from the
+// browser cache or revalidated with a 304. Leave it off right after a mutation.
+export type ReadOptions = { cached?: boolean };
+
+export const listTasks = async (date?: DateString, opts?: ReadOptions) => {
   const res = await api.get<Task[]>("/tasks/", {
     params: date ? { date } : undefined,
+    allowCache: opts?.cached,
   });
   return res.data;
 };
@@ -105,9 +110,10 @@ export const deleteTimeEntry = async (id: number) => {
 // -----------------------------
 // Dashboard + external APIs
 // -----------------------------
-export const getDashboard = async (date?: DateString) => {
+export const getDashboard = async (date?: DateString, opts?: ReadOptions) => {
   const res = await api.get<DashboardMetrics>("/dashboard/", {
     params: date ? { date } : undefined,
+    allowCache: opts?.cached,
   });
   return res.data;
 };
@@ -119,9 +125,10 @@ export type TaskStats = {
   pending: number;
 };
 
-export const getTaskStats = async (date?: DateString) => {
+export const getTaskStats = async (date?: DateString, opts?: ReadOptions) => {
   const res = await api.get<TaskStats>("/tasks/stats/", {
     params: date ? { date } : undefined,
+    allowCache: opts?.cached,
   });
   return res.data;
 };
@@ -132,3 +139,64 @@ export const getWorldTime = async () => {
   );
   return res.data;
 };
+
+// -----------------------------
+// Change stream (Server-Sent Events)
+// -----------------------------
+export type RollupRow = {
+  task_id: number;
+  date: string;
+  title: string;
+  target_seconds: number;
+  completed: boolean;
+  tracked_seconds: number;
+  entry_count: number;
+};
+
+export type ChangeEvent =
+  | { kind: "task"; action: "created" | "updated"; task: Task }
+  | { kind: "task"; action: "deleted"; id: number; date: string }
+  | { kind: "task"; action: "populated"; start: string; end: string; created: number }
+  | { kind: "task"; action: "imported"; start: string; end: string; tasks_created: number; entries_created: number }
+  | { kind: "timer"; action: "started" | "stopped" | "deleted"; entry: TimeEntry; task: Task | null }
+  | { kind: "rollup"; action: "updated"; rows: RollupRow[] }
+  | { kind: "reset" };
+
+// A WSGI worker with no thread to spare for another stream answers 204, which
+// closes the EventSource for good; it is then reopened after this long, and
+// every attempt first refetches (a "reset"), so the page polls meanwhile.
+const STREAM_RETRY_MS = 30_000;
+
+// The browser reconnects on its own and resumes from the last event id.
+// Returns a function that closes the stream.
+export const subscribeToChanges = (onEvent: (event: ChangeEvent) => void) => {
+  let source: EventSource;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+  let lastEventId = "";
+
+  const open = () => {
+    const resume = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : "";
+    source = new EventSource(`${baseURL}/events/${resume}`);
+    for (const kind of ["task", "timer", "rollup", "reset"] as const) {
+      source.addEventListener(kind, e => {
+        const message = e as MessageEvent<string>;
+        if (message.lastEventId) lastEventId = message.lastEventId;
+        const data = JSON.parse(message.data || "{}");
+        onEvent({ kind, ...data } as ChangeEvent);
+      });
+    }
+    source.onerror = () => {
+      if (source.readyState !== EventSource.CLOSED) return;
+      retry = setTimeout(() => {
+        onEvent({ kind: "reset" });
+        open();
+      }, STREAM_RETRY_MS);
+    };
+  };
+
+  open();
+  return () => {
+    clearTimeout(retry);
+    source.close();
+  };
+};
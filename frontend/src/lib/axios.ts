@@ -1,7 +1,14 @@
 import axios from "axios";
 
+declare module "axios" {
+  interface AxiosRequestConfig {
+    // Let the browser reuse/revalidate its cached copy (ETag / Cache-Control from the API).
+    allowCache?: boolean;
+  }
+}
+
 const defaultBaseURL = "http://127.0.0.1:8000/api";
-const baseURL = (process.env.NEXT_PUBLIC_API_BASE_URL || defaultBaseURL).replace(/\/+$/, "");
+export const baseURL = (process.env.NEXT_PUBLIC_API_BASE_URL || defaultBaseURL).replace(/\/+$/, "");
 
 const api = axios.create({
   baseURL,
@@ -11,9 +18,10 @@ const api = axios.create({
   validateStatus: status => (status >= 200 && status < 300) || status === 304,
 });
 
-// Prevent conditional caching issues in production by cache-busting GET requests.
+// Prevent conditional caching issues in production by cache-busting GET requests,
+// unless the caller opted in to the API's ETag/Cache-Control validators.
 api.interceptors.request.use(config => {
-  if ((config.method || "").toLowerCase() === "get") {
+  if ((config.method || "").toLowerCase() === "get" && !config.allowCache) {
     config.params = { ...(config.params || {}), _ts: Date.now() };
   }
   return config;